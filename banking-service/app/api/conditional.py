@@ -0,0 +1,47 @@
+import hashlib
+import json
+from typing import Optional
+
+from fastapi import Response, status
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+
+ETAG_HEADER = "ETag"
+IF_NONE_MATCH_HEADER = "If-None-Match"
+
+
+def make_etag(*parts) -> str:
+    """ETag over everything that determines a response body.
+
+    Callers pass the resource kind, its owner or account, the account
+    version counters it depends on and the request's query parameters, so
+    the tag changes whenever the data could. With GZipMiddleware installed
+    the same data goes out as gzip or identity bytes depending on the
+    client, so the tag is weak; a strong one would have to differ per
+    content coding.
+    """
+    raw = json.dumps(jsonable_encoder(parts), separators=(",", ":"))
+    tag = '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+    return "W/" + tag if settings.gzip_minimum_size > 0 else tag
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header names etag (weak comparison, as RFC 9110 asks for)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return _opaque(etag) in (_opaque(tag.strip()) for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    headers = {ETAG_HEADER: etag}
+    if settings.gzip_minimum_size > 0:
+        # GZipMiddleware only adds Vary to the bodies it compresses
+        headers["Vary"] = "Accept-Encoding"
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -0,0 +1,9 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Convert an offset-aware query parameter to the naive UTC that created_at is stored in."""
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
@@ -1,37 +1,93 @@
+import time
 from typing import Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import decode_access_token
-from app.db.session import get_session
+from app.db.session import get_async_session, get_session
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Verified bearer token -> detached User. Entries never outlive the token's exp.
+principal_cache = TTLCache(
+    maxsize=settings.principal_cache_size,
+    ttl=settings.principal_cache_ttl_seconds,
+)
 
-def get_current_user(
-    session: Session = Depends(get_session),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    """Get current authenticated user."""
-    credentials_exception = HTTPException(
+
+def invalidate_principal(user_id: int) -> int:
+    """Drop every cached principal for a user; returns the number of entries removed."""
+    return principal_cache.discard_where(lambda token, user: user.id == user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    invalidate_principal(target.id)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _token_subject(token: str) -> tuple:
+    """Verify the token and return (email, payload), raising 401 if unusable."""
     payload = decode_access_token(token)
     if payload is None:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+
     email: str = payload.get("sub")
     if email is None:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+    return email, payload
+
+
+def get_current_user(
+    session: Session = Depends(get_session),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """Get current authenticated user."""
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
+    email, payload = _token_subject(token)
     statement = select(User).where(User.email == email)
     user = session.exec(statement).first()
     if user is None:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+
+    # Detach so the cached instance is never expired or refreshed by a later commit
+    session.expunge(user)
+    principal_cache.set(token, user, ttl=payload.get("exp", 0) - time.time())
+    return user
+
+
+async def get_current_user_async(
+    session: AsyncSession = Depends(get_async_session),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """Get current authenticated user through the async engine."""
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
+    email, payload = _token_subject(token)
+    statement = select(User).where(User.email == email)
+    user = (await session.exec(statement)).first()
+    if user is None:
+        raise _credentials_exception()
+
+    session.expunge(user)
+    principal_cache.set(token, user, ttl=payload.get("exp", 0) - time.time())
     return user
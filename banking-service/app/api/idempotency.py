@@ -0,0 +1,160 @@
+import functools
+import hashlib
+import inspect
+import json
+from typing import Callable
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.locks import KeyedLock
+from app.db.group_commit import CALLER_COMMITS
+from app.services.idempotency import (
+    IdempotencyKeyMismatch,
+    StoredResponse,
+    find_response,
+    store_response,
+)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Handler arguments that are not part of what the client asked for
+_CONTEXT_ARGS = {"session", "current_user", "idempotency_key"}
+
+# A duplicate arriving while the first request runs waits for it here
+_key_locks = KeyedLock()
+
+
+def request_fingerprint(endpoint: str, kwargs: dict) -> str:
+    params = {name: value for name, value in kwargs.items() if name not in _CONTEXT_ARGS}
+    raw = json.dumps([endpoint, jsonable_encoder(params)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _replay(status_code: int, body: str) -> JSONResponse:
+    return JSONResponse(content=json.loads(body), status_code=status_code, headers={REPLAYED_HEADER: "true"})
+
+
+def _find(session: Session, user_id: int, key: str, fingerprint: str):
+    try:
+        return find_response(session, user_id, key, fingerprint)
+    except IdempotencyKeyMismatch:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+
+
+def _check_key(key: str) -> None:
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"
+        )
+
+
+def idempotent(func: Callable) -> Callable:
+    """Honour an Idempotency-Key header on a write handler.
+
+    The handler must take ``idempotency_key`` (the header), ``current_user``
+    and ``session`` keywords and do its writes through ``run_write`` (or
+    ``run_write_async``), which leaves them for this wrapper to commit
+    together with the response. The first successful response for a
+    (user, key) pair is stored and returned verbatim on every replay without
+    running the handler again; reusing the key with different parameters is
+    a 422. Apply it below ``retry_on_lock``.
+    """
+    if inspect.iscoroutinefunction(func):
+        return _idempotent_async(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = kwargs.get("idempotency_key")
+        if key is None:
+            return func(*args, **kwargs)
+        _check_key(key)
+
+        session: Session = kwargs["session"]
+        user_id = kwargs["current_user"].id
+        fingerprint = request_fingerprint(func.__name__, kwargs)
+        stored = _find(session, user_id, key, fingerprint)
+        if stored is not None:
+            return _replay(stored.status_code, stored.body)
+
+        # A duplicate in this process waits here; one in another process
+        # waits on SQLite's write lock and then fails on the unique index
+        with _key_locks.hold((user_id, key)):
+            # Whoever held the lock before us may have completed this key
+            stored = _find(session, user_id, key, fingerprint)
+            if stored is not None:
+                return _replay(stored.status_code, stored.body)
+
+            session.info[CALLER_COMMITS] = True
+            try:
+                result = func(*args, **kwargs)
+                body = json.dumps(jsonable_encoder(result))
+                store_response(session, user_id, key, StoredResponse(fingerprint, status.HTTP_200_OK, body))
+            except IntegrityError:
+                # Another process committed this key first; nothing of ours was written
+                session.rollback()
+                stored = _find(session, user_id, key, fingerprint)
+                if stored is None:
+                    raise
+                return _replay(stored.status_code, stored.body)
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                del session.info[CALLER_COMMITS]
+            return result
+
+    return wrapper
+
+
+def _idempotent_async(func: Callable) -> Callable:
+    """idempotent() for ``async def`` handlers on an AsyncSession.
+
+    There is no in-process key lock: blocking on it would stall the event
+    loop. Every duplicate waits on SQLite's write lock instead, as one from
+    another process does, and then replays through the unique index.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = kwargs.get("idempotency_key")
+        if key is None:
+            return await func(*args, **kwargs)
+        _check_key(key)
+
+        session: AsyncSession = kwargs["session"]
+        user_id = kwargs["current_user"].id
+        fingerprint = request_fingerprint(func.__name__.removesuffix("_async"), kwargs)
+        stored = await session.run_sync(_find, user_id, key, fingerprint)
+        if stored is not None:
+            return _replay(stored.status_code, stored.body)
+
+        session.info[CALLER_COMMITS] = True
+        try:
+            result = await func(*args, **kwargs)
+            body = json.dumps(jsonable_encoder(result))
+            response = StoredResponse(fingerprint, status.HTTP_200_OK, body)
+            await session.run_sync(store_response, user_id, key, response)
+        except IntegrityError:
+            await session.rollback()
+            stored = await session.run_sync(_find, user_id, key, fingerprint)
+            if stored is None:
+                raise
+            return _replay(stored.status_code, stored.body)
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            del session.info[CALLER_COMMITS]
+        return result
+
+    return wrapper
@@ -0,0 +1,24 @@
+from typing import Iterable, List, Mapping, Optional, Sequence, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def out_columns(schema: Type[BaseModel], model) -> List:
+    """The model's columns for each field of an *Out schema, in the schema's field order."""
+    return [getattr(model, field) for field in schema.model_fields]
+
+
+def rows_response(
+    schema: Type[BaseModel],
+    rows: Iterable[Sequence],
+    headers: Optional[Mapping[str, str]] = None,
+) -> ORJSONResponse:
+    """Encode rows selected with out_columns(schema, ...) as a JSON array of schema objects.
+
+    The rows go straight to orjson instead of through one model per row and
+    FastAPI's response_model validation; the bytes are the same as the
+    default JSONResponse would send for the schema (see tests/test_fast_json.py).
+    """
+    fields = tuple(schema.model_fields)
+    return ORJSONResponse([dict(zip(fields, row)) for row in rows], headers=headers)
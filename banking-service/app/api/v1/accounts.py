@@ -1,19 +1,32 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy import func
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import get_current_user
-from app.db.session import get_session
+from app.api.conditional import ETAG_HEADER, IF_NONE_MATCH_HEADER, etag_matches, make_etag, not_modified
+from app.api.dates import naive_utc
+from app.api.deps import get_current_user, get_current_user_async
+from app.api.idempotency import IDEMPOTENCY_KEY_HEADER, idempotent
+from app.api.responses import out_columns, rows_response
+from app.db.group_commit import run_write
+from app.db.session import get_async_session, get_session, insert_returning, retry_on_lock
 from app.models.user import User
 from app.models.account import Account
-from app.models.transaction import Transaction
-from app.schemas.account import AccountCreate, AccountOut
+from app.schemas.account import AccountCreate, AccountOut, AccountSummaryOut, BalanceOut, MonthSummaryOut
 from app.schemas.transaction import DepositWithdrawRequest, TransactionOut
+from app.services.balances import balance_at
+from app.services.ledger import post_deposit, post_withdrawal
+from app.services.rollups import monthly_summary
 
 router = APIRouter()
+# Routes served on the async engine instead when DATABASE_URL names an async driver
+async_router = APIRouter()
 
 
 @router.post("", response_model=AccountOut)
+@retry_on_lock
 def create_account(
     account_data: AccountCreate,
     current_user: User = Depends(get_current_user),
@@ -25,9 +38,8 @@ def create_account(
         type=account_data.type,
         balance_cents=0
     )
-    session.add(account)
+    insert_returning(session, [account])
     session.commit()
-    session.refresh(account)
     
     return AccountOut(
         id=account.id,
@@ -38,27 +50,109 @@ def create_account(
 
 @router.get("", response_model=List[AccountOut])
 def list_accounts(
+    if_none_match: Optional[str] = Header(None, alias=IF_NONE_MATCH_HEADER),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
-) -> List[AccountOut]:
-    """List all accounts for the current user."""
-    statement = select(Account).where(Account.user_id == current_user.id)
-    accounts = session.exec(statement).all()
-    
-    return [
-        AccountOut(
-            id=account.id,
-            type=account.type,
-            balance_cents=account.balance_cents
+) -> Response:
+    """List all accounts for the current user; 304 when If-None-Match names the current ETag."""
+    # Accounts are never deleted and every change bumps a version, so the
+    # count and the sum of versions move whenever the list does
+    count, versions = session.exec(
+        select(func.count(), func.coalesce(func.sum(Account.version), 0)).where(Account.user_id == current_user.id)
+    ).one()
+    etag = make_etag("accounts", current_user.id, count, versions)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    statement = select(*out_columns(AccountOut, Account)).where(Account.user_id == current_user.id)
+    return rows_response(AccountOut, session.exec(statement), {ETAG_HEADER: etag})
+
+
+@async_router.get("", response_model=List[AccountOut])
+async def list_accounts_async(
+    if_none_match: Optional[str] = Header(None, alias=IF_NONE_MATCH_HEADER),
+    current_user: User = Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session)
+) -> Response:
+    """List all accounts for the current user, on the async engine."""
+    return await session.run_sync(
+        lambda sync_session: list_accounts(if_none_match=if_none_match, current_user=current_user, session=sync_session)
+    )
+
+
+@router.get("/{account_id}/balance", response_model=BalanceOut)
+def get_balance(
+    account_id: int,
+    at: Optional[datetime] = Query(None),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+) -> BalanceOut:
+    """Balance of an account now, or as of a point in time (postings at exactly `at` included)."""
+    statement = select(Account).where(Account.id == account_id, Account.user_id == current_user.id)
+    account = session.exec(statement).first()
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
         )
-        for account in accounts
-    ]
+
+    if at is None:
+        return BalanceOut(account_id=account.id, at=datetime.utcnow(), balance_cents=account.balance_cents)
+
+    at = naive_utc(at)
+    return BalanceOut(account_id=account.id, at=at, balance_cents=balance_at(session, account.id, at))
+
+
+@async_router.get("/{account_id}/balance", response_model=BalanceOut)
+async def get_balance_async(
+    account_id: int,
+    at: Optional[datetime] = Query(None),
+    current_user: User = Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session)
+) -> BalanceOut:
+    """Balance of an account now or as of a point in time, on the async engine."""
+    return await session.run_sync(
+        lambda sync_session: get_balance(account_id=account_id, at=at, current_user=current_user, session=sync_session)
+    )
+
+
+@router.get("/{account_id}/summary", response_model=AccountSummaryOut)
+def get_summary(
+    account_id: int,
+    from_month: Optional[str] = Query(None, alias="from", description="First month, YYYY-MM"),
+    to_month: Optional[str] = Query(None, alias="to", description="Last month, YYYY-MM"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+) -> AccountSummaryOut:
+    """Monthly inflow/outflow totals of an account, oldest first (months without activity are omitted)."""
+    statement = select(Account).where(Account.id == account_id, Account.user_id == current_user.id)
+    account = session.exec(statement).first()
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
+        )
+
+    try:
+        rollups = monthly_summary(session, account.id, from_month, to_month)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return AccountSummaryOut(
+        account_id=account.id,
+        months=[MonthSummaryOut(**rollup.model_dump(exclude={"id", "account_id"})) for rollup in rollups]
+    )
 
 
 @router.post("/{account_id}/deposit", response_model=TransactionOut)
+@retry_on_lock
+@idempotent
 def deposit(
     account_id: int,
     deposit_data: DepositWithdrawRequest,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ) -> TransactionOut:
@@ -69,29 +163,17 @@ def deposit(
             detail="Amount must be positive"
         )
     
-    # Get account and verify ownership
-    statement = select(Account).where(Account.id == account_id, Account.user_id == current_user.id)
-    account = session.exec(statement).first()
-    if not account:
+    # The credit UPDATE only matches an account the caller owns
+    try:
+        transaction = run_write(
+            session, post_deposit, account_id, deposit_data.amount_cents, deposit_data.description, current_user.id
+        )
+    except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Account not found"
+            detail=str(e)
         )
     
-    # Update balance
-    account.balance_cents += deposit_data.amount_cents
-    
-    # Create transaction record
-    transaction = Transaction(
-        account_id=account.id,
-        type="deposit",
-        amount_cents=deposit_data.amount_cents,
-        description=deposit_data.description
-    )
-    session.add(transaction)
-    session.commit()
-    session.refresh(transaction)
-    
     return TransactionOut(
         id=transaction.id,
         type=transaction.type,
@@ -102,9 +184,12 @@ def deposit(
 
 
 @router.post("/{account_id}/withdraw", response_model=TransactionOut)
+@retry_on_lock
+@idempotent
 def withdraw(
     account_id: int,
     withdraw_data: DepositWithdrawRequest,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ) -> TransactionOut:
@@ -115,36 +200,17 @@ def withdraw(
             detail="Amount must be positive"
         )
     
-    # Get account and verify ownership
-    statement = select(Account).where(Account.id == account_id, Account.user_id == current_user.id)
-    account = session.exec(statement).first()
-    if not account:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Account not found"
+    # Ownership and sufficient funds are checked by the debit UPDATE itself
+    try:
+        transaction = run_write(
+            session, post_withdrawal, account_id, withdraw_data.amount_cents, withdraw_data.description, current_user.id
         )
-    
-    # Check sufficient funds
-    if account.balance_cents < withdraw_data.amount_cents:
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Insufficient funds"
+            status_code=status.HTTP_404_NOT_FOUND if "not found" in str(e) else status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
     
-    # Update balance
-    account.balance_cents -= withdraw_data.amount_cents
-    
-    # Create transaction record
-    transaction = Transaction(
-        account_id=account.id,
-        type="withdraw",
-        amount_cents=withdraw_data.amount_cents,
-        description=withdraw_data.description
-    )
-    session.add(transaction)
-    session.commit()
-    session.refresh(transaction)
-    
     return TransactionOut(
         id=transaction.id,
         type=transaction.type,
@@ -1,39 +1,51 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
 
-from app.core.security import verify_password, get_password_hash, create_access_token
-from app.db.session import get_session
+from app.core.hashing import hashing_pool
+from app.core.security import create_access_token
+from app.db.session import get_session, insert_returning, retry_on_lock
 from app.models.user import User
 from app.schemas.auth import SignupRequest, LoginRequest, TokenResponse
 
 router = APIRouter()
 
+# The handlers are async so that bcrypt is awaited on the hashing pool instead
+# of parking a threadpool worker; their (sync) database calls go to the threadpool.
+
+
+def _find_user(session: Session, email: str) -> Optional[User]:
+    return session.exec(select(User).where(User.email == email)).first()
+
+
+@retry_on_lock
+def _insert_user(user: User, session: Session) -> None:
+    insert_returning(session, [user])
+    session.commit()
+
 
 @router.post("/signup", response_model=TokenResponse)
-def signup(
+async def signup(
     user_data: SignupRequest,
     session: Session = Depends(get_session)
 ) -> TokenResponse:
     """Create a new user account and return access token."""
     # Check if user already exists
-    statement = select(User).where(User.email == user_data.email)
-    existing_user = session.exec(statement).first()
-    if existing_user:
+    if await run_in_threadpool(_find_user, session, user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await hashing_pool.ahash(user_data.password)
     user = User(
         email=user_data.email,
         full_name=user_data.full_name,
         hashed_password=hashed_password
     )
-    session.add(user)
-    session.commit()
-    session.refresh(user)
+    await run_in_threadpool(_insert_user, user, session=session)
     
     # Create access token
     access_token = create_access_token(data={"sub": user.email})
@@ -41,15 +53,14 @@ def signup(
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(
+async def login(
     user_data: LoginRequest,
     session: Session = Depends(get_session)
 ) -> TokenResponse:
     """Authenticate user and return access token."""
-    statement = select(User).where(User.email == user_data.email)
-    user = session.exec(statement).first()
+    user = await run_in_threadpool(_find_user, session, user_data.email)
     
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    if not user or not await hashing_pool.averify(user_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -1,12 +1,15 @@
 import secrets
 import random
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Query
+from sqlalchemy import update
 from sqlmodel import Session, select
 
+from app.api.conditional import ETAG_HEADER, IF_NONE_MATCH_HEADER, etag_matches, make_etag, not_modified
 from app.api.deps import get_current_user
-from app.core.security import get_password_hash
-from app.db.session import get_session
+from app.api.responses import out_columns, rows_response
+from app.core.card_secrets import card_secret_hasher
+from app.db.session import get_session, insert_returning, retry_on_lock
 from app.models.user import User
 from app.models.account import Account
 from app.models.card import Card
@@ -16,18 +19,22 @@ router = APIRouter()
 
 
 @router.post("", response_model=CardOut)
+@retry_on_lock
 def issue_card(
     card_data: CardIssueRequest,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ) -> CardOut:
     """Issue a new card for an account."""
-    # Verify account ownership
-    account_stmt = select(Account).where(
-        Account.id == card_data.account_id,
-        Account.user_id == current_user.id
+    # Verify account ownership; bumping the version makes GET /cards revalidate
+    table = Account.__table__
+    account_stmt = (
+        update(table)
+        .where(table.c.id == card_data.account_id, table.c.user_id == current_user.id)
+        .values(version=table.c.version + 1)
+        .returning(table.c.id)
     )
-    account = session.exec(account_stmt).first()
+    account = session.execute(account_stmt).first()
     if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -39,7 +46,7 @@ def issue_card(
     last4 = str(random.randint(1000, 9999))
     
     # Hash CVV (never store plain CVV)
-    cvv_hash = get_password_hash(card_data.cvv)
+    cvv_hash = card_secret_hasher.hash(card_data.cvv)
     
     # Create card
     card = Card(
@@ -53,9 +60,8 @@ def issue_card(
         cvv_hash=cvv_hash
     )
     
-    session.add(card)
+    insert_returning(session, [card])
     session.commit()
-    session.refresh(card)
     
     return CardOut(
         id=card.id,
@@ -71,10 +77,11 @@ def issue_card(
 @router.get("", response_model=List[CardOut])
 def list_cards(
     account_id: int = Query(...),
+    if_none_match: Optional[str] = Header(None, alias=IF_NONE_MATCH_HEADER),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
-) -> List[CardOut]:
-    """List cards for an account."""
+) -> Response:
+    """List cards for an account; 304 when If-None-Match names the current ETag."""
     # Verify account ownership
     account_stmt = select(Account).where(
         Account.id == account_id,
@@ -87,19 +94,10 @@ def list_cards(
             detail="Account not found"
         )
     
+    etag = make_etag("cards", account.id, account.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     # Get cards for account
-    statement = select(Card).where(Card.account_id == account_id)
-    cards = session.exec(statement).all()
-    
-    return [
-        CardOut(
-            id=card.id,
-            brand=card.brand,
-            holder_name=card.holder_name,
-            last4=card.last4,
-            card_token=card.card_token,
-            exp_month=card.exp_month,
-            exp_year=card.exp_year
-        )
-        for card in cards
-    ]
+    statement = select(*out_columns(CardOut, Card)).where(Card.account_id == account_id)
+    return rows_response(CardOut, session.exec(statement), {ETAG_HEADER: etag})
@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session, select
+
+from app.api.dates import naive_utc
+from app.api.deps import get_current_user
+from app.db.session import get_session
+from app.models.user import User
+from app.models.account import Account
+from app.schemas.insights import CounterpartyTotalOut, InsightsOut, PeriodTotalOut, TypeTotalOut
+from app.services.insights import account_insights
+
+router = APIRouter()
+
+
+@router.get("", response_model=InsightsOut)
+def get_insights(
+    account_id: Optional[int] = Query(None, description="Omit for all of the user's accounts"),
+    start: Optional[datetime] = Query(None, description="created_at >= start"),
+    end: Optional[datetime] = Query(None, description="created_at < end"),
+    interval: str = Query("month", pattern="^(day|week|month)$"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+) -> InsightsOut:
+    """Spending totals and counts by type, by day/week/month and by transfer counterparty."""
+    statement = select(Account.id).where(Account.user_id == current_user.id).order_by(Account.id)
+    if account_id is not None:
+        statement = statement.where(Account.id == account_id)
+    account_ids = session.exec(statement).all()
+    if account_id is not None and not account_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
+        )
+
+    start, end = naive_utc(start), naive_utc(end)
+    try:
+        insights = account_insights(session, account_ids, start, end, interval)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return InsightsOut(
+        account_ids=account_ids,
+        start=start,
+        end=end,
+        interval=interval,
+        by_type=[TypeTotalOut(**total._asdict()) for total in insights.by_type],
+        by_period=[PeriodTotalOut(**total._asdict()) for total in insights.by_period],
+        by_counterparty=[CounterpartyTotalOut(**total._asdict()) for total in insights.by_counterparty],
+    )
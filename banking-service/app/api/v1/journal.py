@@ -0,0 +1,66 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlmodel import Session, func, select
+
+from app.api.deps import get_current_user
+from app.api.idempotency import IDEMPOTENCY_KEY_HEADER, idempotent
+from app.db.group_commit import run_write
+from app.db.session import get_session, retry_on_lock
+from app.models.user import User
+from app.models.account import Account
+from app.schemas.journal import JournalRequest, JournalOut
+from app.schemas.transaction import TransactionOut
+from app.services.journal import post_journal
+
+router = APIRouter()
+
+
+@router.post("", response_model=JournalOut)
+@retry_on_lock
+@idempotent
+def create_journal_entry(
+    journal_data: JournalRequest,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+) -> JournalOut:
+    """Post a balanced multi-leg entry, e.g. one debit funding many credits."""
+    # Verify every debited account is owned by the caller
+    debit_ids = {leg.account_id for leg in journal_data.legs if leg.amount_cents < 0}
+    owned_stmt = select(func.count()).select_from(Account).where(
+        Account.id.in_(debit_ids),
+        Account.user_id == current_user.id
+    )
+    if session.exec(owned_stmt).one() != len(debit_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Source account not found"
+        )
+
+    try:
+        transactions = run_write(
+            session,
+            post_journal,
+            [(leg.account_id, leg.amount_cents) for leg in journal_data.legs],
+            journal_data.description
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND if str(e) == "Account not found" else status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return JournalOut(
+        created_at=transactions[0].created_at,
+        total_cents=sum(tx.amount_cents for tx in transactions if tx.type == "transfer_out"),
+        transactions=[
+            TransactionOut(
+                id=tx.id,
+                type=tx.type,
+                amount_cents=tx.amount_cents,
+                created_at=tx.created_at,
+                description=tx.description
+            )
+            for tx in transactions
+        ]
+    )
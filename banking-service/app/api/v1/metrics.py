@@ -0,0 +1,23 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_user, principal_cache
+from app.core.hashing import hashing_pool
+from app.core.security import token_cache
+from app.db import group_commit
+from app.services.insights import insights_cache
+
+router = APIRouter()
+
+
+@router.get("", dependencies=[Depends(get_current_user)])
+def get_metrics() -> Dict[str, Any]:
+    """Expose in-process cache counters for monitoring."""
+    return {
+        "token_cache": token_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "insights_cache": insights_cache.stats(),
+        "hashing_pool": hashing_pool.stats(),
+        "group_commit": group_commit.group_writer.stats() if group_commit.group_writer else None,
+    }
@@ -1,28 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session, select
 
 from app.api.deps import get_current_user
-from app.db.session import get_session
+from app.db.session import get_session, retry_on_lock
 from app.models.user import User
 from app.models.account import Account
+from app.models.statement import Statement
 from app.schemas.statement import StatementRequest, StatementOut
-from app.services.statements import generate_statement
+from app.services.statements import generate_statement, get_statement, list_statements
 
 router = APIRouter()
 
 
-@router.post("/{account_id}", response_model=StatementOut)
-def create_statement(
-    account_id: int,
-    statement_data: StatementRequest,
-    current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
-) -> StatementOut:
-    """Generate monthly statement for an account."""
-    # Verify account ownership
+def _owned_account(session: Session, account_id: int, user: User) -> Account:
+    """Return the account if it belongs to user, else raise 404."""
     account_stmt = select(Account).where(
         Account.id == account_id,
-        Account.user_id == current_user.id
+        Account.user_id == user.id
     )
     account = session.exec(account_stmt).first()
     if not account:
@@ -30,6 +26,30 @@ def create_statement(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Account not found"
         )
+    return account
+
+
+def _statement_out(statement: Statement) -> StatementOut:
+    return StatementOut(
+        id=statement.id,
+        account_id=statement.account_id,
+        period_start=statement.period_start,
+        period_end=statement.period_end,
+        opening_balance_cents=statement.opening_balance_cents,
+        closing_balance_cents=statement.closing_balance_cents
+    )
+
+
+@router.post("/{account_id}", response_model=StatementOut)
+@retry_on_lock
+def create_statement(
+    account_id: int,
+    statement_data: StatementRequest,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+) -> StatementOut:
+    """Generate monthly statement for an account (returns the stored one if current)."""
+    _owned_account(session, account_id, current_user)
     
     try:
         statement = generate_statement(
@@ -37,18 +57,58 @@ def create_statement(
             account_id=account_id,
             month_str=statement_data.month
         )
-        
-        return StatementOut(
-            id=statement.id,
-            account_id=statement.account_id,
-            period_start=statement.period_start,
-            period_end=statement.period_end,
-            opening_balance_cents=statement.opening_balance_cents,
-            closing_balance_cents=statement.closing_balance_cents
-        )
+        return _statement_out(statement)
     
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+
+
+@router.get("/{account_id}", response_model=List[StatementOut])
+@retry_on_lock
+def read_statements(
+    account_id: int,
+    from_month: Optional[str] = Query(None, alias="from", description="First month, YYYY-MM"),
+    to_month: Optional[str] = Query(None, alias="to", description="Last month, YYYY-MM"),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+) -> List[StatementOut]:
+    """List generated statements for an account, oldest first."""
+    _owned_account(session, account_id, current_user)
+
+    try:
+        statements = list_statements(session, account_id, from_month, to_month)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return [_statement_out(statement) for statement in statements]
+
+
+@router.get("/{account_id}/{month}", response_model=StatementOut)
+@retry_on_lock
+def read_statement(
+    account_id: int,
+    month: str,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+) -> StatementOut:
+    """Get a previously generated monthly statement."""
+    _owned_account(session, account_id, current_user)
+
+    try:
+        statement = get_statement(session, account_id, month)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if statement is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Statement not found"
+        )
+    return _statement_out(statement)
@@ -1,24 +1,69 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import get_current_user
-from app.db.session import get_session
+from app.api.conditional import ETAG_HEADER, IF_NONE_MATCH_HEADER, etag_matches, make_etag, not_modified
+from app.api.dates import naive_utc
+from app.api.deps import get_current_user, get_current_user_async
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.api.responses import out_columns, rows_response
+from app.core.config import settings
+from app.db.session import get_async_session, get_session
 from app.models.user import User
 from app.models.account import Account
-from app.models.transaction import Transaction
+from app.models.transaction import SIGN_BY_TYPE, Transaction
 from app.schemas.transaction import TransactionOut
+from app.services.exports import iter_transactions_csv, iter_transactions_ndjson
+from app.services.search import TransactionFilters, filter_transactions, fts_query
 
 router = APIRouter()
+# Routes served on the async engine instead when DATABASE_URL names an async driver
+async_router = APIRouter()
 
 
 @router.get("", response_model=List[TransactionOut])
 def list_transactions(
     account_id: int = Query(...),
+    limit: int = Query(settings.transactions_page_size, ge=1, le=settings.transactions_max_page_size),
+    cursor: Optional[str] = Query(None),
+    types: Optional[List[str]] = Query(None, alias="type", description="Repeatable"),
+    start: Optional[datetime] = Query(None, description="created_at >= start"),
+    end: Optional[datetime] = Query(None, description="created_at < end"),
+    min_amount_cents: Optional[int] = Query(None, ge=0),
+    max_amount_cents: Optional[int] = Query(None, ge=0),
+    counterparty_account_id: Optional[int] = Query(None),
+    q: Optional[str] = Query(None, max_length=200, description="Words that must all appear in the description"),
+    if_none_match: Optional[str] = Header(None, alias=IF_NONE_MATCH_HEADER),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
-) -> List[TransactionOut]:
-    """List transactions for an account (newest first)."""
+) -> Response:
+    """List one page of transactions for an account (newest first), optionally filtered.
+
+    When more rows exist, the X-Next-Cursor response header carries the
+    cursor for the following page; send it with the same filters. The page
+    is 304 Not Modified when If-None-Match names its current ETag.
+    """
+    after = decode_cursor(cursor)
+    unknown = set(types or ()) - set(SIGN_BY_TYPE)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown transaction type: {', '.join(sorted(unknown))}"
+        )
+    filters = TransactionFilters(
+        types=types,
+        start=naive_utc(start),
+        end=naive_utc(end),
+        min_amount_cents=min_amount_cents,
+        max_amount_cents=max_amount_cents,
+        counterparty_account_id=counterparty_account_id,
+        text=fts_query(q) if q is not None else None,
+    )
+
     # Verify account ownership
     account_statement = select(Account).where(Account.id == account_id, Account.user_id == current_user.id)
     account = session.exec(account_statement).first()
@@ -27,18 +72,97 @@ def list_transactions(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Account not found"
         )
+    etag = make_etag("transactions", account.id, account.version, limit, cursor, filters)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    if q is not None and filters.text is None:
+        # Nothing searchable in q (only punctuation), so nothing can match
+        return rows_response(TransactionOut, [], {ETAG_HEADER: etag})
     
-    # Get transactions, newest first
-    statement = select(Transaction).where(Transaction.account_id == account_id).order_by(Transaction.created_at.desc())
-    transactions = session.exec(statement).all()
+    # Get transactions, newest first, as an index range scan from the cursor
+    statement = (
+        select(*out_columns(TransactionOut, Transaction))
+        .where(Transaction.account_id == account_id)
+        .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(limit + 1)
+    )
+    if after is not None:
+        statement = statement.where(tuple_(Transaction.created_at, Transaction.id) < tuple_(*after))
+    rows = session.exec(filter_transactions(statement, filters)).all()
+
+    headers = {ETAG_HEADER: etag}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
     
-    return [
-        TransactionOut(
-            id=transaction.id,
-            type=transaction.type,
-            amount_cents=transaction.amount_cents,
-            created_at=transaction.created_at,
-            description=transaction.description
+    return rows_response(TransactionOut, rows, headers)
+
+
+@async_router.get("", response_model=List[TransactionOut])
+async def list_transactions_async(
+    account_id: int = Query(...),
+    limit: int = Query(settings.transactions_page_size, ge=1, le=settings.transactions_max_page_size),
+    cursor: Optional[str] = Query(None),
+    types: Optional[List[str]] = Query(None, alias="type", description="Repeatable"),
+    start: Optional[datetime] = Query(None, description="created_at >= start"),
+    end: Optional[datetime] = Query(None, description="created_at < end"),
+    min_amount_cents: Optional[int] = Query(None, ge=0),
+    max_amount_cents: Optional[int] = Query(None, ge=0),
+    counterparty_account_id: Optional[int] = Query(None),
+    q: Optional[str] = Query(None, max_length=200, description="Words that must all appear in the description"),
+    if_none_match: Optional[str] = Header(None, alias=IF_NONE_MATCH_HEADER),
+    current_user: User = Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session)
+) -> Response:
+    """List one page of transactions for an account, on the async engine."""
+    return await session.run_sync(
+        lambda sync_session: list_transactions(
+            account_id=account_id,
+            limit=limit,
+            cursor=cursor,
+            types=types,
+            start=start,
+            end=end,
+            min_amount_cents=min_amount_cents,
+            max_amount_cents=max_amount_cents,
+            counterparty_account_id=counterparty_account_id,
+            q=q,
+            if_none_match=if_none_match,
+            current_user=current_user,
+            session=sync_session
+        )
+    )
+
+
+@router.get("/export")
+def export_transactions(
+    account_id: int = Query(...),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+) -> StreamingResponse:
+    """Stream an account's full transaction history (oldest first) as NDJSON or CSV."""
+    # Verify account ownership
+    account_statement = select(Account).where(Account.id == account_id, Account.user_id == current_user.id)
+    account = session.exec(account_statement).first()
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
+        )
+
+    bind = session.get_bind()
+    start, end = naive_utc(start), naive_utc(end)
+    if export_format == "csv":
+        return StreamingResponse(
+            iter_transactions_csv(bind, account_id, start, end, settings.export_chunk_size),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="transactions-{account_id}.csv"'},
         )
-        for transaction in transactions
-    ]
+    return StreamingResponse(
+        iter_transactions_ndjson(bind, account_id, start, end, settings.export_chunk_size),
+        media_type="application/x-ndjson",
+    )
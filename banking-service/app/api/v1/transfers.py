@@ -1,24 +1,23 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import get_current_user
-from app.db.session import get_session
+from app.api.deps import get_current_user, get_current_user_async
+from app.api.idempotency import IDEMPOTENCY_KEY_HEADER, idempotent
+from app.db.group_commit import run_write, run_write_async
+from app.db.session import get_async_session, get_session, retry_on_lock
+from app.models.transaction import Transaction
 from app.models.user import User
-from app.models.account import Account
 from app.schemas.transaction import TransferRequest, TransactionOut
 from app.services.transfers import execute_transfer
 
 router = APIRouter()
+# Routes served on the async engine instead when DATABASE_URL names an async driver
+async_router = APIRouter()
 
 
-@router.post("", response_model=List[TransactionOut])
-def transfer_money(
-    transfer_data: TransferRequest,
-    current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
-) -> List[TransactionOut]:
-    """Transfer money between accounts."""
+def _check_transfer(transfer_data: TransferRequest) -> None:
     if transfer_data.amount_cents <= 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -30,55 +29,81 @@ def transfer_money(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot transfer to the same account"
         )
-    
-    # Verify source account ownership
-    from_account_stmt = select(Account).where(
-        Account.id == transfer_data.from_account_id,
-        Account.user_id == current_user.id
-    )
-    from_account = session.exec(from_account_stmt).first()
-    if not from_account:
-        raise HTTPException(
+
+
+def _transfer_error(e: ValueError) -> HTTPException:
+    if "not found" in str(e):
+        return HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Source account not found"
+            detail=str(e)
         )
-    
-    # Verify destination account exists
-    to_account_stmt = select(Account).where(Account.id == transfer_data.to_account_id)
-    to_account = session.exec(to_account_stmt).first()
-    if not to_account:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Destination account not found"
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=str(e)
+    )
+
+
+def _transfer_out(transactions: List[Transaction]) -> List[TransactionOut]:
+    return [
+        TransactionOut(
+            id=tx.id,
+            type=tx.type,
+            amount_cents=tx.amount_cents,
+            created_at=tx.created_at,
+            description=tx.description
         )
-    
+        for tx in transactions
+    ]
+
+
+@router.post("", response_model=List[TransactionOut])
+@retry_on_lock
+@idempotent
+def transfer_money(
+    transfer_data: TransferRequest,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+) -> List[TransactionOut]:
+    """Transfer money between accounts."""
+    _check_transfer(transfer_data)
     try:
-        transactions = execute_transfer(
-            session=session,
-            from_account_id=transfer_data.from_account_id,
-            to_account_id=transfer_data.to_account_id,
-            amount_cents=transfer_data.amount_cents,
-            description=transfer_data.description
+        # Source ownership is checked by the debit itself
+        transactions = run_write(
+            session,
+            execute_transfer,
+            transfer_data.from_account_id,
+            transfer_data.to_account_id,
+            transfer_data.amount_cents,
+            transfer_data.description,
+            current_user.id
         )
-        
-        return [
-            TransactionOut(
-                id=tx.id,
-                type=tx.type,
-                amount_cents=tx.amount_cents,
-                created_at=tx.created_at,
-                description=tx.description
-            )
-            for tx in transactions
-        ]
-    
     except ValueError as e:
-        if "Insufficient funds" in str(e):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Insufficient funds"
-            )
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e)
+        raise _transfer_error(e)
+    return _transfer_out(transactions)
+
+
+@async_router.post("", response_model=List[TransactionOut])
+@retry_on_lock
+@idempotent
+async def transfer_money_async(
+    transfer_data: TransferRequest,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    current_user: User = Depends(get_current_user_async),
+    session: AsyncSession = Depends(get_async_session)
+) -> List[TransactionOut]:
+    """Transfer money between accounts, on the async engine."""
+    _check_transfer(transfer_data)
+    try:
+        transactions = await run_write_async(
+            session,
+            execute_transfer,
+            transfer_data.from_account_id,
+            transfer_data.to_account_id,
+            transfer_data.amount_cents,
+            transfer_data.description,
+            current_user.id
         )
+    except ValueError as e:
+        raise _transfer_error(e)
+    return _transfer_out(transactions)
@@ -0,0 +1,151 @@
+"""Operational commands, run against the configured DATABASE_URL.
+
+    python -m app.cli statements --month 2024-01 [--account-id 7 ...] [--workers 4]
+    python -m app.cli purge-idempotency-keys
+    python -m app.cli backfill-balances [--chunk-size 500]
+    python -m app.cli rebuild-rollups [--account-id 7 ...] [--workers 4]
+    python -m app.cli reconcile [--repair] [--workers 4]
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.session import engine, init_db
+from app.services.balances import run_balance_backfill
+from app.services.idempotency import purge_expired
+from app.services.reconcile import run_reconciliation
+from app.services.rollups import run_rollup_rebuild
+from app.services.statement_batch import run_statement_batch
+
+
+def _print_progress(done: int, total: int, elapsed: float) -> None:
+    rate = done / elapsed if elapsed else 0.0
+    print(f"  {done}/{total} accounts  {rate:,.0f} statements/s", file=sys.stderr)
+
+
+def statements_command(args: argparse.Namespace) -> int:
+    """Generate a month's statements for all (or the given) accounts."""
+    try:
+        result = run_statement_batch(
+            engine,
+            args.month,
+            account_ids=args.account_id,
+            workers=args.workers,
+            partition_size=args.partition_size,
+            progress=_print_progress,
+        )
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    print(
+        f"{result.month}: {result.generated} statements generated for {result.pending} pending accounts "
+        f"in {result.seconds:.1f}s ({result.rate:,.0f}/s)"
+    )
+    return 0
+
+
+def purge_idempotency_command(args: argparse.Namespace) -> int:
+    """Delete Idempotency-Key records older than IDEMPOTENCY_TTL_HOURS."""
+    with Session(engine) as session:
+        removed = purge_expired(session)
+    print(f"{removed} expired idempotency records removed")
+    return 0
+
+
+def backfill_balances_command(args: argparse.Namespace) -> int:
+    """Fill in the running balance of transactions posted before it was recorded."""
+    def progress(done: int, total: int) -> None:
+        print(f"  {done}/{total} accounts", file=sys.stderr)
+
+    accounts, rows = run_balance_backfill(engine, args.chunk_size, progress=progress)
+    print(f"{rows} transactions backfilled across {accounts} accounts")
+    return 0
+
+
+def rebuild_rollups_command(args: argparse.Namespace) -> int:
+    """Recompute monthly rollups from raw transaction history."""
+    def progress(done: int, total: int, elapsed: float) -> None:
+        print(f"  {done}/{total} accounts  {elapsed:.1f}s", file=sys.stderr)
+
+    result = run_rollup_rebuild(
+        engine,
+        account_ids=args.account_id,
+        workers=args.workers,
+        partition_size=args.partition_size,
+        progress=progress,
+    )
+    print(f"{result.rows} monthly rollups rebuilt for {result.accounts} accounts in {result.seconds:.1f}s")
+    return 0
+
+
+def reconcile_command(args: argparse.Namespace) -> int:
+    """Check account balances against the ledger; exits 1 if drift is left unrepaired."""
+    def progress(done: int, total: int, elapsed: float) -> None:
+        print(f"  {done}/{total} account ranges  {elapsed:.1f}s", file=sys.stderr)
+
+    result = run_reconciliation(
+        engine,
+        repair=args.repair,
+        workers=args.workers,
+        partition_size=args.partition_size,
+        progress=progress,
+    )
+    for mismatch in result.mismatches:
+        print(
+            f"account {mismatch.account_id}: balance {mismatch.balance_cents} "
+            f"ledger {mismatch.ledger_cents} drift {mismatch.drift:+d}"
+        )
+    print(
+        f"{result.accounts} accounts checked in {result.seconds:.1f}s: "
+        f"{len(result.mismatches)} mismatched, {result.repaired} repaired"
+    )
+    return 1 if result.mismatches and not args.repair else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Banking service operational commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("statements", help="month-end statement run (resumable)")
+    run.add_argument("--month", required=True, help="YYYY-MM")
+    run.add_argument("--account-id", type=int, action="append", help="limit to these accounts (repeatable)")
+    run.add_argument("--workers", type=int, default=settings.batch_workers, help="worker processes; 0 runs inline")
+    run.add_argument("--partition-size", type=int, default=settings.batch_partition_size, help="accounts per commit")
+    run.set_defaults(handler=statements_command)
+
+    purge = commands.add_parser("purge-idempotency-keys", help="delete expired Idempotency-Key records")
+    purge.set_defaults(handler=purge_idempotency_command)
+
+    backfill = commands.add_parser("backfill-balances", help="fill in missing running balances (resumable)")
+    backfill.add_argument(
+        "--chunk-size", type=int, default=settings.batch_partition_size, help="accounts per commit"
+    )
+    backfill.set_defaults(handler=backfill_balances_command)
+
+    rebuild = commands.add_parser("rebuild-rollups", help="recompute monthly account rollups from history")
+    rebuild.add_argument("--account-id", type=int, action="append", help="limit to these accounts (repeatable)")
+    rebuild.add_argument("--workers", type=int, default=settings.batch_workers, help="worker processes; 0 runs inline")
+    rebuild.add_argument("--partition-size", type=int, default=settings.batch_partition_size, help="accounts per commit")
+    rebuild.set_defaults(handler=rebuild_rollups_command)
+
+    reconcile = commands.add_parser("reconcile", help="compare account balances with the transaction ledger")
+    reconcile.add_argument("--repair", action="store_true", help="reset drifted balances to the ledger sum")
+    reconcile.add_argument("--workers", type=int, default=settings.batch_workers, help="worker processes; 0 runs inline")
+    reconcile.add_argument(
+        "--partition-size", type=int, default=settings.batch_partition_size, help="accounts per range"
+    )
+    reconcile.set_defaults(handler=reconcile_command)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    init_db()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
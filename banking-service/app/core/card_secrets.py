@@ -0,0 +1,71 @@
+import hashlib
+import hmac
+from typing import Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.hashing import hashing_pool
+
+HMAC_SCHEME = "hmac-sha256"
+
+
+class CardSecretHasher:
+    """Keyed-HMAC hasher for short card secrets such as the CVV.
+
+    A 3-4 digit secret has too little entropy for bcrypt's cost factor to
+    matter; its protection is the server-side pepper. Hashes are stored as
+    ``hmac-sha256$<pepper version>$<hex digest>`` so the pepper can be rotated,
+    and anything else (legacy bcrypt rows) is checked with ``legacy_verify``
+    and reported by ``needs_update`` for lazy re-hashing.
+    """
+
+    def __init__(
+        self,
+        peppers: Dict[int, str],
+        current_version: int,
+        legacy_verify: Callable[[str, str], bool],
+    ) -> None:
+        if current_version not in peppers:
+            raise ValueError(f"No pepper configured for version {current_version}")
+        self.peppers = peppers
+        self.current_version = current_version
+        self.legacy_verify = legacy_verify
+
+    def _digest(self, secret: str, version: int) -> str:
+        key = self.peppers[version].encode()
+        return hmac.new(key, secret.encode(), hashlib.sha256).hexdigest()
+
+    def hash(self, secret: str) -> str:
+        """Hash a card secret with the current pepper."""
+        return f"{HMAC_SCHEME}${self.current_version}${self._digest(secret, self.current_version)}"
+
+    def verify(self, secret: str, stored_hash: str) -> bool:
+        """Check a card secret against a stored hash of any supported format."""
+        if not stored_hash.startswith(f"{HMAC_SCHEME}$"):
+            return self.legacy_verify(secret, stored_hash)
+        try:
+            _, version, digest = stored_hash.split("$")
+            version = int(version)
+        except ValueError:
+            return False
+        if version not in self.peppers:
+            return False
+        return hmac.compare_digest(digest, self._digest(secret, version))
+
+    def needs_update(self, stored_hash: str) -> bool:
+        """True if the stored hash is not in the current scheme and pepper version."""
+        return not stored_hash.startswith(f"{HMAC_SCHEME}${self.current_version}$")
+
+    def verify_and_update(self, secret: str, stored_hash: str) -> Tuple[bool, Optional[str]]:
+        """Verify, returning a replacement hash when the stored one is outdated."""
+        if not self.verify(secret, stored_hash):
+            return False, None
+        if self.needs_update(stored_hash):
+            return True, self.hash(secret)
+        return True, None
+
+
+card_secret_hasher = CardSecretHasher(
+    peppers={**settings.card_secret_old_peppers, settings.card_secret_pepper_version: settings.card_secret_pepper},
+    current_version=settings.card_secret_pepper_version,
+    legacy_verify=hashing_pool.verify,
+)
@@ -1,3 +1,5 @@
+from typing import Dict, Union
+
 from pydantic_settings import BaseSettings
 
 
@@ -6,6 +8,65 @@ class Settings(BaseSettings):
     jwt_secret: str = "change-me-in-production"
     access_token_expire_minutes: int = 30
 
+    # SQLite storage profile (see SQLITE_PROFILES in app/db/session.py);
+    # sqlite_pragmas overrides individual pragmas of the chosen profile
+    sqlite_profile: str = "production"
+    sqlite_pragmas: Dict[str, Union[int, str]] = {}
+    sqlite_lock_retries: int = 5
+    sqlite_lock_backoff_ms: int = 25
+    db_pool_size: int = 20
+    db_max_overflow: int = 20
+
+    # Verified-token cache (see app/core/security.py)
+    token_cache_enabled: bool = True
+    token_cache_size: int = 10_000
+
+    # Keyset pagination for GET /transactions
+    transactions_page_size: int = 100
+    transactions_max_page_size: int = 1000
+    export_chunk_size: int = 1000
+
+    # Responses at least this many bytes are gzipped for clients that accept it; 0 turns gzip off
+    gzip_minimum_size: int = 1000
+
+    # Generated statements kept in-process (see app/services/statements.py)
+    statement_cache_size: int = 10_000
+    statement_cache_ttl_seconds: int = 300
+
+    # GET /insights results kept in-process (see app/services/insights.py)
+    insights_cache_size: int = 1_000
+    insights_cache_ttl_seconds: int = 30
+
+    # Group commit: one writer thread batches money-moving writes (app/db/group_commit.py)
+    group_commit_enabled: bool = False
+    group_commit_window_ms: float = 2.0
+    group_commit_max_batch: int = 64
+
+    # Largest accepted POST /journal entry
+    journal_max_legs: int = 5_000
+
+    # Idempotency-Key records on money-moving endpoints
+    idempotency_ttl_hours: int = 24
+    idempotency_cache_size: int = 10_000
+
+    # Offline batch jobs (python -m app.cli ...)
+    batch_workers: int = 2
+    batch_partition_size: int = 500
+
+    # Authenticated-principal cache (see app/api/deps.py)
+    principal_cache_size: int = 10_000
+    principal_cache_ttl_seconds: int = 60
+
+    # bcrypt process pool (see app/core/hashing.py); 0 workers hashes inline
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 16
+
+    # Keyed-HMAC pepper for card secrets (see app/core/card_secrets.py).
+    # Rotate by bumping the version and moving the old pepper into old_peppers.
+    card_secret_pepper: str = "change-me-in-production"
+    card_secret_pepper_version: int = 1
+    card_secret_old_peppers: Dict[int, str] = {}
+
     class Config:
         env_file = ".env"
 
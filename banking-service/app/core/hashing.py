@@ -0,0 +1,133 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+
+class HashingPoolBusy(Exception):
+    """Raised when the hashing pool already has max_pending jobs queued."""
+
+
+class HashingPool:
+    """Bounded process pool that runs bcrypt work away from the request threads.
+
+    At most ``max_pending`` jobs may be queued or running at once; further
+    submissions fail fast with HashingPoolBusy instead of parking more server
+    threads behind a login storm. ``workers=0`` hashes inline in the caller.
+
+    If a worker dies (OOM, kill) the executor is broken for good: it is
+    dropped and the next submission starts a fresh one. Jobs that were in
+    flight at the time fail with BrokenProcessPool.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork a process that is already running server threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken executor so the next submission builds a new one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _done(self, executor: ProcessPoolExecutor, future: Future) -> None:
+        failure = None if future.cancelled() else future.exception()
+        with self._lock:
+            self._pending -= 1
+            if failure is None and not future.cancelled():
+                self.completed += 1
+        if isinstance(failure, BrokenProcessPool):
+            self._discard(executor)
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queue fn(*args) on the pool, or raise HashingPoolBusy if the queue is full."""
+        if self.workers <= 0:
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+
+        executor = self._get_executor()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingPoolBusy("Password hashing queue is full")
+            self._pending += 1
+        try:
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                # A worker died since the last job; retry once on a fresh pool
+                self._discard(executor)
+                executor = self._get_executor()
+                future = executor.submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(partial(self._done, executor))
+        return future
+
+    def hash(self, password: str) -> str:
+        """Hash a password on the pool, blocking only the calling thread."""
+        return self.submit(get_password_hash, password).result()
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the pool, blocking only the calling thread."""
+        return self.submit(verify_password, plain_password, hashed_password).result()
+
+    async def ahash(self, password: str) -> str:
+        """Awaitable variant of hash() for async handlers."""
+        return await asyncio.wrap_future(self.submit(get_password_hash, password))
+
+    async def averify(self, plain_password: str, hashed_password: str) -> bool:
+        """Awaitable variant of verify() for async handlers."""
+        return await asyncio.wrap_future(self.submit(verify_password, plain_password, hashed_password))
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; the pool restarts lazily on next use."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Return queue counters suitable for monitoring."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+hashing_pool = HashingPool(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
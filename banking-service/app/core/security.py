@@ -1,13 +1,22 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# sha256(token) -> verified claims; each entry expires at the token's exp
+token_cache = TTLCache(
+    maxsize=settings.token_cache_size if settings.token_cache_enabled else 0,
+    ttl=settings.access_token_expire_minutes * 60,
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -33,9 +42,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT access token."""
+    """Decode and verify a JWT access token, reusing earlier verifications."""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=["HS256"])
-        return payload
     except JWTError:
         return None
+
+    token_cache.set(key, payload, ttl=payload.get("exp", 0) - time.time())
+    return dict(payload)
@@ -0,0 +1,162 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.db.session import begin_immediate, engine
+
+
+class _Op(NamedTuple):
+    fn: Callable[..., Any]
+    args: tuple
+    future: Future
+
+
+class GroupCommitWriter:
+    """Single writer thread that commits many operations per SQLite transaction.
+
+    Callers submit ``fn(session, *args, commit=False)`` units of work. The
+    writer collects them for up to ``window_ms`` (or ``max_batch`` ops), runs
+    each in its own SAVEPOINT inside one BEGIN IMMEDIATE transaction, commits
+    once, and then resolves every caller's future with that op's result or
+    exception. An op that raises is rolled back alone; if the commit itself
+    fails, every op in the batch fails with that error and nothing is written.
+    """
+
+    def __init__(self, bind: Engine, window_ms: float, max_batch: int) -> None:
+        self.bind = bind
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[_Op]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.ops = 0
+        self.failed_batches = 0
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="group-commit-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Queue fn(session, *args, commit=False) for the next batch."""
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put(_Op(fn, args, future))
+        return future
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Submit and wait for the op's own result (or exception)."""
+        return self.submit(fn, *args).result()
+
+    def _take_batch(self) -> List[_Op]:
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                op = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if op is None:
+                self._queue.put(None)  # finish this batch, then stop
+                break
+            batch.append(op)
+        return batch
+
+    def _apply(self, batch: List[_Op]) -> None:
+        outcomes = []
+        try:
+            with Session(self.bind) as session:
+                begin_immediate(session)
+                for op in batch:
+                    try:
+                        with session.begin_nested():
+                            outcomes.append((op, op.fn(session, *op.args, commit=False), None))
+                    except Exception as exc:
+                        outcomes.append((op, None, exc))
+                session.commit()
+        except Exception as exc:
+            self.failed_batches += 1
+            for op in batch:
+                op.future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.ops += len(batch)
+        for op, result, exc in outcomes:
+            if exc is None:
+                op.future.set_result(result)
+            else:
+                op.future.set_exception(exc)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            self._apply(batch)
+
+    def shutdown(self) -> None:
+        """Apply everything already queued, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def stats(self) -> Dict[str, float]:
+        """Return counters suitable for monitoring."""
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "ops": self.ops,
+            "failed_batches": self.failed_batches,
+        }
+
+
+# Session.info flag: the request commits run_write's work itself, e.g. with its Idempotency-Key record
+CALLER_COMMITS = "caller_commits"
+
+# Only created when GROUP_COMMIT_ENABLED is set
+group_writer: Optional[GroupCommitWriter] = None
+if settings.group_commit_enabled:
+    group_writer = GroupCommitWriter(engine, settings.group_commit_window_ms, settings.group_commit_max_batch)
+
+
+def run_write(session: Session, fn: Callable[..., Any], *args: Any) -> Any:
+    """Run a money-moving unit of work ``fn(session, *args)``.
+
+    Inline on the request's session by default. With group commit enabled it
+    goes through the writer instead. A session flagged with ``CALLER_COMMITS``
+    always runs inline and uncommitted, because its caller still has more to
+    write in the same transaction.
+    """
+    if session.info.get(CALLER_COMMITS):
+        return fn(session, *args, commit=False)
+    if group_writer is None:
+        return fn(session, *args)
+    return group_writer.run(fn, *args)
+
+
+async def run_write_async(session: AsyncSession, fn: Callable[..., Any], *args: Any) -> Any:
+    """Async counterpart of run_write, always inline on the async engine's connection.
+
+    The group-commit writer would block the event loop while the caller
+    waits for its batch, so async handlers never go through it.
+    """
+    commit = not session.info.get(CALLER_COMMITS)
+    return await session.run_sync(lambda sync_session: fn(sync_session, *args, commit=commit))
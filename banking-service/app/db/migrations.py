@@ -0,0 +1,170 @@
+"""Versioned schema migrations for existing SQLite databases.
+
+``create_all`` only creates missing tables; it never adds indexes or columns
+to tables that already exist. Each migration here upgrades a live database
+by one version and must be idempotent, because on a fresh database
+``create_all`` has already built the latest schema before the runner starts.
+The applied version is tracked in SQLite's ``PRAGMA user_version``.
+"""
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _hot_path_indexes(conn: Connection) -> None:
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_transaction_account_created '
+        'ON "transaction" (account_id, created_at, id)'
+    ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_account_user_id ON account (user_id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_card_account_id ON card (account_id)"))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_statement_account_period ON statement (account_id, period_start)"
+    ))
+
+
+def _add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    columns = {row[1] for row in conn.execute(text(f'PRAGMA table_info("{table}")'))}
+    if column not in columns:
+        conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl}'))
+
+
+def _statement_watermarks(conn: Connection) -> None:
+    # Rows without a watermark are recomputed the first time they serve as an anchor
+    _add_column(conn, "statement", "last_transaction_id", "INTEGER")
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_transaction_account_id ON "transaction" (account_id)'))
+
+
+def _unique_statements(conn: Connection) -> None:
+    # Earlier code inserted a new row on every request; keep the newest per month
+    conn.execute(text(
+        "DELETE FROM statement WHERE id NOT IN "
+        "(SELECT MAX(id) FROM statement GROUP BY account_id, period_start)"
+    ))
+    conn.execute(text("DROP INDEX IF EXISTS ix_statement_account_period"))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_statement_account_period ON statement (account_id, period_start)"
+    ))
+
+
+def _running_balances(conn: Connection) -> None:
+    # Existing rows stay NULL until `python -m app.cli backfill-balances` fills them in
+    _add_column(conn, "transaction", "balance_after_cents", "INTEGER")
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_transaction_missing_balance ON "transaction" (account_id) '
+        "WHERE balance_after_cents IS NULL"
+    ))
+
+
+def _transaction_search(conn: Connection) -> None:
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_transaction_account_type_created "
+        'ON "transaction" (account_id, type, created_at, id)'
+    ))
+    # Full-text index over descriptions, stored by the transaction table itself
+    # (external content) and kept in sync by triggers. Rows without a
+    # description are never indexed.
+    conn.execute(text(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS transaction_fts USING fts5("
+        "description, content='transaction', content_rowid='id')"
+    ))
+    conn.execute(text(
+        'CREATE TRIGGER IF NOT EXISTS transaction_fts_insert AFTER INSERT ON "transaction" BEGIN '
+        "INSERT INTO transaction_fts (rowid, description) "
+        "SELECT new.id, new.description WHERE new.description IS NOT NULL; "
+        "END"
+    ))
+    conn.execute(text(
+        'CREATE TRIGGER IF NOT EXISTS transaction_fts_delete AFTER DELETE ON "transaction" BEGIN '
+        "INSERT INTO transaction_fts (transaction_fts, rowid, description) "
+        "SELECT 'delete', old.id, old.description WHERE old.description IS NOT NULL; "
+        "END"
+    ))
+    conn.execute(text(
+        'CREATE TRIGGER IF NOT EXISTS transaction_fts_update AFTER UPDATE OF description ON "transaction" BEGIN '
+        "INSERT INTO transaction_fts (transaction_fts, rowid, description) "
+        "SELECT 'delete', old.id, old.description WHERE old.description IS NOT NULL; "
+        "INSERT INTO transaction_fts (rowid, description) "
+        "SELECT new.id, new.description WHERE new.description IS NOT NULL; "
+        "END"
+    ))
+    # Index the existing history the same way the insert trigger would
+    conn.execute(text(
+        "INSERT INTO transaction_fts (rowid, description) "
+        'SELECT id, description FROM "transaction" WHERE description IS NOT NULL'
+    ))
+
+
+def _account_versions(conn: Connection) -> None:
+    _add_column(conn, "account", "version", "INTEGER NOT NULL DEFAULT 0")
+
+
+def _missing_balance_index(conn: Connection) -> None:
+    # Migration 4's index was on account_id alone, which the planner passed over
+    # for ix_transaction_account_id; the IS NULL term needs its own column
+    conn.execute(text("DROP INDEX IF EXISTS ix_transaction_missing_balance"))
+    conn.execute(text(
+        'CREATE INDEX ix_transaction_missing_balance ON "transaction" (account_id, balance_after_cents) '
+        "WHERE balance_after_cents IS NULL"
+    ))
+
+
+def _month_rollups(conn: Connection) -> None:
+    # create_all added account_month_rollup empty to databases that predate it,
+    # and postings since then only rolled up their own months. Flag every
+    # account; `python -m app.cli rebuild-rollups` clears the flag partition by
+    # partition, and until then reads aggregate the account's raw history.
+    _add_column(conn, "account", "rollups_pending", "INTEGER NOT NULL DEFAULT 0")
+    conn.execute(text("UPDATE account SET rollups_pending = 1"))
+
+
+def _rollup_flags(conn: Connection) -> None:
+    # An earlier migration 8 rebuilt the rollups in place, so databases that
+    # ran it are complete and only lack the column
+    _add_column(conn, "account", "rollups_pending", "INTEGER NOT NULL DEFAULT 0")
+
+
+def _idempotency_reservations(conn: Connection) -> None:
+    # Keys used to be reserved before the handler ran and filled in after it;
+    # a crash in between left a record that can never be replayed
+    conn.execute(text("DELETE FROM idempotencyrecord WHERE status_code IS NULL"))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "indexes for per-account hot queries", _hot_path_indexes),
+    Migration(2, "statement balance-forward watermarks", _statement_watermarks),
+    Migration(3, "one statement per account and month", _unique_statements),
+    Migration(4, "running balance on every transaction", _running_balances),
+    Migration(5, "transaction search: type index and full-text descriptions", _transaction_search),
+    Migration(6, "account change counters for conditional GETs", _account_versions),
+    Migration(7, "missing-balance index usable by the backfill check", _missing_balance_index),
+    Migration(8, "month rollups for history posted before rollups existed", _month_rollups),
+    Migration(9, "drop idempotency keys reserved without a response", _idempotency_reservations),
+    Migration(10, "rollup backfill flag on accounts", _rollup_flags),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(conn: Connection) -> int:
+    return conn.execute(text("PRAGMA user_version")).scalar()
+
+
+def run_migrations(engine: Engine) -> List[int]:
+    """Apply pending migrations in order, one transaction each; returns the versions applied."""
+    applied = []
+    for migration in MIGRATIONS:
+        with engine.begin() as conn:
+            if current_version(conn) >= migration.version:
+                continue
+            migration.apply(conn)
+            conn.execute(text(f"PRAGMA user_version = {migration.version}"))
+        applied.append(migration.version)
+    return applied
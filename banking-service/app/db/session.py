@@ -1,20 +1,218 @@
+import asyncio
+import functools
+import inspect
+import random
+import sqlite3
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence, TypeVar, Union
+
+from sqlalchemy import event, insert
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import create_engine, SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
+from app.db.migrations import run_migrations
+from app.models import account, card, idempotency, rollup, statement, transaction, user  # noqa: F401  (register tables)
+
+ModelT = TypeVar("ModelT", bound=SQLModel)
+
+# Async drivers and the sync driver serving the same database
+ASYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+}
+
+# PRAGMAs applied to every new SQLite connection, by profile name
+SQLITE_PROFILES: Dict[str, Dict[str, Union[int, str]]] = {
+    # SQLite's own defaults: rollback journal, synchronous=FULL (pysqlite waits 5s on locks)
+    "legacy": {},
+    # Readers never block writers; fsync only at checkpoints; wait on locks
+    "production": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -64000,  # KiB, i.e. 64 MiB
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+    # As production, but every commit is fsynced
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def split_database_url(database_url: str) -> tuple:
+    """Return (sync_url, async_url); async_url is None unless an async driver is named."""
+    url = make_url(database_url)
+    sync_driver = ASYNC_DRIVERS.get(url.drivername)
+    if sync_driver is None:
+        return url, None
+    return url.set(drivername=sync_driver), url
+
+
+def sqlite_pragmas(profile: str, overrides: Optional[Dict[str, Union[int, str]]] = None) -> Dict[str, Union[int, str]]:
+    """Resolve a storage profile name plus per-pragma overrides."""
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile {profile!r}; choose from {sorted(SQLITE_PROFILES)}")
+    return {**SQLITE_PROFILES[profile], **(overrides or {})}
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Dict[str, Union[int, str]]) -> None:
+    """Run the given PRAGMAs on every new DBAPI connection of engine."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False},  # Needed for SQLite
-    echo=False,
-)
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
 
 
-def init_db() -> None:
-    """Create database tables."""
-    SQLModel.metadata.create_all(engine)
+def _pool_args(url: URL) -> dict:
+    # In-memory SQLite uses a single-connection pool that takes no sizing
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {"pool_size": settings.db_pool_size, "max_overflow": settings.db_max_overflow}
+
+
+def build_engine(database_url: Union[str, URL], profile: Optional[str] = None) -> Engine:
+    """Create a sync engine with the configured storage profile and pool sizing."""
+    url = make_url(database_url)
+    new_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},  # Needed for SQLite
+        echo=False,
+        **_pool_args(url),
+    )
+    apply_sqlite_pragmas(new_engine, sqlite_pragmas(profile or settings.sqlite_profile, settings.sqlite_pragmas))
+    return new_engine
+
+
+sync_url, async_url = split_database_url(settings.database_url)
+
+engine = build_engine(sync_url)
+
+# Only created when DATABASE_URL names an async driver, e.g. sqlite+aiosqlite:///./bank.db
+async_engine: Optional[AsyncEngine] = None
+if async_url is not None:
+    async_engine = create_async_engine(async_url, echo=False, **_pool_args(async_url))
+    apply_sqlite_pragmas(async_engine.sync_engine, sqlite_pragmas(settings.sqlite_profile, settings.sqlite_pragmas))
+
+
+def init_db(bind: Optional[Engine] = None) -> None:
+    """Create missing tables, then bring existing ones up to date."""
+    bind = bind or engine
+    SQLModel.metadata.create_all(bind)
+    run_migrations(bind)
 
 
 def get_session():
     """Get database session."""
     with Session(engine) as session:
         yield session
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """Get async database session (requires an async DATABASE_URL)."""
+    if async_engine is None:
+        raise RuntimeError("DATABASE_URL does not use an async driver")
+    # Objects stay readable after commit without an implicit (blocking) refresh
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+def begin_immediate(session: Session) -> None:
+    """Take SQLite's write lock now instead of at the transaction's first write.
+
+    Everything the transaction reads afterwards is already under the write
+    lock, so it can never fail to upgrade from a read lock midway. A no-op on
+    other databases or when the connection is already inside a transaction.
+    """
+    connection = session.connection()
+    if connection.dialect.name != "sqlite":
+        return
+    # The sqlite3 connection itself, also behind aiosqlite's adapter (which has no in_transaction)
+    if connection.connection.driver_connection.in_transaction:
+        return
+    connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def insert_returning(session: Session, objects: Sequence[ModelT]) -> List[ModelT]:
+    """INSERT new model instances in one statement, filling in their ids from RETURNING.
+
+    The instances are never added to the session, so the commit does not
+    expire them and no refresh is needed to read them back. All objects must
+    be of the same model.
+    """
+    if not objects:
+        return []
+    table = type(objects[0]).__table__
+    rows = [obj.model_dump(exclude={"id"}) for obj in objects]
+    ids = session.connection().execute(insert(table).returning(table.c.id), rows).scalars().all()
+    # One multi-row INSERT: SQLite hands out ascending rowids in VALUES order,
+    # so sorting the returned ids restores parameter order without asking
+    # SQLAlchemy for sort_by_parameter_order (which degrades to one INSERT per row)
+    for obj, row_id in zip(objects, sorted(ids)):
+        obj.id = row_id
+    return list(objects)
+
+
+def is_lock_error(exc: OperationalError) -> bool:
+    """True if SQLite reported lock contention (SQLITE_BUSY / SQLITE_LOCKED)."""
+    if not isinstance(exc.orig, sqlite3.OperationalError):
+        return False
+    message = str(exc.orig).lower()
+    return "locked" in message or "busy" in message
+
+
+def _lock_backoff(attempt: int) -> float:
+    delay = settings.sqlite_lock_backoff_ms / 1000 * (2 ** attempt)
+    return delay * random.uniform(0.5, 1.5)
+
+
+def retry_on_lock(func: Callable) -> Callable:
+    """Re-run a write handler with jittered exponential backoff on SQLite lock contention.
+
+    The wrapped handler must take its Session as the ``session`` keyword and be
+    safe to re-run from the top: on a lock error the session is rolled back and
+    the whole unit of work is retried, up to ``settings.sqlite_lock_retries`` times.
+    ``async def`` handlers on an AsyncSession are retried the same way.
+    """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            session: AsyncSession = kwargs["session"]
+            for attempt in range(settings.sqlite_lock_retries + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except OperationalError as exc:
+                    await session.rollback()
+                    if not is_lock_error(exc) or attempt == settings.sqlite_lock_retries:
+                        raise
+                    await asyncio.sleep(_lock_backoff(attempt))
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        session: Session = kwargs["session"]
+        for attempt in range(settings.sqlite_lock_retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as exc:
+                session.rollback()
+                if not is_lock_error(exc) or attempt == settings.sqlite_lock_retries:
+                    raise
+                time.sleep(_lock_backoff(attempt))
+
+    return wrapper
@@ -1,7 +1,16 @@
-from fastapi import FastAPI
+from concurrent.futures.process import BrokenProcessPool
 
+from fastapi import FastAPI, Request, status
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+from app.core.hashing import HashingPoolBusy, hashing_pool
+from app.db import group_commit
+from app.db import session as db_session
 from app.db.session import init_db
-from app.api.v1 import auth, users, accounts, transactions, transfers, cards, statements
+from app.api.v1 import auth, users, accounts, transactions, transfers, journal, cards, statements, insights, metrics
 
 
 def create_app() -> FastAPI:
@@ -15,14 +24,40 @@ def create_app() -> FastAPI:
     # Initialize database
     init_db()
     
+    # A job in flight when a hashing worker died: the pool is rebuilt on the next submission
+    @app.exception_handler(BrokenProcessPool)
+    @app.exception_handler(HashingPoolBusy)
+    def hashing_pool_busy_handler(request: Request, exc: Exception) -> JSONResponse:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Server busy, please retry"},
+            headers={"Retry-After": "1"},
+        )
+
+    if settings.gzip_minimum_size > 0:
+        app.add_middleware(GZipMiddleware, minimum_size=settings.gzip_minimum_size)
+
+    app.add_event_handler("shutdown", hashing_pool.shutdown)
+    if group_commit.group_writer is not None:
+        app.add_event_handler("shutdown", group_commit.group_writer.shutdown)
+    
+    # With an async DATABASE_URL the async twins are matched first, shadowing the sync routes
+    if db_session.async_engine is not None:
+        app.include_router(accounts.async_router, prefix="/api/v1/accounts", include_in_schema=False)
+        app.include_router(transactions.async_router, prefix="/api/v1/transactions", include_in_schema=False)
+        app.include_router(transfers.async_router, prefix="/api/v1/transfers", include_in_schema=False)
+
     # Include routers
     app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
     app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
     app.include_router(accounts.router, prefix="/api/v1/accounts", tags=["accounts"])
     app.include_router(transactions.router, prefix="/api/v1/transactions", tags=["transactions"])
     app.include_router(transfers.router, prefix="/api/v1/transfers", tags=["transfers"])
+    app.include_router(journal.router, prefix="/api/v1/journal", tags=["journal"])
     app.include_router(cards.router, prefix="/api/v1/cards", tags=["cards"])
     app.include_router(statements.router, prefix="/api/v1/statements", tags=["statements"])
+    app.include_router(insights.router, prefix="/api/v1/insights", tags=["insights"])
+    app.include_router(metrics.router, prefix="/api/v1/metrics", tags=["metrics"])
     
     return app
 
@@ -4,6 +4,10 @@ from sqlmodel import SQLModel, Field
 
 class Account(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
     type: str = Field(default="checking")
     balance_cents: int = Field(default=0)
+    # Bumped by every write to the account, its postings or its cards; feeds the list ETags
+    version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # History predates the monthly rollups; reads aggregate raw postings until rebuild-rollups clears it
+    rollups_pending: bool = Field(default=False, sa_column_kwargs={"server_default": "0"})
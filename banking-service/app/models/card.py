@@ -4,7 +4,7 @@ from sqlmodel import SQLModel, Field
 
 class Card(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    account_id: int = Field(foreign_key="account.id")
+    account_id: int = Field(foreign_key="account.id", index=True)
     brand: str = Field(default="VISA")
     holder_name: str = Field()
     last4: str = Field()
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+
+class IdempotencyRecord(SQLModel, table=True):
+    __table_args__ = (
+        Index("uq_idempotency_user_key", "user_id", "key", unique=True),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    key: str = Field()
+    # sha256 of the endpoint and its parameters; a reused key must match it
+    fingerprint: str = Field()
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    # Written in the same commit as the request's own changes
+    status_code: int = Field()
+    response_body: str = Field()
@@ -0,0 +1,30 @@
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+
+class AccountMonthRollup(SQLModel, table=True):
+    """Per-account monthly totals, updated in the same transaction as each posting."""
+
+    __tablename__ = "account_month_rollup"
+    __table_args__ = (
+        # One row per account and month; also serves multi-month range reads
+        Index("uq_rollup_account_month", "account_id", "month", unique=True),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    account_id: int = Field(foreign_key="account.id")
+    month: str = Field()  # YYYY-MM, from the transactions' created_at (UTC)
+    deposits_cents: int = Field(default=0)
+    deposits_count: int = Field(default=0)
+    withdrawals_cents: int = Field(default=0)
+    withdrawals_count: int = Field(default=0)
+    transfers_in_cents: int = Field(default=0)
+    transfers_in_count: int = Field(default=0)
+    transfers_out_cents: int = Field(default=0)
+    transfers_out_count: int = Field(default=0)
+    card_charges_cents: int = Field(default=0)
+    card_charges_count: int = Field(default=0)
+    card_refunds_cents: int = Field(default=0)
+    card_refunds_count: int = Field(default=0)
+    net_cents: int = Field(default=0)
@@ -1,9 +1,15 @@
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 
 class Statement(SQLModel, table=True):
+    __table_args__ = (
+        # One statement per account and month
+        Index("uq_statement_account_period", "account_id", "period_start", unique=True),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     account_id: int = Field(foreign_key="account.id")
     period_start: datetime = Field()
@@ -11,3 +17,5 @@ class Statement(SQLModel, table=True):
     generated_at: datetime = Field(default_factory=datetime.utcnow)
     opening_balance_cents: int = Field()
     closing_balance_cents: int = Field()
+    # Highest transaction id of the account covered when the balances were computed
+    last_transaction_id: Optional[int] = None
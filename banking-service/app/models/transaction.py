@@ -1,13 +1,39 @@
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field
 
+# How each transaction type moves the account balance
+SIGN_BY_TYPE: Dict[str, int] = {
+    "deposit": 1,
+    "transfer_in": 1,
+    "card_refund": 1,
+    "withdraw": -1,
+    "transfer_out": -1,
+    "card_charge": -1,
+}
+
 
 class Transaction(SQLModel, table=True):
+    __table_args__ = (
+        # Per-account history in time order; id breaks ties between equal timestamps
+        Index("ix_transaction_account_created", "account_id", "created_at", "id"),
+        # Search filtered by type, still in time order
+        Index("ix_transaction_account_type_created", "account_id", "type", "created_at", "id"),
+        # Accounts whose running balances still need the backfill job. The second
+        # column lets the IS NULL term pin this index over ix_transaction_account_id.
+        Index(
+            "ix_transaction_missing_balance", "account_id", "balance_after_cents",
+            sqlite_where=text("balance_after_cents IS NULL"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    account_id: int = Field(foreign_key="account.id")
+    account_id: int = Field(foreign_key="account.id", index=True)
     type: str = Field()  # deposit, withdraw, transfer_in, transfer_out, card_charge, card_refund
     amount_cents: int = Field()
     created_at: datetime = Field(default_factory=datetime.utcnow)
     description: Optional[str] = None
     counterparty_account_id: Optional[int] = None
+    # Account balance right after this posting; NULL on rows written before it was tracked
+    balance_after_cents: Optional[int] = None
@@ -1,3 +1,5 @@
+from datetime import datetime
+from typing import List
 from pydantic import BaseModel
 
 
@@ -9,3 +11,31 @@ class AccountOut(BaseModel):
     id: int
     type: str
     balance_cents: int
+
+
+class BalanceOut(BaseModel):
+    account_id: int
+    at: datetime
+    balance_cents: int
+
+
+class MonthSummaryOut(BaseModel):
+    month: str  # YYYY-MM
+    deposits_cents: int
+    deposits_count: int
+    withdrawals_cents: int
+    withdrawals_count: int
+    transfers_in_cents: int
+    transfers_in_count: int
+    transfers_out_cents: int
+    transfers_out_count: int
+    card_charges_cents: int
+    card_charges_count: int
+    card_refunds_cents: int
+    card_refunds_count: int
+    net_cents: int
+
+
+class AccountSummaryOut(BaseModel):
+    account_id: int
+    months: List[MonthSummaryOut]
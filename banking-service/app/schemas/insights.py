@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class TypeTotalOut(BaseModel):
+    type: str
+    total_cents: int
+    count: int
+
+
+class PeriodTotalOut(BaseModel):
+    period: str  # YYYY-MM-DD (day, week starting Monday) or YYYY-MM (month)
+    inflow_cents: int
+    outflow_cents: int
+    net_cents: int
+    count: int
+
+
+class CounterpartyTotalOut(BaseModel):
+    counterparty_account_id: int
+    sent_cents: int
+    received_cents: int
+    count: int
+
+
+class InsightsOut(BaseModel):
+    account_ids: List[int]
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    interval: str
+    by_type: List[TypeTotalOut]
+    by_period: List[PeriodTotalOut]
+    by_counterparty: List[CounterpartyTotalOut]
@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+from app.schemas.transaction import TransactionOut
+
+
+class JournalLeg(BaseModel):
+    account_id: int
+    amount_cents: int  # negative debits the account, positive credits it
+
+
+class JournalRequest(BaseModel):
+    legs: List[JournalLeg]  # must sum to zero
+    description: Optional[str] = None
+
+
+class JournalOut(BaseModel):
+    created_at: datetime
+    total_cents: int  # sum of the debits
+    transactions: List[TransactionOut]  # one per leg, in request order
@@ -0,0 +1,138 @@
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.models.transaction import Transaction
+from app.services.batch import chunked
+from app.services.ledger import signed_amount
+
+
+def missing_balances_query(account_id: int):
+    """The account's postings that have no running balance yet: a seek on ix_transaction_missing_balance."""
+    return (
+        select(Transaction.id)
+        .where(Transaction.account_id == account_id, Transaction.balance_after_cents.is_(None))
+    )
+
+
+def _missing_balances(account_id: int):
+    return missing_balances_query(account_id).exists()
+
+
+def _balance_before(account_id: int, moment: datetime, inclusive: bool):
+    """Running balance of the account's last posting before moment: one seek on ix_transaction_account_created."""
+    bound = Transaction.created_at <= moment if inclusive else Transaction.created_at < moment
+    return (
+        select(Transaction.balance_after_cents)
+        .where(Transaction.account_id == account_id, bound)
+        .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def _summed_balance(session: Session, account_id: int, moment: datetime, inclusive: bool) -> int:
+    bound = Transaction.created_at <= moment if inclusive else Transaction.created_at < moment
+    stmt = select(func.coalesce(func.sum(signed_amount()), 0)).where(Transaction.account_id == account_id, bound)
+    return session.execute(stmt).scalar_one()
+
+
+def balance_at(session: Session, account_id: int, at: datetime, inclusive: bool = True) -> int:
+    """The account's balance as of ``at`` (including postings at exactly ``at`` unless inclusive is false).
+
+    Read from the running balance of the last posting before ``at``. Until
+    the backfill job has filled in every row of the account, falls back to
+    summing its history.
+    """
+    missing, balance = session.execute(
+        select(_missing_balances(account_id), _balance_before(account_id, at, inclusive))
+    ).one()
+    if missing:
+        return _summed_balance(session, account_id, at, inclusive)
+    return balance or 0
+
+
+def period_balances(
+    session: Session,
+    account_id: int,
+    period_start: datetime,
+    period_end: datetime
+) -> Optional[Tuple[int, int, int]]:
+    """(opening, closing, highest transaction id) for [period_start, period_end) from two point lookups.
+
+    All in one round trip. Returns None while the account has postings
+    without a running balance, so the caller can sum the history instead.
+    """
+    missing, opening, closing, last_id = session.execute(
+        select(
+            _missing_balances(account_id),
+            _balance_before(account_id, period_start, inclusive=False),
+            _balance_before(account_id, period_end, inclusive=False),
+            select(func.max(Transaction.id)).where(Transaction.account_id == account_id).scalar_subquery(),
+        )
+    ).one()
+    if missing:
+        return None
+    return opening or 0, closing or 0, last_id or 0
+
+
+def accounts_missing_balances(session: Session) -> List[int]:
+    """Accounts with at least one posting that has no running balance yet."""
+    stmt = (
+        select(Transaction.account_id)
+        .where(Transaction.balance_after_cents.is_(None))
+        .distinct()
+        .order_by(Transaction.account_id)
+    )
+    return list(session.execute(stmt).scalars())
+
+
+def backfill_running_balances(session: Session, account_ids: Sequence[int]) -> int:
+    """Recompute the running balance of every posting of the given accounts (no commit).
+
+    Balances run in (created_at, id) order from zero, the same order the point
+    lookups read them in, so a backdated row also corrects every row after it.
+    Returns the number of rows written.
+    """
+    running = (
+        select(
+            Transaction.id.label("id"),
+            func.sum(signed_amount()).over(
+                partition_by=Transaction.account_id,
+                order_by=(Transaction.created_at, Transaction.id),
+            ).label("balance"),
+        )
+        .where(Transaction.account_id.in_(account_ids))
+        .subquery()
+    )
+    table = Transaction.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == running.c.id)
+        .values(balance_after_cents=running.c.balance)
+    )
+    return session.connection().execute(stmt).rowcount
+
+
+def run_balance_backfill(
+    engine: Engine,
+    chunk_size: int,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Tuple[int, int]:
+    """Backfill every account that needs it, one commit per chunk of accounts.
+
+    Resumable: a finished chunk no longer shows up as missing. Returns
+    (accounts, rows) backfilled.
+    """
+    with Session(engine) as session:
+        account_ids = accounts_missing_balances(session)
+        rows = 0
+        for done, chunk in enumerate(chunked(account_ids, chunk_size), start=1):
+            rows += backfill_running_balances(session, chunk)
+            session.commit()
+            if progress is not None:
+                progress(min(done * chunk_size, len(account_ids)), len(account_ids))
+    return len(account_ids), rows
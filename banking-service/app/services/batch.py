@@ -0,0 +1,50 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence
+
+from sqlalchemy.engine import Engine
+
+from app.db.session import build_engine
+
+# One engine per database URL in each batch worker process
+_worker_engines: Dict[str, Engine] = {}
+
+
+def worker_engine(database_url: str) -> Engine:
+    """Engine for database_url, created once per process."""
+    engine = _worker_engines.get(database_url)
+    if engine is None:
+        engine = _worker_engines[database_url] = build_engine(database_url)
+    return engine
+
+
+def database_url_of(engine: Engine) -> str:
+    """URL string a worker process can use to reach the same database."""
+    return engine.url.render_as_string(hide_password=False)
+
+
+def chunked(items: Sequence, size: int) -> Iterator[list]:
+    """Split items into consecutive lists of at most size elements."""
+    for offset in range(0, len(items), size):
+        yield list(items[offset:offset + size])
+
+
+def map_partitions(
+    fn: Callable[..., Any],
+    partitions: Iterable[List],
+    workers: int,
+    *args: Any,
+) -> Iterator[Any]:
+    """Yield fn(*args, partition) for each partition, in order.
+
+    ``workers > 0`` runs partitions on a spawn-started process pool, so fn and
+    its arguments must be picklable; ``workers=0`` runs them inline. Workers
+    only read (through ``worker_engine``); the parent does all the writing.
+    """
+    task = partial(fn, *args)
+    if workers <= 0:
+        yield from map(task, partitions)
+        return
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        yield from executor.map(task, partitions)
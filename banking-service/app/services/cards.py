@@ -0,0 +1,14 @@
+from sqlmodel import Session
+
+from app.core.card_secrets import card_secret_hasher
+from app.models.card import Card
+
+
+def verify_card_cvv(session: Session, card: Card, cvv: str) -> bool:
+    """Check a CVV against the card, lazily re-hashing legacy bcrypt hashes."""
+    valid, new_hash = card_secret_hasher.verify_and_update(cvv, card.cvv_hash)
+    if valid and new_hash is not None:
+        card.cvv_hash = new_hash
+        session.add(card)
+        session.commit()
+    return valid
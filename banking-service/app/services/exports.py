@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.models.transaction import Transaction
+
+EXPORT_COLUMNS = ("id", "account_id", "type", "amount_cents", "created_at", "description", "counterparty_account_id")
+
+
+def _iter_rows(
+    bind: Engine,
+    account_id: int,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    chunk_size: int,
+) -> Iterator[list]:
+    """Yield lists of up to chunk_size rows, oldest first, without loading the full history."""
+    statement = (
+        select(*(getattr(Transaction, column) for column in EXPORT_COLUMNS))
+        .where(Transaction.account_id == account_id)
+        .order_by(Transaction.created_at, Transaction.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    if start is not None:
+        statement = statement.where(Transaction.created_at >= start)
+    if end is not None:
+        statement = statement.where(Transaction.created_at < end)
+
+    # The request's session is closed before a streaming body is sent,
+    # so the export reads through a session of its own.
+    with Session(bind) as session:
+        result = session.execute(statement)
+        for partition in result.partitions():
+            yield partition
+
+
+def iter_transactions_ndjson(
+    bind: Engine,
+    account_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    chunk_size: int = 1000,
+) -> Iterator[bytes]:
+    """Stream an account's transactions as newline-delimited JSON, one chunk at a time."""
+    for rows in _iter_rows(bind, account_id, start, end, chunk_size):
+        lines = []
+        for row in rows:
+            record = dict(zip(EXPORT_COLUMNS, row))
+            record["created_at"] = record["created_at"].isoformat()
+            lines.append(json.dumps(record, separators=(",", ":")))
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def iter_transactions_csv(
+    bind: Engine,
+    account_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    chunk_size: int = 1000,
+) -> Iterator[bytes]:
+    """Stream an account's transactions as CSV with a header row, one chunk at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue().encode()
+    for rows in _iter_rows(bind, account_id, start, end, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in row])
+        yield buffer.getvalue().encode()
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.idempotency import IdempotencyRecord
+
+
+class IdempotencyKeyMismatch(Exception):
+    """The key was already used for a different request."""
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    body: str
+
+
+# Completed responses by (user_id, key), so replays skip the database
+response_cache = TTLCache(
+    maxsize=settings.idempotency_cache_size,
+    ttl=settings.idempotency_ttl_hours * 3600,
+)
+
+
+def _cutoff(now: Optional[datetime] = None) -> datetime:
+    return (now or datetime.utcnow()) - timedelta(hours=settings.idempotency_ttl_hours)
+
+
+def find_response(session: Session, user_id: int, key: str, fingerprint: str) -> Optional[StoredResponse]:
+    """Return the stored response for a key, or None if the key is unused (or expired).
+
+    Raises IdempotencyKeyMismatch if the key belongs to a different request.
+    """
+    stored = response_cache.get((user_id, key))
+    if stored is None:
+        stmt = select(IdempotencyRecord).where(
+            IdempotencyRecord.user_id == user_id,
+            IdempotencyRecord.key == key
+        )
+        record = session.exec(stmt).first()
+        if record is None:
+            return None
+        remaining = (record.created_at - _cutoff()).total_seconds()
+        if remaining <= 0:
+            # Past its TTL but not purged yet: the key is free again
+            session.delete(record)
+            session.commit()
+            return None
+        stored = StoredResponse(record.fingerprint, record.status_code, record.response_body)
+        # Cache only for the record's remaining lifetime, so every process frees the key together
+        response_cache.set((user_id, key), stored, ttl=remaining)
+
+    if stored.fingerprint != fingerprint:
+        raise IdempotencyKeyMismatch()
+    return stored
+
+
+def store_response(session: Session, user_id: int, key: str, response: StoredResponse) -> None:
+    """Commit the key's record, response included, together with the request's writes.
+
+    The handler must have left its writes uncommitted: a committed key then
+    always has a response to replay, and a concurrent duplicate in another
+    process fails this commit on the unique index instead of writing twice.
+    """
+    session.add(IdempotencyRecord(
+        user_id=user_id,
+        key=key,
+        fingerprint=response.fingerprint,
+        status_code=response.status_code,
+        response_body=response.body
+    ))
+    session.commit()
+    response_cache.set((user_id, key), response)
+
+
+def purge_expired(session: Session, now: Optional[datetime] = None) -> int:
+    """Delete records older than the TTL; returns how many were removed."""
+    result = session.execute(delete(IdempotencyRecord).where(IdempotencyRecord.created_at < _cutoff(now)))
+    session.commit()
+    response_cache.clear()
+    return result.rowcount
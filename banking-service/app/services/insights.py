@@ -0,0 +1,240 @@
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.rollup import AccountMonthRollup
+from app.models.transaction import SIGN_BY_TYPE, Transaction
+from app.services.rollups import ROLLUP_PREFIX_BY_TYPE, accounts_pending_rollups
+
+# Bucket label per interval: YYYY-MM-DD for days and weeks (weeks start on Monday), YYYY-MM for months
+PERIODS = {
+    "day": func.date(Transaction.created_at),
+    "week": func.date(Transaction.created_at, "weekday 0", "-6 days"),
+    "month": func.strftime("%Y-%m", Transaction.created_at),
+}
+
+TRANSFER_TYPES = ("transfer_in", "transfer_out")
+
+# Finished results, keyed by (account ids, start, end, interval). Short-lived:
+# postings made after a result was computed show up once it expires.
+insights_cache = TTLCache(
+    maxsize=settings.insights_cache_size,
+    ttl=settings.insights_cache_ttl_seconds,
+)
+
+
+class TypeTotal(NamedTuple):
+    type: str
+    total_cents: int
+    count: int
+
+
+class PeriodTotal(NamedTuple):
+    period: str
+    inflow_cents: int
+    outflow_cents: int
+    net_cents: int
+    count: int
+
+
+class CounterpartyTotal(NamedTuple):
+    counterparty_account_id: int
+    sent_cents: int
+    received_cents: int
+    count: int
+
+
+class Insights(NamedTuple):
+    by_type: List[TypeTotal]
+    by_period: List[PeriodTotal]
+    by_counterparty: List[CounterpartyTotal]
+
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month_start: datetime) -> datetime:
+    if month_start.month == 12:
+        return month_start.replace(year=month_start.year + 1, month=1)
+    return month_start.replace(month=month_start.month + 1)
+
+
+def _whole_months(
+    start: Optional[datetime], end: Optional[datetime]
+) -> Optional[Tuple[Optional[datetime], Optional[datetime]]]:
+    """The span of calendar months lying entirely inside [start, end), or None if there are none."""
+    first = None
+    if start is not None:
+        first = start if start == _month_start(start) else _next_month(_month_start(start))
+    last = _month_start(end) if end is not None else None
+    if first is not None and last is not None and first >= last:
+        return None
+    return first, last
+
+
+def _raw_rows(
+    session: Session,
+    account_ids: Sequence[int],
+    interval: str,
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> List[tuple]:
+    """(period, type, cents, count) aggregated from raw history: one range read per account."""
+    period = PERIODS[interval].label("period")
+    stmt = (
+        select(period, Transaction.type, func.sum(Transaction.amount_cents), func.count())
+        .where(Transaction.account_id.in_(account_ids))
+        .group_by(period, Transaction.type)
+    )
+    if start is not None:
+        stmt = stmt.where(Transaction.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(Transaction.created_at < end)
+    return session.exec(stmt).all()
+
+
+def _rollup_rows(
+    session: Session,
+    account_ids: Sequence[int],
+    first: Optional[datetime],
+    last: Optional[datetime],
+) -> List[tuple]:
+    """(month, type, cents, count) for whole months [first, last) from the monthly rollups.
+
+    Accounts still flagged rollups_pending are aggregated from raw history.
+    """
+    pending = accounts_pending_rollups(session, account_ids)
+    rows = _raw_rows(session, pending, "month", first, last) if pending else []
+    account_ids = [account_id for account_id in account_ids if account_id not in pending]
+    stmt = select(AccountMonthRollup).where(AccountMonthRollup.account_id.in_(account_ids))
+    if first is not None:
+        stmt = stmt.where(AccountMonthRollup.month >= first.strftime("%Y-%m"))
+    if last is not None:
+        stmt = stmt.where(AccountMonthRollup.month < last.strftime("%Y-%m"))
+    return rows + [
+        (rollup.month, type_, getattr(rollup, f"{prefix}_cents"), getattr(rollup, f"{prefix}_count"))
+        for rollup in session.exec(stmt)
+        for type_, prefix in ROLLUP_PREFIX_BY_TYPE.items()
+    ]
+
+
+def counterparty_totals_query(
+    account_ids: Sequence[int],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """(counterparty, type, cents, count) over transfers only: seeks ix_transaction_account_type_created."""
+    stmt = (
+        select(Transaction.counterparty_account_id, Transaction.type, func.sum(Transaction.amount_cents), func.count())
+        .where(
+            Transaction.account_id.in_(account_ids),
+            Transaction.type.in_(TRANSFER_TYPES),
+            Transaction.counterparty_account_id.is_not(None),
+        )
+        .group_by(Transaction.counterparty_account_id, Transaction.type)
+    )
+    if start is not None:
+        stmt = stmt.where(Transaction.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(Transaction.created_at < end)
+    return stmt
+
+
+def _counterparty_totals(
+    session: Session,
+    account_ids: Sequence[int],
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> List[CounterpartyTotal]:
+    """Transfer volume per counterparty, largest first."""
+    totals: Dict[int, List[int]] = {}
+    for counterparty_id, type_, cents, count in session.exec(counterparty_totals_query(account_ids, start, end)):
+        total = totals.setdefault(counterparty_id, [0, 0, 0])
+        total[0 if type_ == "transfer_out" else 1] += cents
+        total[2] += count
+    return sorted(
+        (CounterpartyTotal(counterparty_id, *total) for counterparty_id, total in totals.items()),
+        key=lambda total: (-(total.sent_cents + total.received_cents), total.counterparty_account_id),
+    )
+
+
+def _fold(rows: List[tuple]) -> Tuple[List[TypeTotal], List[PeriodTotal]]:
+    by_type: Dict[str, List[int]] = {}
+    by_period: Dict[str, List[int]] = {}
+    for period, type_, cents, count in rows:
+        if not count:
+            continue
+        type_total = by_type.setdefault(type_, [0, 0])
+        type_total[0] += cents
+        type_total[1] += count
+        period_total = by_period.setdefault(period, [0, 0, 0])
+        sign = SIGN_BY_TYPE.get(type_, 0)
+        if sign > 0:
+            period_total[0] += cents
+        elif sign < 0:
+            period_total[1] += cents
+        period_total[2] += count
+    return (
+        [TypeTotal(type_, *by_type[type_]) for type_ in sorted(by_type)],
+        [
+            PeriodTotal(period, inflow, outflow, inflow - outflow, count)
+            for period, (inflow, outflow, count) in sorted(by_period.items())
+        ],
+    )
+
+
+def compute_insights(
+    session: Session,
+    account_ids: Sequence[int],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    interval: str = "month",
+) -> Insights:
+    """Totals and counts by type, by period and by counterparty over [start, end).
+
+    Everything is aggregated in SQL. With monthly buckets, the calendar
+    months wholly inside the range come from account_month_rollup, so only
+    the partial months at either end read raw transactions; day and week
+    buckets aggregate the raw range.
+    """
+    if interval not in PERIODS:
+        raise ValueError("Invalid interval. Use day, week or month")
+    if start is not None and end is not None and start >= end:
+        raise ValueError("start must be before end")
+    if not account_ids:
+        return Insights([], [], [])
+
+    months = _whole_months(start, end) if interval == "month" else None
+    if months is None:
+        rows = _raw_rows(session, account_ids, interval, start, end)
+    else:
+        first, last = months
+        rows = _rollup_rows(session, account_ids, first, last)
+        if first is not None and start < first:
+            rows += _raw_rows(session, account_ids, interval, start, first)
+        if last is not None and last < end:
+            rows += _raw_rows(session, account_ids, interval, last, end)
+
+    by_type, by_period = _fold(rows)
+    return Insights(by_type, by_period, _counterparty_totals(session, account_ids, start, end))
+
+
+def account_insights(
+    session: Session,
+    account_ids: Sequence[int],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    interval: str = "month",
+) -> Insights:
+    """compute_insights, served from insights_cache when the same question was asked recently."""
+    key = (tuple(sorted(account_ids)), start, end, interval)
+    insights = insights_cache.get(key)
+    if insights is None:
+        insights = compute_insights(session, account_ids, start, end, interval)
+        insights_cache.set(key, insights)
+    return insights
@@ -0,0 +1,96 @@
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, or_, select, update
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.session import begin_immediate, insert_returning
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.services.rollups import record_postings
+
+
+def validate_legs(legs: Sequence[Tuple[int, int]]) -> None:
+    """Raise ValueError unless legs are (account_id, amount_cents) pairs forming a balanced entry."""
+    if len(legs) < 2:
+        raise ValueError("A journal entry needs at least two legs")
+    if len(legs) > settings.journal_max_legs:
+        raise ValueError(f"A journal entry may have at most {settings.journal_max_legs} legs")
+    if any(amount == 0 for _, amount in legs):
+        raise ValueError("Leg amounts must be non-zero")
+    if len({account_id for account_id, _ in legs}) != len(legs):
+        raise ValueError("Each account may appear in only one leg")
+    if sum(amount for _, amount in legs) != 0:
+        raise ValueError("Legs must sum to zero")
+
+
+def _counterparty(account_ids: List[int]) -> Optional[int]:
+    # Only meaningful when the other side of the entry is a single account
+    return account_ids[0] if len(account_ids) == 1 else None
+
+
+def post_journal(
+    session: Session,
+    legs: Sequence[Tuple[int, int]],
+    description: str = None,
+    commit: bool = True
+) -> List[Transaction]:
+    """Apply a balanced multi-leg entry in one transaction and one commit.
+
+    Every balance changes through one executemany UPDATE; debits only apply
+    where the funds are there. If any leg fails, nothing is written. Returns
+    the posted transactions in leg order. With ``commit=False`` the caller
+    owns the transaction and a failure is only raised.
+    """
+    validate_legs(legs)
+    begin_immediate(session)
+
+    # Ascending account id: same lock order as execute_transfer
+    params = [{"account_id": account_id, "delta": amount} for account_id, amount in sorted(legs)]
+    table = Account.__table__
+    apply_leg = (
+        update(table)
+        .where(
+            table.c.id == bindparam("account_id"),
+            or_(bindparam("delta") > 0, table.c.balance_cents + bindparam("delta") >= 0)
+        )
+        .values(balance_cents=table.c.balance_cents + bindparam("delta"), version=table.c.version + 1)
+    )
+    connection = session.connection()
+    if connection.execute(apply_leg, params).rowcount != len(params):
+        if commit:
+            session.rollback()
+        account_ids = [account_id for account_id, _ in legs]
+        found = session.execute(select(Account.id).where(Account.id.in_(account_ids))).scalars().all()
+        if len(found) != len(account_ids):
+            raise ValueError("Account not found")
+        raise ValueError("Insufficient funds")
+
+    # executemany cannot RETURN on an UPDATE; read the new balances under the same write lock
+    account_ids = [account_id for account_id, _ in legs]
+    balances = dict(connection.execute(
+        select(table.c.id, table.c.balance_cents).where(table.c.id.in_(account_ids))
+    ).all())
+
+    debit_ids = [account_id for account_id, amount in legs if amount < 0]
+    credit_ids = [account_id for account_id, amount in legs if amount > 0]
+    created_at = datetime.utcnow()
+    transactions = [
+        Transaction(
+            account_id=account_id,
+            type="transfer_out" if amount < 0 else "transfer_in",
+            amount_cents=abs(amount),
+            created_at=created_at,
+            description=description,
+            counterparty_account_id=_counterparty(credit_ids if amount < 0 else debit_ids),
+            balance_after_cents=balances[account_id]
+        )
+        for account_id, amount in legs
+    ]
+    insert_returning(session, transactions)
+    record_postings(session, transactions)
+    if commit:
+        session.commit()
+
+    return transactions
@@ -0,0 +1,133 @@
+from typing import Optional
+
+from sqlalchemy import bindparam, case, update
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Session, select
+
+from app.db.session import begin_immediate, insert_returning
+from app.models.account import Account
+from app.models.transaction import SIGN_BY_TYPE, Transaction
+from app.services.rollups import record_postings
+
+
+def signed_amount() -> ColumnElement:
+    """SQL expression for a transaction's effect on its account balance."""
+    return case(
+        *[(Transaction.type == type_, Transaction.amount_cents * sign) for type_, sign in SIGN_BY_TYPE.items()],
+        else_=0,
+    )
+
+
+def _balance_update(delta: ColumnElement, *conditions: ColumnElement, owned: bool):
+    table = Account.__table__
+    stmt = update(table).where(table.c.id == bindparam("account_id"), *conditions)
+    if owned:
+        stmt = stmt.where(table.c.user_id == bindparam("owner_id"))
+    return stmt.values(
+        balance_cents=table.c.balance_cents + delta, version=table.c.version + 1
+    ).returning(table.c.balance_cents)
+
+
+# Built once: these run on every money movement, so skip per-call statement construction
+_DEBIT = {
+    owned: _balance_update(
+        -bindparam("amount"), Account.__table__.c.balance_cents >= bindparam("amount"), owned=owned
+    )
+    for owned in (False, True)
+}
+_CREDIT = {owned: _balance_update(bindparam("amount"), owned=owned) for owned in (False, True)}
+
+
+def debit_account(
+    session: Session,
+    account_id: int,
+    amount_cents: int,
+    owner_id: Optional[int] = None
+) -> Optional[int]:
+    """Subtract from the balance in one conditional UPDATE and return the new balance.
+
+    Returns None, changing nothing, if the account does not exist, is not
+    owned by owner_id (when given) or has insufficient funds.
+    """
+    params = {"account_id": account_id, "amount": amount_cents, "owner_id": owner_id}
+    return session.connection().execute(_DEBIT[owner_id is not None], params).scalar_one_or_none()
+
+
+def credit_account(
+    session: Session,
+    account_id: int,
+    amount_cents: int,
+    owner_id: Optional[int] = None
+) -> Optional[int]:
+    """Add to the balance in one UPDATE and return the new balance (None if no such account)."""
+    params = {"account_id": account_id, "amount": amount_cents, "owner_id": owner_id}
+    return session.connection().execute(_CREDIT[owner_id is not None], params).scalar_one_or_none()
+
+
+def post_deposit(
+    session: Session,
+    account_id: int,
+    amount_cents: int,
+    description: Optional[str] = None,
+    owner_id: Optional[int] = None,
+    commit: bool = True
+) -> Transaction:
+    """Credit an account and record the deposit.
+
+    With ``commit=False`` the caller owns the transaction (e.g. the group-commit
+    writer, which runs this inside a savepoint) and a failure is only raised.
+    """
+    begin_immediate(session)
+    balance = credit_account(session, account_id, amount_cents, owner_id)
+    if balance is None:
+        if commit:
+            session.rollback()
+        raise ValueError("Account not found")
+
+    transaction = Transaction(
+        account_id=account_id,
+        type="deposit",
+        amount_cents=amount_cents,
+        description=description,
+        balance_after_cents=balance
+    )
+    insert_returning(session, [transaction])
+    record_postings(session, [transaction])
+    if commit:
+        session.commit()
+    return transaction
+
+
+def post_withdrawal(
+    session: Session,
+    account_id: int,
+    amount_cents: int,
+    description: Optional[str] = None,
+    owner_id: Optional[int] = None,
+    commit: bool = True
+) -> Transaction:
+    """Debit an account if the funds are there and record the withdrawal (see post_deposit)."""
+    begin_immediate(session)
+    balance = debit_account(session, account_id, amount_cents, owner_id)
+    if balance is None:
+        if commit:
+            session.rollback()
+        owned = select(Account.id).where(Account.id == account_id)
+        if owner_id is not None:
+            owned = owned.where(Account.user_id == owner_id)
+        if session.exec(owned).first() is None:
+            raise ValueError("Account not found")
+        raise ValueError("Insufficient funds")
+
+    transaction = Transaction(
+        account_id=account_id,
+        type="withdraw",
+        amount_cents=amount_cents,
+        description=description,
+        balance_after_cents=balance
+    )
+    insert_returning(session, [transaction])
+    record_postings(session, [transaction])
+    if commit:
+        session.commit()
+    return transaction
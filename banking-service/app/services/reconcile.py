@@ -0,0 +1,128 @@
+import time
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.session import begin_immediate
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.services.balances import backfill_running_balances
+from app.services.batch import chunked, database_url_of, map_partitions, worker_engine
+from app.services.ledger import signed_amount
+
+
+class Mismatch(NamedTuple):
+    account_id: int
+    balance_cents: int  # Account.balance_cents
+    ledger_cents: int  # signed sum of the account's transactions
+
+    @property
+    def drift(self) -> int:
+        return self.balance_cents - self.ledger_cents
+
+
+class ReconcileResult(NamedTuple):
+    accounts: int
+    mismatches: List[Mismatch]
+    repaired: int
+    seconds: float
+
+
+def account_ranges(session: Session, partition_size: int) -> List[Tuple[int, int]]:
+    """Inclusive (first, last) account id ranges of up to partition_size accounts each."""
+    ids = list(session.execute(select(Account.id).order_by(Account.id)).scalars())
+    return [(chunk[0], chunk[-1]) for chunk in chunked(ids, partition_size)]
+
+
+def find_mismatches(session: Session, first_id: int, last_id: int) -> List[Mismatch]:
+    """Accounts in [first_id, last_id] whose balance differs from their ledger.
+
+    One statement, so balances and sums come from the same snapshot and no
+    lock outlives it: one grouped pass over the range's transactions on
+    ix_transaction_account_id, joined to the accounts.
+    """
+    ledger = (
+        select(Transaction.account_id, func.sum(signed_amount()).label("total"))
+        .where(Transaction.account_id.between(first_id, last_id))
+        .group_by(Transaction.account_id)
+        .subquery()
+    )
+    total = func.coalesce(ledger.c.total, 0)
+    stmt = (
+        select(Account.id, Account.balance_cents, total)
+        .outerjoin(ledger, ledger.c.account_id == Account.id)
+        .where(Account.id.between(first_id, last_id), Account.balance_cents != total)
+        .order_by(Account.id)
+    )
+    return [Mismatch(*row) for row in session.execute(stmt)]
+
+
+def _check_partition(database_url: str, account_range: Tuple[int, int]) -> List[Mismatch]:
+    with Session(worker_engine(database_url)) as session:
+        return find_mismatches(session, *account_range)
+
+
+def repair_balances(session: Session, account_ids: Sequence[int]) -> int:
+    """Reset the given accounts' balances to their ledger sums and commit; returns how many changed.
+
+    The sums are taken again under the write lock, so a posting that landed
+    since the scan is included, and accounts that are no longer off are left
+    alone. Their running balances are recomputed in the same transaction.
+    """
+    table = Account.__table__
+    ledger_sum = (
+        select(func.coalesce(func.sum(signed_amount()), 0))
+        .where(Transaction.account_id == table.c.id)
+        .scalar_subquery()
+    )
+    begin_immediate(session)
+    repaired = session.connection().execute(
+        update(table)
+        .where(table.c.id.in_(account_ids), table.c.balance_cents != ledger_sum)
+        .values(balance_cents=ledger_sum, version=table.c.version + 1)
+    ).rowcount
+    backfill_running_balances(session, account_ids)
+    session.commit()
+    return repaired
+
+
+def run_reconciliation(
+    engine: Engine,
+    repair: bool = False,
+    workers: Optional[int] = None,
+    partition_size: Optional[int] = None,
+    progress: Optional[Callable[[int, int, float], None]] = None,
+) -> ReconcileResult:
+    """Compare every account's balance with the signed sum of its transactions.
+
+    Account id ranges are checked on a process pool; readers never block
+    writers in WAL mode, so this runs online. With ``repair`` each range's
+    mismatches are fixed as soon as they come in, one short write transaction
+    per range. ``progress(done, total_ranges, elapsed_seconds)`` is called
+    after each range.
+    """
+    workers = settings.batch_workers if workers is None else workers
+    partition_size = partition_size or settings.batch_partition_size
+    started = time.perf_counter()
+
+    with Session(engine) as session:
+        ranges = account_ranges(session, partition_size)
+        accounts = session.execute(select(func.count()).select_from(Account)).scalar_one()
+        if workers <= 0:
+            results = (find_mismatches(session, *account_range) for account_range in ranges)
+        else:
+            results = map_partitions(_check_partition, ranges, workers, database_url_of(engine))
+
+        mismatches: List[Mismatch] = []
+        repaired = 0
+        for done, found in enumerate(results, start=1):
+            mismatches.extend(found)
+            if repair and found:
+                repaired += repair_balances(session, [mismatch.account_id for mismatch in found])
+            if progress is not None:
+                progress(done, len(ranges), time.perf_counter() - started)
+
+    return ReconcileResult(accounts, mismatches, repaired, time.perf_counter() - started)
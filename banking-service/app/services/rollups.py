@@ -0,0 +1,194 @@
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.db.session import begin_immediate
+from app.models.account import Account
+from app.models.rollup import AccountMonthRollup
+from app.models.transaction import SIGN_BY_TYPE, Transaction
+from app.services.batch import chunked, database_url_of, map_partitions, worker_engine
+
+# Rollup column prefix per transaction type: <prefix>_cents and <prefix>_count
+ROLLUP_PREFIX_BY_TYPE: Dict[str, str] = {
+    "deposit": "deposits",
+    "withdraw": "withdrawals",
+    "transfer_in": "transfers_in",
+    "transfer_out": "transfers_out",
+    "card_charge": "card_charges",
+    "card_refund": "card_refunds",
+}
+
+TOTAL_COLUMNS = [
+    column
+    for prefix in ROLLUP_PREFIX_BY_TYPE.values()
+    for column in (f"{prefix}_cents", f"{prefix}_count")
+] + ["net_cents"]
+
+
+def _upsert():
+    stmt = sqlite_insert(AccountMonthRollup)
+    table = AccountMonthRollup.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=["account_id", "month"],
+        set_={column: table.c[column] + stmt.excluded[column] for column in TOTAL_COLUMNS},
+    )
+
+
+# Built once: runs inside every posting
+_UPSERT = _upsert()
+
+
+class RebuildResult(NamedTuple):
+    accounts: int
+    rows: int
+    seconds: float
+
+
+def month_key(month_str: str) -> str:
+    """Normalise a YYYY-MM month string, raising ValueError if malformed."""
+    try:
+        return datetime.strptime(month_str, "%Y-%m").strftime("%Y-%m")
+    except ValueError:
+        raise ValueError("Invalid month format. Use YYYY-MM")
+
+
+def _add(rows: Dict[Tuple[int, str], dict], account_id: int, month: str, type_: str, cents: int, count: int) -> None:
+    prefix = ROLLUP_PREFIX_BY_TYPE.get(type_)
+    if prefix is None:
+        return
+    row = rows.get((account_id, month))
+    if row is None:
+        row = rows[(account_id, month)] = {"account_id": account_id, "month": month, **dict.fromkeys(TOTAL_COLUMNS, 0)}
+    row[f"{prefix}_cents"] += cents
+    row[f"{prefix}_count"] += count
+    row["net_cents"] += SIGN_BY_TYPE[type_] * cents
+
+
+def record_postings(session: Session, transactions: Sequence[Transaction]) -> None:
+    """Add new transactions to their account-month rollups, in the caller's transaction (no commit)."""
+    rows: Dict[Tuple[int, str], dict] = {}
+    for transaction in transactions:
+        _add(
+            rows, transaction.account_id, transaction.created_at.strftime("%Y-%m"),
+            transaction.type, transaction.amount_cents, 1,
+        )
+    if rows:
+        session.connection().execute(_UPSERT, list(rows.values()))
+
+
+def accounts_pending_rollups(session: Session, account_ids: Sequence[int]) -> List[int]:
+    """Those of the given accounts whose history predates the rollups and has not been rebuilt yet."""
+    stmt = select(Account.id).where(Account.id.in_(account_ids), Account.rollups_pending)
+    return list(session.exec(stmt))
+
+
+def monthly_summary(
+    session: Session,
+    account_id: int,
+    from_month: Optional[str] = None,
+    to_month: Optional[str] = None
+) -> List[AccountMonthRollup]:
+    """Rollups of an account's months with activity, oldest first: one range read on uq_rollup_account_month.
+
+    An account still flagged rollups_pending is aggregated from its raw
+    history instead.
+    """
+    first = month_key(from_month) if from_month is not None else None
+    last = month_key(to_month) if to_month is not None else None
+    if accounts_pending_rollups(session, [account_id]):
+        rows, _ = compute_rollup_rows(session, [account_id])
+        return [
+            AccountMonthRollup(**row)
+            for row in sorted(rows, key=lambda row: row["month"])
+            if (first is None or row["month"] >= first) and (last is None or row["month"] <= last)
+        ]
+
+    stmt = select(AccountMonthRollup).where(AccountMonthRollup.account_id == account_id)
+    if first is not None:
+        stmt = stmt.where(AccountMonthRollup.month >= first)
+    if last is not None:
+        stmt = stmt.where(AccountMonthRollup.month <= last)
+    return session.exec(stmt.order_by(AccountMonthRollup.month)).all()
+
+
+def compute_rollup_rows(session: Session, account_ids: List[int]) -> Tuple[List[dict], int]:
+    """Rollup rows for a partition of accounts from raw history, plus the highest transaction id covered.
+
+    The watermark is read first and the aggregate limited to it, so rows
+    posted in between are left to the caller to add on top.
+    """
+    watermark = session.exec(select(func.coalesce(func.max(Transaction.id), 0))).one()
+    month = func.strftime("%Y-%m", Transaction.created_at)
+    stmt = (
+        select(Transaction.account_id, month, Transaction.type, func.sum(Transaction.amount_cents), func.count())
+        .where(Transaction.account_id.in_(account_ids), Transaction.id <= watermark)
+        .group_by(Transaction.account_id, month, Transaction.type)
+    )
+    rows: Dict[Tuple[int, str], dict] = {}
+    for account_id, month_str, type_, cents, count in session.exec(stmt):
+        _add(rows, account_id, month_str, type_, cents, count)
+    return list(rows.values()), watermark
+
+
+def _compute_partition(database_url: str, account_ids: List[int]) -> Tuple[List[dict], int]:
+    with Session(worker_engine(database_url)) as session:
+        return compute_rollup_rows(session, account_ids)
+
+
+def run_rollup_rebuild(
+    engine: Engine,
+    account_ids: Optional[Sequence[int]] = None,
+    workers: Optional[int] = None,
+    partition_size: Optional[int] = None,
+    progress: Optional[Callable[[int, int, float], None]] = None,
+) -> RebuildResult:
+    """Recompute the rollups of all (or the given) accounts from raw history.
+
+    Partitions are aggregated on a process pool. This process then replaces
+    each partition's rollups under the write lock, adds anything posted
+    since the worker read its watermark and clears the partition's
+    rollups_pending flags, so the service can stay up.
+    """
+    workers = settings.batch_workers if workers is None else workers
+    partition_size = partition_size or settings.batch_partition_size
+    started = time.perf_counter()
+
+    with Session(engine) as session:
+        stmt = select(Account.id).order_by(Account.id)
+        if account_ids:
+            stmt = stmt.where(Account.id.in_(account_ids))
+        ids = list(session.exec(stmt))
+        partitions = list(chunked(ids, partition_size))
+        if workers <= 0:
+            results = (compute_rollup_rows(session, partition) for partition in partitions)
+        else:
+            results = map_partitions(_compute_partition, partitions, workers, database_url_of(engine))
+
+        table = AccountMonthRollup.__table__
+        done = written = 0
+        for partition, (rows, watermark) in zip(partitions, results):
+            begin_immediate(session)
+            connection = session.connection()
+            connection.execute(table.delete().where(table.c.account_id.in_(partition)))
+            if rows:
+                connection.execute(sqlite_insert(AccountMonthRollup), rows)
+            late = session.exec(
+                select(Transaction).where(Transaction.account_id.in_(partition), Transaction.id > watermark)
+            ).all()
+            record_postings(session, late)
+            connection.execute(
+                update(Account).where(Account.id.in_(partition), Account.rollups_pending).values(rollups_pending=False)
+            )
+            session.commit()
+            done += len(partition)
+            written += len(rows)
+            if progress is not None:
+                progress(done, len(ids), time.perf_counter() - started)
+
+    return RebuildResult(len(ids), written, time.perf_counter() - started)
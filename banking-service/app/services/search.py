@@ -0,0 +1,65 @@
+import re
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import column, select, table
+from sqlalchemy.sql import Select
+
+from app.models.transaction import Transaction
+
+# FTS5 index over Transaction.description, created and kept in sync by migration 5
+transaction_fts = table("transaction_fts", column("rowid"), column("description"))
+
+_TERM = re.compile(r"[\w']+\*?")
+
+
+class TransactionFilters(NamedTuple):
+    types: Optional[List[str]] = None
+    start: Optional[datetime] = None  # created_at >= start
+    end: Optional[datetime] = None  # created_at < end
+    min_amount_cents: Optional[int] = None
+    max_amount_cents: Optional[int] = None
+    counterparty_account_id: Optional[int] = None
+    text: Optional[str] = None  # full-text search over description
+
+
+def fts_query(search: str) -> Optional[str]:
+    """Turn free text into an FTS5 query matching rows that contain every word.
+
+    Words are quoted, so FTS5 operators typed by a client are searched for
+    literally instead of raising a syntax error; a trailing ``*`` on a word
+    still makes it a prefix search. None if there is nothing to search for.
+    """
+    terms = []
+    for term in _TERM.findall(search):
+        prefix = term.endswith("*")
+        word = term.rstrip("*").replace('"', '""')
+        terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return " ".join(terms) or None
+
+
+def filter_transactions(statement: Select, filters: TransactionFilters) -> Select:
+    """Add the filters' conditions to a SELECT over Transaction.
+
+    Used together with an account_id condition: a type filter seeks on
+    ix_transaction_account_type_created, a date range narrows the range
+    scanned on either index, and amounts and counterparty are checked on
+    the rows that range yields. Text search is an FTS5 MATCH over the
+    description index.
+    """
+    if filters.types:
+        statement = statement.where(Transaction.type.in_(filters.types))
+    if filters.start is not None:
+        statement = statement.where(Transaction.created_at >= filters.start)
+    if filters.end is not None:
+        statement = statement.where(Transaction.created_at < filters.end)
+    if filters.min_amount_cents is not None:
+        statement = statement.where(Transaction.amount_cents >= filters.min_amount_cents)
+    if filters.max_amount_cents is not None:
+        statement = statement.where(Transaction.amount_cents <= filters.max_amount_cents)
+    if filters.counterparty_account_id is not None:
+        statement = statement.where(Transaction.counterparty_account_id == filters.counterparty_account_id)
+    if filters.text is not None:
+        matches = select(transaction_fts.c.rowid).where(transaction_fts.c.description.match(filters.text))
+        statement = statement.where(Transaction.id.in_(matches))
+    return statement
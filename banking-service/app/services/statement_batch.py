@@ -0,0 +1,162 @@
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import and_, case, exists, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models.account import Account
+from app.models.statement import Statement
+from app.models.transaction import Transaction
+from app.services.batch import chunked, database_url_of, map_partitions, worker_engine
+from app.services.ledger import signed_amount
+from app.services.statements import month_bounds
+
+
+class BatchResult(NamedTuple):
+    month: str
+    pending: int  # accounts without a statement when the run started
+    generated: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.generated / self.seconds if self.seconds else 0.0
+
+
+def _usable_anchors(session: Session, account_ids: List[int], period_start: datetime) -> Dict[int, Statement]:
+    """Previous-month statements of the given accounts that are still current."""
+    stale = exists().where(
+        Transaction.account_id == Statement.account_id,
+        Transaction.id > Statement.last_transaction_id,
+        Transaction.created_at < Statement.period_end
+    )
+    stmt = select(Statement).where(
+        Statement.account_id.in_(account_ids),
+        Statement.period_end == period_start,
+        Statement.last_transaction_id.is_not(None),
+        ~stale
+    )
+    return {anchor.account_id: anchor for anchor in session.exec(stmt)}
+
+
+def compute_statement_rows(
+    session: Session,
+    account_ids: List[int],
+    period_start: datetime,
+    period_end: datetime
+) -> List[dict]:
+    """Statement rows for a partition of accounts, using two grouped queries.
+
+    Accounts whose previous-month statement is current carry its closing
+    balance forward and only sum this month; the rest sum their full history.
+    """
+    anchors = _usable_anchors(session, account_ids, period_start)
+    fresh_ids = [account_id for account_id in account_ids if account_id not in anchors]
+    signed = signed_amount()
+
+    sums: Dict[int, tuple] = {}
+    if fresh_ids:
+        stmt = select(
+            Transaction.account_id,
+            func.sum(case((Transaction.created_at < period_start, signed), else_=0)),
+            func.sum(signed),
+            func.max(Transaction.id),
+        ).where(
+            Transaction.account_id.in_(fresh_ids),
+            Transaction.created_at < period_end
+        ).group_by(Transaction.account_id)
+        for account_id, opening, closing, last_id in session.exec(stmt):
+            sums[account_id] = (opening, closing, last_id)
+    if anchors:
+        stmt = select(
+            Transaction.account_id,
+            func.sum(signed),
+            func.max(Transaction.id),
+        ).where(
+            Transaction.account_id.in_(list(anchors)),
+            and_(Transaction.created_at >= period_start, Transaction.created_at < period_end)
+        ).group_by(Transaction.account_id)
+        for account_id, delta, last_id in session.exec(stmt):
+            sums[account_id] = (0, delta, last_id)
+
+    generated_at = datetime.utcnow()
+    rows = []
+    for account_id in account_ids:
+        opening, closing, last_id = sums.get(account_id, (0, 0, None))
+        anchor = anchors.get(account_id)
+        if anchor is not None:
+            opening = anchor.closing_balance_cents
+            closing = anchor.closing_balance_cents + closing
+            last_id = max(anchor.last_transaction_id, last_id or 0)
+        rows.append({
+            "account_id": account_id,
+            "period_start": period_start,
+            "period_end": period_end,
+            "generated_at": generated_at,
+            "opening_balance_cents": opening,
+            "closing_balance_cents": closing,
+            "last_transaction_id": last_id or 0,
+        })
+    return rows
+
+
+def _compute_partition(database_url: str, month_str: str, account_ids: List[int]) -> List[dict]:
+    period_start, period_end = month_bounds(month_str)
+    with Session(worker_engine(database_url)) as session:
+        return compute_statement_rows(session, account_ids, period_start, period_end)
+
+
+def pending_accounts(session: Session, period_start: datetime, account_ids: Optional[Sequence[int]] = None) -> List[int]:
+    """Ids of accounts (optionally limited to account_ids) without a statement for the period."""
+    done = select(Statement.account_id).where(Statement.period_start == period_start)
+    stmt = select(Account.id).where(Account.id.not_in(done)).order_by(Account.id)
+    if account_ids:
+        stmt = stmt.where(Account.id.in_(account_ids))
+    return list(session.exec(stmt))
+
+
+def run_statement_batch(
+    engine: Engine,
+    month_str: str,
+    account_ids: Optional[Sequence[int]] = None,
+    workers: Optional[int] = None,
+    partition_size: Optional[int] = None,
+    progress: Optional[Callable[[int, int, float], None]] = None,
+) -> BatchResult:
+    """Generate the month's statement for every account that does not have one yet.
+
+    Partitions are computed on a process pool and inserted by this process,
+    one commit per partition. Accounts that already have a statement for the
+    month are skipped, so an interrupted run is resumed by running it again.
+    ``progress(done, pending, elapsed_seconds)`` is called after each commit.
+    """
+    workers = settings.batch_workers if workers is None else workers
+    partition_size = partition_size or settings.batch_partition_size
+    period_start, period_end = month_bounds(month_str)
+    started = time.perf_counter()
+
+    with Session(engine) as session:
+        pending = pending_accounts(session, period_start, account_ids)
+        partitions = chunked(pending, partition_size)
+        if workers <= 0:
+            results = (compute_statement_rows(session, ids, period_start, period_end) for ids in partitions)
+        else:
+            results = map_partitions(_compute_partition, partitions, workers, database_url_of(engine), month_str)
+
+        # Statements generated over HTTP meanwhile win; the batch row is dropped
+        insert_stmt = sqlite_insert(Statement).on_conflict_do_nothing(
+            index_elements=["account_id", "period_start"]
+        )
+        done = generated = 0
+        for rows in results:
+            generated += session.connection().execute(insert_stmt, rows).rowcount
+            session.commit()
+            done += len(rows)
+            if progress is not None:
+                progress(done, len(pending), time.perf_counter() - started)
+
+    return BatchResult(month_str, len(pending), generated, time.perf_counter() - started)
@@ -1,18 +1,33 @@
 import calendar
 from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import make_transient_to_detached
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models.account import Account
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.locks import KeyedLock
 from app.models.transaction import Transaction
 from app.models.statement import Statement
+from app.services.balances import period_balances
+from app.services.ledger import signed_amount
 
+# Stored statements by (account_id, period_start). Entries are detached copies,
+# re-validated against the watermark and merged into the caller's session.
+statement_cache = TTLCache(
+    maxsize=settings.statement_cache_size,
+    ttl=settings.statement_cache_ttl_seconds,
+)
 
-def generate_statement(
-    session: Session,
-    account_id: int,
-    month_str: str
-) -> Statement:
-    """Generate monthly statement for an account."""
+# Concurrent requests for the same statement wait for the first to store it
+_generation_locks = KeyedLock()
+
+
+def month_bounds(month_str: str) -> Tuple[datetime, datetime]:
+    """Return [period_start, period_end) for a YYYY-MM month string."""
     # Parse month string (YYYY-MM)
     try:
         year, month = map(int, month_str.split('-'))
@@ -22,56 +37,266 @@ def generate_statement(
     # Calculate period boundaries
     period_start = datetime(year, month, 1, 0, 0, 0)
     
-    # Get last day of month and first day of next month
-    last_day = calendar.monthrange(year, month)[1]
+    # First day of next month
     if month == 12:
         period_end = datetime(year + 1, 1, 1, 0, 0, 0)
     else:
         period_end = datetime(year, month + 1, 1, 0, 0, 0)
-    
-    # Calculate opening balance (transactions before period start)
-    opening_stmt = select(Transaction).where(
-        Transaction.account_id == account_id,
-        Transaction.created_at < period_start
-    )
-    opening_transactions = session.exec(opening_stmt).all()
-    
-    opening_balance_cents = 0
-    for tx in opening_transactions:
-        if tx.type in ["deposit", "transfer_in"]:
-            opening_balance_cents += tx.amount_cents
-        elif tx.type in ["withdraw", "transfer_out", "card_charge"]:
-            opening_balance_cents -= tx.amount_cents
-        elif tx.type == "card_refund":
-            opening_balance_cents += tx.amount_cents
-    
-    # Calculate closing balance (transactions up to period end)
-    closing_stmt = select(Transaction).where(
+    return period_start, period_end
+
+
+def _sum_range(
+    session: Session,
+    account_id: int,
+    since: Optional[datetime],
+    period_start: datetime,
+    period_end: datetime
+) -> Tuple[int, int, Optional[int]]:
+    """Signed sums over [since, period_start) and [since, period_end), plus the highest id seen."""
+    signed = signed_amount()
+    stmt = select(
+        func.coalesce(func.sum(case((Transaction.created_at < period_start, signed), else_=0)), 0),
+        func.coalesce(func.sum(signed), 0),
+        func.max(Transaction.id),
+    ).where(
         Transaction.account_id == account_id,
         Transaction.created_at < period_end
     )
-    closing_transactions = session.exec(closing_stmt).all()
-    
-    closing_balance_cents = 0
-    for tx in closing_transactions:
-        if tx.type in ["deposit", "transfer_in"]:
-            closing_balance_cents += tx.amount_cents
-        elif tx.type in ["withdraw", "transfer_out", "card_charge"]:
-            closing_balance_cents -= tx.amount_cents
-        elif tx.type == "card_refund":
-            closing_balance_cents += tx.amount_cents
+    if since is not None:
+        stmt = stmt.where(Transaction.created_at >= since)
+    return session.exec(stmt).one()
+
+
+def stale_transactions_query(statement: Statement):
+    """Transactions that landed in the statement's covered range after it was computed.
+
+    New rows always get higher ids, so a backdated posting shows up as an id
+    above the watermark with a created_at inside the covered range. Ordering by
+    id makes this a seek on ix_transaction_account_id, costing only the rows
+    posted since the statement was generated.
+    """
+    return (
+        select(Transaction.id)
+        .where(
+            Transaction.account_id == statement.account_id,
+            Transaction.id > statement.last_transaction_id,
+            Transaction.created_at < statement.period_end
+        )
+        .order_by(Transaction.id)
+        .limit(1)
+    )
+
+
+def is_statement_current(session: Session, statement: Statement) -> bool:
+    """True unless a transaction has landed in the statement's period since it was computed."""
+    if statement.last_transaction_id is None:
+        return False
+    return session.exec(stale_transactions_query(statement)).first() is None
+
+
+def recompute_statement(session: Session, statement: Statement) -> Statement:
+    """Rebuild a statement's balances from the running balances, or the full history (no commit)."""
+    balances = period_balances(session, statement.account_id, statement.period_start, statement.period_end)
+    if balances is None:
+        balances = _sum_range(session, statement.account_id, None, statement.period_start, statement.period_end)
+    opening, closing, last_id = balances
+    statement.opening_balance_cents = opening
+    statement.closing_balance_cents = closing
+    statement.last_transaction_id = last_id or 0
+    statement.generated_at = datetime.utcnow()
+    session.add(statement)
+    return statement
+
+
+def _find_anchor(session: Session, account_id: int, period_start: datetime) -> Optional[Statement]:
+    """Most recent earlier statement whose closing balance can carry forward."""
+    stmt = (
+        select(Statement)
+        .where(Statement.account_id == account_id, Statement.period_end <= period_start)
+        .order_by(Statement.period_end.desc(), Statement.id.desc())
+        .limit(1)
+    )
+    anchor = session.exec(stmt).first()
+    if anchor is not None and not is_statement_current(session, anchor):
+        # A backdated transaction landed in a closed period: repair the anchor
+        recompute_statement(session, anchor)
+    return anchor
+
+
+def _build_statement(
+    session: Session,
+    account_id: int,
+    period_start: datetime,
+    period_end: datetime
+) -> Statement:
+    """Compute a new statement (no commit).
+
+    Opening and closing balances are two point lookups of the running
+    balance. While the account still has postings without one, balances carry
+    forward from the latest earlier statement, so only the transactions since
+    that statement's period end are scanned; without one the account's full
+    history is summed.
+    """
+    balances = period_balances(session, account_id, period_start, period_end)
+    if balances is not None:
+        opening_balance_cents, closing_balance_cents, last_id = balances
+    else:
+        anchor = _find_anchor(session, account_id, period_start)
+        if anchor is None:
+            opening_balance_cents, closing_balance_cents, last_id = _sum_range(
+                session, account_id, None, period_start, period_end
+            )
+            last_id = last_id or 0
+        else:
+            opening_delta, closing_delta, last_id = _sum_range(
+                session, account_id, anchor.period_end, period_start, period_end
+            )
+            opening_balance_cents = anchor.closing_balance_cents + opening_delta
+            closing_balance_cents = anchor.closing_balance_cents + closing_delta
+            last_id = max(anchor.last_transaction_id, last_id or 0)
     
-    # Create statement
-    statement = Statement(
+    return Statement(
         account_id=account_id,
         period_start=period_start,
         period_end=period_end,
         opening_balance_cents=opening_balance_cents,
-        closing_balance_cents=closing_balance_cents
+        closing_balance_cents=closing_balance_cents,
+        last_transaction_id=last_id
     )
-    
-    session.add(statement)
-    session.commit()
-    session.refresh(statement)
-    
+
+
+def _stored_statement(session: Session, account_id: int, period_start: datetime) -> Optional[Statement]:
+    stmt = select(Statement).where(
+        Statement.account_id == account_id,
+        Statement.period_start == period_start
+    )
+    return session.exec(stmt).first()
+
+
+def _remember(statement: Statement) -> Statement:
+    """Cache a detached copy of a stored statement and return the statement."""
+    snapshot = Statement(**statement.model_dump())
+    make_transient_to_detached(snapshot)
+    statement_cache.set((snapshot.account_id, snapshot.period_start), snapshot)
     return statement
+
+
+def _cached_statement(session: Session, account_id: int, period_start: datetime) -> Optional[Statement]:
+    cached = statement_cache.get((account_id, period_start))
+    if cached is not None and is_statement_current(session, cached):
+        # Attach a copy without a SELECT; the cached snapshot itself stays untouched
+        return session.merge(cached, load=False)
+    return None
+
+
+def _store_statement(
+    session: Session,
+    account_id: int,
+    period_start: datetime,
+    period_end: datetime
+) -> Statement:
+    """Return the stored statement for a period, computing and committing it if missing or stale."""
+    statement = _stored_statement(session, account_id, period_start)
+    if statement is not None and is_statement_current(session, statement):
+        return _remember(statement)
+
+    if statement is None:
+        statement = _build_statement(session, account_id, period_start, period_end)
+        session.add(statement)
+    else:
+        recompute_statement(session, statement)
+
+    try:
+        session.commit()
+    except IntegrityError:
+        # Another process stored this month first; theirs is just as current
+        session.rollback()
+        statement = _stored_statement(session, account_id, period_start)
+    session.refresh(statement)
+    return _remember(statement)
+
+
+def generate_statement(
+    session: Session,
+    account_id: int,
+    month_str: str
+) -> Statement:
+    """Return the account's statement for a month, generating it on first request.
+
+    A stored statement is served as long as no transaction has landed in its
+    period since it was computed; otherwise it is recomputed in place. There
+    is at most one statement per account and month.
+    """
+    period_start, period_end = month_bounds(month_str)
+
+    cached = _cached_statement(session, account_id, period_start)
+    if cached is not None:
+        return cached
+
+    with _generation_locks.hold((account_id, period_start)):
+        return _store_statement(session, account_id, period_start, period_end)
+
+
+def get_statement(session: Session, account_id: int, month_str: str) -> Optional[Statement]:
+    """Return the stored statement for a month, refreshed if stale; None if never generated."""
+    period_start, _ = month_bounds(month_str)
+
+    cached = _cached_statement(session, account_id, period_start)
+    if cached is not None:
+        return cached
+
+    statement = _stored_statement(session, account_id, period_start)
+    if statement is None:
+        return None
+    if not is_statement_current(session, statement):
+        recompute_statement(session, statement)
+        session.commit()
+        session.refresh(statement)
+    return _remember(statement)
+
+
+def list_statements(
+    session: Session,
+    account_id: int,
+    from_month: Optional[str] = None,
+    to_month: Optional[str] = None
+) -> List[Statement]:
+    """Stored statements of an account, oldest first, optionally limited to a month range."""
+    stmt = select(Statement).where(Statement.account_id == account_id)
+    if from_month is not None:
+        stmt = stmt.where(Statement.period_start >= month_bounds(from_month)[0])
+    if to_month is not None:
+        stmt = stmt.where(Statement.period_start <= month_bounds(to_month)[0])
+    statements = session.exec(stmt.order_by(Statement.period_start)).all()
+
+    stale = [statement for statement in statements if not is_statement_current(session, statement)]
+    for statement in stale:
+        recompute_statement(session, statement)
+    if stale:
+        # The commit expires every listed statement, not only the recomputed ones
+        session.commit()
+        for statement in statements:
+            session.refresh(statement)
+    return [_remember(statement) for statement in statements]
+
+
+async def generate_statement_async(
+    session: AsyncSession,
+    account_id: int,
+    month_str: str
+) -> Statement:
+    """Async variant of generate_statement; runs the same unit of work on the async engine.
+
+    The threading lock of the sync path would block the event loop, so
+    concurrent requests for the same month are left to
+    uq_statement_account_period and the IntegrityError fallback.
+    """
+    period_start, period_end = month_bounds(month_str)
+
+    def generate(sync_session: Session) -> Statement:
+        cached = _cached_statement(sync_session, account_id, period_start)
+        if cached is not None:
+            return cached
+        return _store_statement(sync_session, account_id, period_start, period_end)
+
+    return await session.run_sync(generate)
@@ -1,8 +1,29 @@
-from typing import List
+from typing import List, Optional
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.db.session import begin_immediate, insert_returning
 from app.models.account import Account
 from app.models.transaction import Transaction
+from app.services.ledger import credit_account, debit_account
+from app.services.rollups import record_postings
+
+
+def _transfer_failure(
+    session: Session,
+    from_account_id: int,
+    to_account_id: int,
+    owner_id: Optional[int]
+) -> ValueError:
+    """Work out why a debit or credit matched no row (after the rollback)."""
+    source_stmt = select(Account.id).where(Account.id == from_account_id)
+    if owner_id is not None:
+        source_stmt = source_stmt.where(Account.user_id == owner_id)
+    if session.exec(source_stmt).first() is None:
+        return ValueError("Source account not found")
+    if session.exec(select(Account.id).where(Account.id == to_account_id)).first() is None:
+        return ValueError("Destination account not found")
+    return ValueError("Insufficient funds")
 
 
 def execute_transfer(
@@ -10,25 +31,33 @@ def execute_transfer(
     from_account_id: int,
     to_account_id: int,
     amount_cents: int,
-    description: str = None
+    description: str = None,
+    owner_id: Optional[int] = None,
+    commit: bool = True
 ) -> List[Transaction]:
-    """Execute atomic transfer between accounts."""
-    # Get both accounts
-    from_account_stmt = select(Account).where(Account.id == from_account_id)
-    from_account = session.exec(from_account_stmt).first()
-    
-    to_account_stmt = select(Account).where(Account.id == to_account_id)
-    to_account = session.exec(to_account_stmt).first()
-    
-    if not from_account or not to_account:
-        raise ValueError("Account not found")
-    
-    if from_account.balance_cents < amount_cents:
-        raise ValueError("Insufficient funds")
-    
-    # Update balances
-    from_account.balance_cents -= amount_cents
-    to_account.balance_cents += amount_cents
+    """Execute atomic transfer between accounts.
+
+    The funds check (and, with owner_id, the ownership check on the source
+    account) is part of the debit UPDATE itself, so concurrent transfers can
+    neither overdraw nor lose each other's updates, and the happy path needs
+    no SELECT at all. With ``commit=False`` the caller owns the transaction
+    and a failure is only raised.
+    """
+    begin_immediate(session)
+
+    # Always touch the lower account id first so two opposing transfers
+    # cannot each hold one row while waiting for the other
+    balances = {}
+    for account_id in sorted((from_account_id, to_account_id)):
+        if account_id == from_account_id:
+            new_balance = debit_account(session, account_id, amount_cents, owner_id)
+        else:
+            new_balance = credit_account(session, account_id, amount_cents)
+        if new_balance is None:
+            if commit:
+                session.rollback()
+            raise _transfer_failure(session, from_account_id, to_account_id, owner_id)
+        balances[account_id] = new_balance
     
     # Create transaction records
     transfer_out = Transaction(
@@ -36,7 +65,8 @@ def execute_transfer(
         type="transfer_out",
         amount_cents=amount_cents,
         description=description,
-        counterparty_account_id=to_account_id
+        counterparty_account_id=to_account_id,
+        balance_after_cents=balances[from_account_id]
     )
     
     transfer_in = Transaction(
@@ -44,13 +74,30 @@ def execute_transfer(
         type="transfer_in",
         amount_cents=amount_cents,
         description=description,
-        counterparty_account_id=from_account_id
+        counterparty_account_id=from_account_id,
+        balance_after_cents=balances[to_account_id]
     )
     
-    session.add(transfer_out)
-    session.add(transfer_in)
-    session.commit()
-    session.refresh(transfer_out)
-    session.refresh(transfer_in)
+    insert_returning(session, [transfer_out, transfer_in])
+    record_postings(session, [transfer_out, transfer_in])
+    if commit:
+        session.commit()
     
     return [transfer_out, transfer_in]
+
+
+async def execute_transfer_async(
+    session: AsyncSession,
+    from_account_id: int,
+    to_account_id: int,
+    amount_cents: int,
+    description: str = None,
+    owner_id: Optional[int] = None,
+    commit: bool = True
+) -> List[Transaction]:
+    """Async variant of execute_transfer; runs the same unit of work on the async engine."""
+    return await session.run_sync(
+        lambda sync_session: execute_transfer(
+            sync_session, from_account_id, to_account_id, amount_cents, description, owner_id, commit
+        )
+    )
@@ -0,0 +1,100 @@
+"""Requests/second at 200 concurrent clients: the app on sqlite:// vs sqlite+aiosqlite://.
+
+The same database is served twice by one uvicorn process each, first with a
+sync DATABASE_URL (handlers on FastAPI's threadpool) and then with the
+aiosqlite one (the async twins of the balance, listing and transfer routes on
+the event loop). Each client repeatedly reads its balance, lists its first
+page of transactions and, every tenth request, makes a transfer.
+
+    python -m benchmarks.async_vs_sync [--clients 200] [--requests 20]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.common import free_port, use_temp_database
+
+
+async def signup_all(base: str, clients: int) -> list:
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base, timeout=60) as client:
+        while True:
+            try:
+                await client.get("/docs")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+        users = []
+        for i in range(clients):
+            token = (await client.post(
+                "/api/v1/auth/signup", json={"email": f"client{i}@example.com", "password": "pw"}
+            )).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            account_id = (await client.post("/api/v1/accounts", json={"type": "checking"}, headers=headers)).json()["id"]
+            await client.post(f"/api/v1/accounts/{account_id}/deposit", json={"amount_cents": 10**9}, headers=headers)
+            users.append((headers, account_id))
+        return users
+
+
+async def hammer(base: str, users: list, requests: int) -> float:
+    import httpx
+
+    limits = httpx.Limits(max_connections=len(users))
+    async with httpx.AsyncClient(base_url=base, timeout=60, limits=limits) as client:
+        async def run_client(c: int) -> None:
+            headers, account_id = users[c]
+            target = users[(c + 1) % len(users)][1]
+            for n in range(requests):
+                if n % 10 == 0:
+                    body = {"from_account_id": account_id, "to_account_id": target, "amount_cents": 1}
+                    resp = await client.post("/api/v1/transfers", json=body, headers=headers)
+                elif n % 2:
+                    resp = await client.get(f"/api/v1/accounts/{account_id}/balance", headers=headers)
+                else:
+                    resp = await client.get("/api/v1/transactions", params={"account_id": account_id}, headers=headers)
+                assert resp.status_code == 200, resp.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run_client(c) for c in range(len(users))))
+        return time.perf_counter() - started
+
+
+def serve(database_url: str) -> tuple:
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": database_url}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"], env=env
+    )
+    return server, f"http://127.0.0.1:{port}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    args = parser.parse_args()
+
+    path = use_temp_database("async-vs-sync")
+    total = args.clients * args.requests
+    users = None
+    print(f"{args.clients} clients x {args.requests} requests")
+    for label, url in (("sync ", f"sqlite:///{path}"), ("async", f"sqlite+aiosqlite:///{path}")):
+        server, base = serve(url)
+        try:
+            if users is None:
+                users = asyncio.run(signup_all(base, args.clients))
+            else:
+                asyncio.run(signup_all(base, 0))  # wait for startup
+            elapsed = asyncio.run(hammer(base, users, args.requests))
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"  {label} ({url.split(':')[0]}): {total / elapsed:8.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
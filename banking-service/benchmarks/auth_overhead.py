@@ -0,0 +1,32 @@
+"""Per-request authentication overhead with and without the verified-token cache.
+
+    python -m benchmarks.auth_overhead [--iterations 20000]
+"""
+import argparse
+import timeit
+
+from benchmarks.common import use_temp_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    use_temp_database("auth-overhead")
+    from app.core import security
+    from app.core.cache import TTLCache
+
+    token = security.create_access_token({"sub": "bench@example.com"})
+    for label, cache in (
+        ("jose verify (cache off)", TTLCache(maxsize=0, ttl=1800)),
+        ("token cache hit", TTLCache(maxsize=10_000, ttl=1800)),
+    ):
+        security.token_cache = cache
+        security.decode_access_token(token)
+        seconds = timeit.timeit(lambda: security.decode_access_token(token), number=args.iterations)
+        print(f"{label:>24}: {seconds / args.iterations * 1e6:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks are run from the banking-service directory as modules, e.g.
+``python -m benchmarks.login_flood``. Each one points DATABASE_URL at a
+throwaway SQLite file *before* importing the app, because settings are read
+at import time.
+"""
+import atexit
+import os
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Sequence
+
+
+def use_temp_database(prefix: str = "bench") -> str:
+    """Point the app at a fresh temp SQLite file and return its path."""
+    fd, path = tempfile.mkstemp(prefix=f"{prefix}-", suffix=".db")
+    os.close(fd)
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    atexit.register(_remove_database, path)
+    return path
+
+
+def _remove_database(path: str) -> None:
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(app) -> Iterator[str]:
+    """Run the app under uvicorn in a background thread; yields the base URL."""
+    import uvicorn
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    ordered: List[float] = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def rss_mb(kind: str = "RssAnon") -> float:
+    """Current resident memory in MiB from /proc/self/status (Linux only).
+
+    RssAnon is heap and stack: what the process itself allocated. VmRSS also
+    counts file pages, including SQLite's mmap window over the database.
+    """
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(f"{kind}:"):
+                return int(line.split()[1]) / 1024
+    raise KeyError(kind)
+
+
+def seed_transactions(path: str, account_id: int, rows: int, batch: int = 100_000) -> None:
+    """Bulk-load synthetic ledger rows for one account straight through sqlite3."""
+    import sqlite3
+    from datetime import datetime, timedelta
+
+    types = ("deposit", "withdraw", "transfer_in", "transfer_out", "card_charge", "card_refund")
+    start = datetime(2015, 1, 1)
+    conn = sqlite3.connect(path)
+    for offset in range(0, rows, batch):
+        conn.executemany(
+            'INSERT INTO "transaction" (account_id, type, amount_cents, created_at, description) '
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    account_id,
+                    types[i % len(types)],
+                    100 + i % 5000,
+                    (start + timedelta(seconds=30 * i)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+                    f"synthetic row {i}",
+                )
+                for i in range(offset, min(rows, offset + batch))
+            ),
+        )
+        conn.commit()
+    conn.close()
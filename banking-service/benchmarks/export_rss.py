@@ -0,0 +1,48 @@
+"""Resident memory while streaming a large transaction export.
+
+    python -m benchmarks.export_rss [--rows 5000000] [--format ndjson|csv]
+"""
+import argparse
+import time
+
+from benchmarks.common import rss_mb, seed_transactions, use_temp_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    path = use_temp_database("export")
+    from app.db.session import build_engine, init_db
+    from app.services.exports import iter_transactions_csv, iter_transactions_ndjson
+
+    engine = build_engine(f"sqlite:///{path}")
+    init_db(engine)
+    started = time.perf_counter()
+    seed_transactions(path, account_id=1, rows=args.rows)
+    print(f"seeded {args.rows:,} rows in {time.perf_counter() - started:.1f}s")
+
+    exporter = iter_transactions_csv if args.format == "csv" else iter_transactions_ndjson
+    baseline = rss_mb()
+    samples, mapped, total_bytes = [], [], 0
+    started = time.perf_counter()
+    for i, chunk in enumerate(exporter(engine, 1, chunk_size=args.chunk_size)):
+        total_bytes += len(chunk)
+        if i % 100 == 0:
+            samples.append(rss_mb())
+            mapped.append(rss_mb("RssFile"))
+    elapsed = time.perf_counter() - started
+
+    print(f"exported {total_bytes / 2**20:,.0f} MiB of {args.format} in {elapsed:.1f}s "
+          f"({args.rows / elapsed:,.0f} rows/s)")
+    quartiles = [samples[min(len(samples) - 1, len(samples) * q // 4)] for q in range(5)]
+    print(f"anonymous RSS before {baseline:.0f} MiB | at 0/25/50/75/100% of export: "
+          + " / ".join(f"{value:.0f}" for value in quartiles) + " MiB")
+    print(f"file-backed RSS (SQLite mmap window) peaked at {max(mapped):.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Transfers/second: one transaction per transfer vs the group-commit writer.
+
+Client threads move money between random accounts for a fixed time, first
+each committing its own transfer, then through GroupCommitWriter at several
+batch windows. Runs with the durable profile by default (fsync per commit),
+where batching matters most. On storage with a write-back cache fsync costs
+almost nothing; --commit-latency-ms adds a sleep to every commit (while the
+write lock is held) to model a disk where it does.
+
+    python -m benchmarks.group_commit [--threads 32] [--seconds 3] [--windows 0,1,2,5,10]
+                                      [--profile durable] [--commit-latency-ms 0]
+"""
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.common import percentile, use_temp_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--windows", default="0,1,2,5,10", help="batch windows in ms")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--profile", default="durable")
+    parser.add_argument("--commit-latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    path = use_temp_database("group-commit")
+    from sqlalchemy import event
+    from sqlmodel import Session
+
+    from app.db.group_commit import GroupCommitWriter
+    from app.db.session import build_engine, init_db
+    from app.models.account import Account
+    from app.services.transfers import execute_transfer
+
+    engine = build_engine(f"sqlite:///{path}", profile=args.profile)
+    init_db(engine)
+    if args.commit_latency_ms:
+        @event.listens_for(engine, "commit")
+        def _slow_fsync(conn) -> None:
+            time.sleep(args.commit_latency_ms / 1000)
+    with Session(engine) as session:
+        session.add_all([Account(user_id=1, balance_cents=10**9) for _ in range(args.accounts)])
+        session.commit()
+
+    def measure(transfer) -> tuple:
+        latencies = []
+        deadline = time.perf_counter() + args.seconds
+
+        def client() -> None:
+            rng = random.Random()
+            while time.perf_counter() < deadline:
+                from_id, to_id = rng.sample(range(1, args.accounts + 1), 2)
+                started = time.perf_counter()
+                transfer(from_id, to_id)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        threads = [threading.Thread(target=client) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(latencies) / args.seconds, percentile(latencies, 50), percentile(latencies, 99)
+
+    local = threading.local()
+
+    def direct(from_id: int, to_id: int) -> None:
+        if not hasattr(local, "session"):
+            local.session = Session(engine)
+        execute_transfer(local.session, from_id, to_id, 1)
+
+    print(f"{args.threads} client threads, profile={args.profile}, extra commit latency {args.commit_latency_ms:g} ms")
+    rate, p50, p99 = measure(direct)
+    print(f"  {'per-request commit':>20}: {rate:7.0f} transfers/s  p50 {p50:6.1f} ms  p99 {p99:6.1f} ms")
+
+    for window in (float(w) for w in args.windows.split(",")):
+        writer = GroupCommitWriter(engine, window_ms=window, max_batch=args.max_batch)
+        rate, p50, p99 = measure(lambda from_id, to_id: writer.run(execute_transfer, from_id, to_id, 1))
+        writer.shutdown()
+        label = f"writer, {window:g} ms window"
+        print(
+            f"  {label:>20}: {rate:7.0f} transfers/s  p50 {p50:6.1f} ms  p99 {p99:6.1f} ms  "
+            f"(avg batch {writer.ops / max(writer.batches, 1):.1f})"
+        )
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Spending insights on a million-row account: SQL aggregation vs grouping raw rows in Python.
+
+Seeds --rows transactions on one account over about two years (a few percent
+of them transfers to a handful of counterparties), builds the monthly rollups,
+then times compute_insights for several ranges and intervals, a cached repeat,
+and the BI-style alternative of pulling the whole history and grouping it.
+
+    python -m benchmarks.insights [--rows 1000000] [--repeat 10]
+"""
+import argparse
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from benchmarks.common import percentile, use_temp_database
+
+TYPES = ("deposit", "withdraw", "card_charge", "card_charge", "card_charge", "card_refund")
+
+
+def seed(path: str, rows: int) -> None:
+    start = datetime(2022, 1, 1)
+    step = timedelta(days=730) / rows
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO user (email, hashed_password) VALUES ('bench@example.com', 'x')")
+    conn.executemany("INSERT INTO account (user_id, type, balance_cents) VALUES (1, 'checking', 0)", [()] * 10)
+
+    def row(i: int) -> tuple:
+        if i % 25 == 0:
+            type_, counterparty = ("transfer_out", "transfer_in")[i % 2], 2 + i % 9
+        else:
+            type_, counterparty = TYPES[i % len(TYPES)], None
+        when = (start + step * i).strftime("%Y-%m-%d %H:%M:%S.%f")
+        return (1, type_, 100 + (i * 7919) % 50_000, when, counterparty)
+
+    conn.executemany(
+        'INSERT INTO "transaction" (account_id, type, amount_cents, created_at, counterparty_account_id) '
+        "VALUES (?, ?, ?, ?, ?)",
+        (row(i) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    path = use_temp_database("insights")
+    from sqlmodel import Session, select
+
+    from app.db.session import engine, init_db
+    from app.models.transaction import Transaction
+    from app.services.insights import account_insights, compute_insights
+    from app.services.rollups import run_rollup_rebuild
+
+    init_db()
+    seed(path, args.rows)
+    run_rollup_rebuild(engine, workers=0)
+
+    cases = {
+        "month, full history": (None, None, "month"),
+        "month, one year (ragged edges)": (datetime(2022, 3, 17), datetime(2023, 3, 9), "month"),
+        "week, one quarter": (datetime(2023, 1, 1), datetime(2023, 4, 1), "week"),
+        "day, one month": (datetime(2023, 6, 1), datetime(2023, 7, 1), "day"),
+    }
+    with Session(engine) as session:
+        for name, (start, end, interval) in cases.items():
+            timings = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                result = compute_insights(session, [1], start, end, interval)
+                timings.append((time.perf_counter() - t0) * 1000)
+            print(
+                f"  {name:<32} {len(result.by_period):4d} buckets  "
+                f"p50 {percentile(timings, 50):8.2f} ms  p99 {percentile(timings, 99):8.2f} ms"
+            )
+
+        account_insights(session, [1])
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            account_insights(session, [1])
+        print(f"  {'cached repeat':<32}                p50 {(time.perf_counter() - t0) * 1000 / args.repeat:8.3f} ms")
+
+        t0 = time.perf_counter()
+        totals = Counter()
+        for tx in session.exec(select(Transaction).where(Transaction.account_id == 1)):
+            totals[(tx.created_at.strftime("%Y-%m"), tx.type)] += tx.amount_cents
+        print(f"  {'pull history, group in Python':<32} {len(totals):4d} groups   {(time.perf_counter() - t0) * 1000:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
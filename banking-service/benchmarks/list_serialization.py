@@ -0,0 +1,133 @@
+"""10k-row list responses: one Pydantic model per row + response_model vs rows straight to orjson.
+
+Seeds --rows accounts for one user, --rows cards on one account and --rows
+transactions, then times GET /accounts, /cards and /transactions (one
+--rows-sized page) through the app against legacy copies of the handlers
+that build an *Out model per row and return them through response_model.
+
+    python -m benchmarks.list_serialization [--rows 10000] [--repeat 20]
+"""
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import percentile, use_temp_database
+
+
+def seed(path: str, rows: int) -> None:
+    start = datetime(2024, 1, 1)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO account (user_id, type, balance_cents) VALUES (1, 'checking', ?)", ((i,) for i in range(rows))
+    )
+    conn.executemany(
+        "INSERT INTO card (account_id, brand, holder_name, last4, card_token, exp_month, exp_year, cvv_hash) "
+        "VALUES (1, 'VISA', 'Bench Holder', ?, ?, 12, 2030, 'x')",
+        ((str(1000 + i % 9000), f"tok_{i:040d}") for i in range(rows)),
+    )
+    conn.executemany(
+        'INSERT INTO "transaction" (account_id, type, amount_cents, created_at, description) VALUES (1, ?, ?, ?, ?)',
+        (
+            ("card_charge", 100 + i, (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S.%f"), f"merchant {i}")
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_router(user):
+    """The list handlers as they were: ORM objects, one *Out model per row, response_model validation."""
+    from typing import List
+
+    from fastapi import APIRouter, Depends
+    from sqlmodel import Session, select
+
+    from app.db.session import get_session
+    from app.models.account import Account
+    from app.models.card import Card
+    from app.models.transaction import Transaction
+    from app.schemas.account import AccountOut
+    from app.schemas.card import CardOut
+    from app.schemas.transaction import TransactionOut
+
+    router = APIRouter()
+
+    @router.get("/accounts", response_model=List[AccountOut])
+    def accounts(session: Session = Depends(get_session)) -> List[AccountOut]:
+        rows = session.exec(select(Account).where(Account.user_id == user.id)).all()
+        return [AccountOut(id=a.id, type=a.type, balance_cents=a.balance_cents) for a in rows]
+
+    @router.get("/cards", response_model=List[CardOut])
+    def cards(account_id: int, session: Session = Depends(get_session)) -> List[CardOut]:
+        rows = session.exec(select(Card).where(Card.account_id == account_id)).all()
+        return [
+            CardOut(id=c.id, brand=c.brand, holder_name=c.holder_name, last4=c.last4, card_token=c.card_token,
+                    exp_month=c.exp_month, exp_year=c.exp_year)
+            for c in rows
+        ]
+
+    @router.get("/transactions", response_model=List[TransactionOut])
+    def transactions(account_id: int, limit: int, session: Session = Depends(get_session)) -> List[TransactionOut]:
+        rows = session.exec(
+            select(Transaction)
+            .where(Transaction.account_id == account_id)
+            .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+            .limit(limit + 1)
+        ).all()[:limit]
+        return [
+            TransactionOut(id=t.id, type=t.type, amount_cents=t.amount_cents, created_at=t.created_at,
+                           description=t.description)
+            for t in rows
+        ]
+
+    return router
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    path = use_temp_database("lists")
+    os.environ["TRANSACTIONS_MAX_PAGE_SIZE"] = str(args.rows)
+    from fastapi.testclient import TestClient
+    from sqlmodel import Session, select
+
+    from app.db.session import engine
+    from app.main import app
+    from app.models.user import User
+
+    client = TestClient(app)
+    token = client.post("/api/v1/auth/signup", json={"email": "bench@example.com", "password": "pw"}).json()["access_token"]
+    seed(path, args.rows)
+    with Session(engine) as session:
+        app.include_router(legacy_router(session.exec(select(User)).one()), prefix="/legacy")
+
+    headers = {"Authorization": f"Bearer {token}"}
+    cases = {
+        "accounts": ("/api/v1/accounts", "/legacy/accounts", {}),
+        "cards": ("/api/v1/cards", "/legacy/cards", {"account_id": 1}),
+        "transactions": ("/api/v1/transactions", "/legacy/transactions", {"account_id": 1, "limit": args.rows}),
+    }
+    for name, (fast, legacy, params) in cases.items():
+        results = {}
+        for label, url in (("pydantic", legacy), ("orjson", fast)):
+            timings = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                body = client.get(url, params=params, headers=headers).content
+                timings.append((time.perf_counter() - t0) * 1000)
+            results[label] = (percentile(timings, 50), body)
+        assert results["pydantic"][1] == results["orjson"][1], f"{name}: wire format differs"
+        print(
+            f"  {name:<13} {args.rows:,} rows  pydantic p50 {results['pydantic'][0]:7.1f} ms  "
+            f"orjson p50 {results['orjson'][0]:7.1f} ms  ({results['pydantic'][0] / results['orjson'][0]:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
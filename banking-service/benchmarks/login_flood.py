@@ -0,0 +1,87 @@
+"""Transfer latency while a login flood runs against the same process.
+
+    python -m benchmarks.login_flood                 # runs both modes
+    python -m benchmarks.login_flood --mode inline   # bcrypt on request threads
+    python -m benchmarks.login_flood --mode pool     # bcrypt on the hashing pool
+"""
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.common import percentile, serve, use_temp_database
+
+
+def run(mode: str, flooders: int, transfers: int) -> None:
+    use_temp_database("login-flood")
+    os.environ["PASSWORD_HASH_WORKERS"] = "0" if mode == "inline" else os.environ.get("PASSWORD_HASH_WORKERS", "2")
+
+    import httpx
+    from app.main import create_app
+
+    with serve(create_app()) as base_url, httpx.Client(base_url=base_url, timeout=60) as client:
+        token = client.post("/api/v1/auth/signup", json={"email": "payer@example.com", "password": "pw"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        src = client.post("/api/v1/accounts", json={"type": "checking"}, headers=headers).json()["id"]
+        dst = client.post("/api/v1/accounts", json={"type": "checking"}, headers=headers).json()["id"]
+        client.post(f"/api/v1/accounts/{src}/deposit", json={"amount_cents": 10**9}, headers=headers)
+        client.post("/api/v1/auth/signup", json={"email": "flood@example.com", "password": "pw"})
+
+        stop = threading.Event()
+        outcomes = {"ok": 0, "busy": 0}
+
+        def flood() -> None:
+            with httpx.Client(base_url=base_url, timeout=60) as flood_client:
+                while not stop.is_set():
+                    resp = flood_client.post("/api/v1/auth/login", json={"email": "flood@example.com", "password": "pw"})
+                    outcomes["ok" if resp.status_code == 200 else "busy"] += 1
+
+        threads = [threading.Thread(target=flood) for _ in range(flooders)]
+        for thread in threads:
+            thread.start()
+        time.sleep(1)
+
+        latencies = []
+        for _ in range(transfers):
+            started = time.perf_counter()
+            resp = client.post(
+                "/api/v1/transfers",
+                json={"from_account_id": src, "to_account_id": dst, "amount_cents": 1},
+                headers=headers,
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert resp.status_code == 200, resp.text
+
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    print(
+        f"{mode:>6}: transfers p50={percentile(latencies, 50):7.1f} ms "
+        f"p99={percentile(latencies, 99):7.1f} ms | logins ok={outcomes['ok']} busy(503)={outcomes['busy']}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["inline", "pool"])
+    parser.add_argument("--flooders", type=int, default=32)
+    parser.add_argument("--transfers", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode, args.flooders, args.transfers)
+        return
+    # Settings are read at import time, so each mode gets its own interpreter
+    for mode in ("inline", "pool"):
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.login_flood", "--mode", mode,
+             "--flooders", str(args.flooders), "--transfers", str(args.transfers)],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""A 1,000-recipient payout: one POST /transfers per recipient vs one POST /journal.
+
+    python -m benchmarks.payout [--recipients 1000]
+"""
+import argparse
+import time
+
+from benchmarks.common import serve, use_temp_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipients", type=int, default=1000)
+    args = parser.parse_args()
+
+    use_temp_database("payout")
+    import httpx
+    from sqlmodel import Session, select
+
+    from app.db.session import engine
+    from app.main import create_app
+    from app.models.account import Account
+
+    with serve(create_app()) as base_url, httpx.Client(base_url=base_url, timeout=120) as client:
+        token = client.post("/api/v1/auth/signup", json={"email": "payroll@example.com", "password": "pw"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        payer = client.post("/api/v1/accounts", json={"type": "checking"}, headers=headers).json()["id"]
+        client.post(f"/api/v1/accounts/{payer}/deposit", json={"amount_cents": 10**9}, headers=headers)
+        user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+        # Recipients are inserted directly; creating them is not what is measured
+        with Session(engine) as session:
+            session.add_all([Account(user_id=user_id) for _ in range(args.recipients)])
+            session.commit()
+            recipients = list(session.exec(select(Account.id).where(Account.id != payer)))
+
+        started = time.perf_counter()
+        for recipient in recipients:
+            resp = client.post(
+                "/api/v1/transfers",
+                json={"from_account_id": payer, "to_account_id": recipient, "amount_cents": 100},
+                headers=headers,
+            )
+            assert resp.status_code == 200, resp.text
+        per_transfer = time.perf_counter() - started
+
+        legs = [{"account_id": payer, "amount_cents": -100 * len(recipients)}]
+        legs += [{"account_id": recipient, "amount_cents": 100} for recipient in recipients]
+        started = time.perf_counter()
+        resp = client.post("/api/v1/journal", json={"legs": legs}, headers=headers)
+        journal = time.perf_counter() - started
+        assert resp.status_code == 200, resp.text
+
+    print(f"{len(recipients)} recipients")
+    print(f"  POST /transfers x{len(recipients)}: {per_transfer * 1000:8.0f} ms")
+    print(f"  POST /journal x1:      {journal * 1000:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
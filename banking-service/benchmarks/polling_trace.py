@@ -0,0 +1,146 @@
+"""Replay a mobile polling trace with and without conditional GETs and gzip.
+
+--clients users each poll GET /accounts, /transactions (first page) and
+/cards every tick; before a tick a client makes a deposit with probability
+--write-rate. The same trace is replayed twice against one uvicorn process:
+as plain polling (no If-None-Match, Accept-Encoding: identity) and as
+revalidating clients that send back the last ETag and accept gzip. Reports
+bytes of response body on the wire and the server process's CPU time
+(from /proc, so Linux only).
+
+    python -m benchmarks.polling_trace [--clients 20] [--ticks 50] [--write-rate 0.05] [--history 500]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import free_port, use_temp_database
+
+
+def cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def seed_history(path: str, account_ids: list, rows: int) -> None:
+    start = datetime(2024, 1, 1)
+    conn = sqlite3.connect(path)
+    for account_id in account_ids:
+        conn.executemany(
+            'INSERT INTO "transaction" (account_id, type, amount_cents, created_at, description) VALUES (?, ?, ?, ?, ?)',
+            (
+                (account_id, "card_charge", 100 + i, (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S.%f"), f"merchant {i % 40}")
+                for i in range(rows)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO card (account_id, brand, holder_name, last4, card_token, exp_month, exp_year, cvv_hash) "
+            "VALUES (?, 'VISA', 'Polling Client', ?, ?, 12, 2030, 'x')",
+            ((account_id, str(1000 + i), f"tok_{account_id}_{i:032d}") for i in range(3)),
+        )
+    conn.commit()
+    conn.close()
+
+
+def replay(client, base: str, trace: list, tokens: list, accounts: list, revalidate: bool) -> dict:
+    etags, totals = {}, {"requests": 0, "not_modified": 0, "bytes": 0}
+    encoding = "gzip" if revalidate else "identity"
+    for event, who in trace:
+        headers = {"Authorization": f"Bearer {tokens[who]}", "Accept-Encoding": encoding}
+        if event == "deposit":
+            client.post(f"{base}/api/v1/accounts/{accounts[who]}/deposit", json={"amount_cents": 100}, headers=headers)
+            continue
+        for url in (
+            f"{base}/api/v1/accounts",
+            f"{base}/api/v1/transactions?account_id={accounts[who]}",
+            f"{base}/api/v1/cards?account_id={accounts[who]}",
+        ):
+            key = (who, url)
+            if revalidate and key in etags:
+                headers["If-None-Match"] = etags[key]
+            else:
+                headers.pop("If-None-Match", None)
+            resp = client.get(url, headers=headers)
+            assert resp.status_code in (200, 304), resp.text
+            etags[key] = resp.headers["ETag"]
+            totals["requests"] += 1
+            totals["not_modified"] += resp.status_code == 304
+            totals["bytes"] += resp.num_bytes_downloaded
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--write-rate", type=float, default=0.05)
+    parser.add_argument("--history", type=int, default=500)
+    args = parser.parse_args()
+
+    path = use_temp_database("polling")
+    import httpx
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        with httpx.Client(timeout=30) as client:
+            while True:
+                try:
+                    client.get(f"{base}/docs")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+
+            tokens, accounts = [], []
+            for i in range(args.clients):
+                token = client.post(
+                    f"{base}/api/v1/auth/signup", json={"email": f"poller{i}@example.com", "password": "pw"}
+                ).json()["access_token"]
+                headers = {"Authorization": f"Bearer {token}"}
+                account_id = client.post(f"{base}/api/v1/accounts", json={"type": "checking"}, headers=headers).json()["id"]
+                client.post(f"{base}/api/v1/accounts", json={"type": "savings"}, headers=headers)
+                tokens.append(token)
+                accounts.append(account_id)
+            seed_history(path, accounts, args.history)
+
+            rng = random.Random(7)
+            trace = []
+            for _ in range(args.ticks):
+                for who in range(args.clients):
+                    if rng.random() < args.write_rate:
+                        trace.append(("deposit", who))
+                    trace.append(("poll", who))
+
+            results = {}
+            for label, revalidate in (("plain polling", False), ("ETag + gzip", True)):
+                cpu, started = cpu_seconds(server.pid), time.perf_counter()
+                totals = replay(client, base, trace, tokens, accounts, revalidate)
+                totals["cpu"] = cpu_seconds(server.pid) - cpu
+                totals["wall"] = time.perf_counter() - started
+                results[label] = totals
+                print(
+                    f"  {label:<14} {totals['requests']:6,} GETs  {totals['not_modified'] / totals['requests']:5.1%} 304  "
+                    f"{totals['bytes'] / 1e6:8.2f} MB body  server CPU {totals['cpu']:6.2f}s "
+                    f"({totals['cpu'] / totals['requests'] * 1000:5.2f} ms/GET)  wall {totals['wall']:6.2f}s"
+                )
+            plain, cached = results["plain polling"], results["ETag + gzip"]
+            print(
+                f"  saved: {1 - cached['bytes'] / plain['bytes']:.1%} of bytes, "
+                f"{1 - cached['cpu'] / plain['cpu']:.1%} of server CPU"
+            )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
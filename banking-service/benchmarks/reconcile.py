@@ -0,0 +1,61 @@
+"""Ledger reconciliation throughput: rows of transaction history checked per second.
+
+Seeds --accounts accounts with --rows ledger rows in total, drifts a few
+balances, then runs the reconciliation inline and on --workers processes and
+extrapolates the time for a 50M-row ledger.
+
+    python -m benchmarks.reconcile [--accounts 2000] [--rows 1000000] [--workers 4]
+"""
+import argparse
+import sqlite3
+import time
+
+from benchmarks.common import use_temp_database
+
+TYPES = ("deposit", "withdraw", "transfer_in", "transfer_out", "card_charge", "card_refund")
+
+
+def seed(path: str, accounts: int, rows: int) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO user (email, hashed_password) VALUES ('bench@example.com', 'x')")
+    conn.executemany("INSERT INTO account (user_id, type, balance_cents) VALUES (1, 'checking', 0)", [()] * accounts)
+    conn.executemany(
+        'INSERT INTO "transaction" (account_id, type, amount_cents, created_at) VALUES (?, ?, ?, ?)',
+        ((i % accounts + 1, TYPES[i % len(TYPES)], 100 + i % 5000, "2024-01-01 00:00:00.000000") for i in range(rows)),
+    )
+    conn.execute(
+        "UPDATE account SET balance_cents = (SELECT COALESCE(SUM(CASE WHEN type IN "
+        "('deposit', 'transfer_in', 'card_refund') THEN amount_cents ELSE -amount_cents END), 0) "
+        'FROM "transaction" WHERE account_id = account.id)'
+    )
+    conn.execute("UPDATE account SET balance_cents = balance_cents + 1 WHERE id % 500 = 0")
+    conn.commit()
+    conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--accounts", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--partition-size", type=int, default=200)
+    args = parser.parse_args()
+
+    path = use_temp_database("reconcile")
+    from app.db.session import engine, init_db
+    from app.services.reconcile import run_reconciliation
+
+    init_db()
+    seed(path, args.accounts, args.rows)
+
+    for workers in (0, args.workers):
+        result = run_reconciliation(engine, workers=workers, partition_size=args.partition_size)
+        rate = args.rows / result.seconds
+        print(
+            f"workers={workers}: {result.seconds:6.2f}s  {rate:12,.0f} rows/s  "
+            f"{len(result.mismatches)} mismatches  (50M rows ~ {50_000_000 / rate / 60:.1f} min)"
+        )
+
+
+if __name__ == "__main__":
+    main()
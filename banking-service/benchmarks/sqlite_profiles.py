@@ -0,0 +1,84 @@
+"""Mixed read/write throughput under each SQLite storage profile.
+
+Worker threads run 80% reads (recent transactions of an account) and 20%
+deposits (balance update + transaction insert) for a fixed duration.
+
+    python -m benchmarks.sqlite_profiles [--threads 8] [--seconds 3]
+"""
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.common import use_temp_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    use_temp_database("profiles")
+    from sqlalchemy.exc import OperationalError
+    from sqlmodel import Session, SQLModel, select
+
+    from app.db.session import SQLITE_PROFILES, build_engine
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+    from app.models.user import User  # noqa: F401  (registers the FK target table)
+
+    for profile in SQLITE_PROFILES:
+        path = use_temp_database(f"profile-{profile}")
+        engine = build_engine(f"sqlite:///{path}", profile=profile)
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            session.add_all([Account(user_id=1) for _ in range(50)])
+            session.commit()
+
+        counts = {"reads": 0, "writes": 0, "lock_errors": 0}
+        deadline = time.perf_counter() + args.seconds
+
+        def worker() -> None:
+            rng = random.Random()
+            with Session(engine) as session:
+                while time.perf_counter() < deadline:
+                    account_id = rng.randint(1, 50)
+                    try:
+                        if rng.random() < args.write_ratio:
+                            account = session.get(Account, account_id)
+                            account.balance_cents += 100
+                            session.add(Transaction(account_id=account_id, type="deposit", amount_cents=100))
+                            session.commit()
+                            counts["writes"] += 1
+                        else:
+                            session.exec(
+                                select(Transaction)
+                                .where(Transaction.account_id == account_id)
+                                .order_by(Transaction.created_at.desc())
+                                .limit(20)
+                            ).all()
+                            session.rollback()  # end the read transaction
+                            counts["reads"] += 1
+                    except OperationalError:
+                        session.rollback()
+                        counts["lock_errors"] += 1
+
+        threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+        total = counts["reads"] + counts["writes"]
+        print(
+            f"{profile:>10}: {total / args.seconds:8.0f} ops/s "
+            f"(reads {counts['reads'] / args.seconds:6.0f}/s, writes {counts['writes'] / args.seconds:5.0f}/s, "
+            f"lock errors {counts['lock_errors']})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Per-statement cost for an account with a long history.
+
+Compares the original two-pass Python summation with generate_statement
+for one month in the middle of the history, both from scratch and with the
+previous month's statement available as a balance-forward anchor.
+
+    python -m benchmarks.statement_cost [--rows 1000000] [--month 2015-08]
+"""
+import argparse
+import time
+
+from benchmarks.common import seed_transactions, use_temp_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--month", default="2015-08")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = use_temp_database("statements")
+    from sqlalchemy import text
+    from sqlmodel import Session, select
+
+    from app.db.session import build_engine, init_db
+    from app.models.transaction import Transaction
+    from app.services.ledger import SIGN_BY_TYPE
+    from app.services.statements import generate_statement
+
+    engine = build_engine(f"sqlite:///{path}")
+    init_db(engine)
+    seed_transactions(path, account_id=1, rows=args.rows)
+
+    def python_loop(session: Session) -> tuple:
+        # The original implementation: load both prefixes as ORM rows and sum in Python
+        from datetime import datetime
+
+        year, month = map(int, args.month.split("-"))
+        start = datetime(year, month, 1)
+        end = datetime(year + month // 12, month % 12 + 1, 1)
+        balances = []
+        for bound in (start, end):
+            rows = session.exec(select(Transaction).where(Transaction.account_id == 1, Transaction.created_at < bound)).all()
+            balances.append(sum(SIGN_BY_TYPE[tx.type] * tx.amount_cents for tx in rows))
+        return tuple(balances)
+
+    year, month = map(int, args.month.split("-"))
+    previous_month = f"{year - (month == 1)}-{(month - 2) % 12 + 1:02d}"
+
+    def clear_statements(session: Session) -> None:
+        session.exec(text("DELETE FROM statement"))
+        session.commit()
+
+    def add_prior_statement(session: Session) -> None:
+        generate_statement(session, 1, previous_month)
+
+    def current(session: Session) -> None:
+        generate_statement(session, 1, args.month)
+
+    for label, setup, run in (
+        ("python loop", None, python_loop),
+        ("no prior statement", clear_statements, current),
+        ("prior month anchor", add_prior_statement, current),
+    ):
+        timings = []
+        for _ in range(args.repeat):
+            with Session(engine) as session:
+                if setup is not None:
+                    setup(session)
+                started = time.perf_counter()
+                run(session)
+                timings.append(time.perf_counter() - started)
+        print(f"{label:>20}: {min(timings) * 1000:9.1f} ms per statement ({args.rows:,} rows in account)")
+
+
+if __name__ == "__main__":
+    main()
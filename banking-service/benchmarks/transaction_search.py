@@ -0,0 +1,106 @@
+"""Filtered transaction search on a multi-million-row ledger vs filtering the full history client-side.
+
+Seeds --rows transactions (half of them on the searched account) through the
+FTS5 sync triggers, then times one page of GET /transactions-style queries:
+type + amount + quarter, counterparty, and full-text search for a common and
+a rare word.
+
+    python -m benchmarks.transaction_search [--rows 2000000] [--repeat 20]
+"""
+import argparse
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import percentile, use_temp_database
+
+TYPES = ("deposit", "withdraw", "transfer_in", "transfer_out", "card_charge", "card_refund")
+DESCRIPTIONS = (
+    "coffee shop downtown", "grocery store weekly", "payroll acme corp", "rent payment",
+    "fuel station highway", "online subscription", "restaurant dinner", "pharmacy",
+)
+
+
+def seed(path: str, rows: int) -> None:
+    start = datetime(2022, 1, 1)
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO user (email, hashed_password) VALUES ('bench@example.com', 'x')")
+    conn.executemany("INSERT INTO account (user_id, type, balance_cents) VALUES (1, 'checking', 0)", [()] * 10)
+
+    def row(i: int) -> tuple:
+        account_id = 1 if i % 2 == 0 else 2 + i % 9
+        description = "chargeback dispute" if i % 100_000 == 0 else DESCRIPTIONS[i % len(DESCRIPTIONS)]
+        return (
+            account_id,
+            TYPES[i % len(TYPES)],
+            100 + (i * 7919) % 50_000,
+            (start + timedelta(seconds=40 * i)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+            description,
+            2 + i % 9,
+        )
+
+    conn.executemany(
+        'INSERT INTO "transaction" (account_id, type, amount_cents, created_at, description, counterparty_account_id) '
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (row(i) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    path = use_temp_database("search")
+    from sqlmodel import Session, select
+
+    from app.db.session import engine, init_db
+    from app.models.transaction import Transaction
+    from app.services.search import TransactionFilters, filter_transactions, fts_query
+
+    init_db()
+    started = time.perf_counter()
+    seed(path, args.rows)
+    print(f"seeded {args.rows:,} rows (with FTS sync) in {time.perf_counter() - started:.1f}s")
+
+    quarter = (datetime(2022, 4, 1), datetime(2022, 7, 1))
+    cases = {
+        "card_charge >= $100 in a quarter": TransactionFilters(
+            types=["card_charge"], start=quarter[0], end=quarter[1], min_amount_cents=10_000
+        ),
+        "counterparty 5": TransactionFilters(counterparty_account_id=5),
+        "text 'coffee' (common)": TransactionFilters(text=fts_query("coffee")),
+        "text 'chargeback' (rare)": TransactionFilters(text=fts_query("chargeback")),
+    }
+    page = (
+        select(Transaction)
+        .where(Transaction.account_id == 1)
+        .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(101)
+    )
+    with Session(engine) as session:
+        for name, filters in cases.items():
+            timings, found = [], 0
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                found = len(session.exec(filter_transactions(page, filters)).all())
+                timings.append((time.perf_counter() - t0) * 1000)
+            print(f"  {name:<36} {found:4d} rows  p50 {percentile(timings, 50):8.2f} ms  p99 {percentile(timings, 99):8.2f} ms")
+
+        t0 = time.perf_counter()
+        history = session.exec(select(Transaction).where(Transaction.account_id == 1)).all()
+        hits = [
+            tx for tx in history
+            if tx.type == "card_charge" and tx.amount_cents >= 10_000 and quarter[0] <= tx.created_at < quarter[1]
+        ]
+        print(
+            f"  client-side filter of {len(history):,} rows          {len(hits):4d} rows  "
+            f"{(time.perf_counter() - t0) * 1000:8.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Concurrent transfers around a ring of accounts; checks that money is conserved.
+
+Each worker thread repeatedly moves a random amount from account i to
+account i+1 (mod N) with its own session. Amounts are large relative to the
+starting balances, so many transfers must be refused for insufficient funds.
+At the end the total across accounts must equal the starting total, no
+balance may be negative, and every balance must match its transaction log.
+``--read-modify-write`` runs the original load/check/assign implementation
+for comparison.
+
+    python -m benchmarks.transfer_ring [--threads 8] [--accounts 16] [--seconds 5]
+"""
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.common import use_temp_database
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--accounts", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--balance", type=int, default=10_000)
+    parser.add_argument("--read-modify-write", action="store_true")
+    args = parser.parse_args()
+
+    path = use_temp_database("transfer-ring")
+    from sqlalchemy import func
+    from sqlalchemy.exc import OperationalError
+    from sqlmodel import Session, select
+
+    from app.db.session import build_engine, init_db
+    from app.models.account import Account
+    from app.models.transaction import Transaction
+    from app.services.ledger import signed_amount
+    from app.services.transfers import execute_transfer
+
+    engine = build_engine(f"sqlite:///{path}")
+    init_db(engine)
+    with Session(engine) as session:
+        session.add_all([Account(user_id=1, balance_cents=args.balance) for _ in range(args.accounts)])
+        session.commit()
+        for account_id in range(1, args.accounts + 1):
+            session.add(Transaction(account_id=account_id, type="deposit", amount_cents=args.balance))
+        session.commit()
+
+    def read_modify_write(session: Session, from_id: int, to_id: int, amount: int) -> None:
+        # The original implementation
+        source = session.get(Account, from_id)
+        target = session.get(Account, to_id)
+        if source.balance_cents < amount:
+            raise ValueError("Insufficient funds")
+        source.balance_cents -= amount
+        target.balance_cents += amount
+        session.add(Transaction(account_id=from_id, type="transfer_out", amount_cents=amount, counterparty_account_id=to_id))
+        session.add(Transaction(account_id=to_id, type="transfer_in", amount_cents=amount, counterparty_account_id=from_id))
+        session.commit()
+
+    transfer = read_modify_write if args.read_modify_write else execute_transfer
+    counts = {"done": 0, "refused": 0, "lock_errors": 0}
+    deadline = time.perf_counter() + args.seconds
+
+    def worker() -> None:
+        rng = random.Random()
+        with Session(engine) as session:
+            while time.perf_counter() < deadline:
+                from_id = rng.randint(1, args.accounts)
+                to_id = from_id % args.accounts + 1
+                try:
+                    transfer(session, from_id, to_id, rng.randint(1, args.balance // 2))
+                    counts["done"] += 1
+                except ValueError:
+                    session.rollback()
+                    counts["refused"] += 1
+                except OperationalError:
+                    session.rollback()
+                    counts["lock_errors"] += 1
+                session.expire_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with Session(engine) as session:
+        total = session.exec(select(func.sum(Account.balance_cents))).one()
+        negative = session.exec(select(func.count()).where(Account.balance_cents < 0)).one()
+        ledger = dict(session.exec(select(Transaction.account_id, func.sum(signed_amount())).group_by(Transaction.account_id)).all())
+        mismatched = sum(
+            1 for account in session.exec(select(Account)) if ledger.get(account.id, 0) != account.balance_cents
+        )
+    engine.dispose()
+
+    expected = args.accounts * args.balance
+    print(f"{'read-modify-write' if args.read_modify_write else 'conditional update'}, {args.threads} threads")
+    print(f"  transfers: {counts['done'] / args.seconds:8.0f}/s  (refused {counts['refused']}, lock errors {counts['lock_errors']})")
+    print(f"  total: {total} (expected {expected})  negative balances: {negative}  balance/ledger mismatches: {mismatched}")
+    if total != expected or negative or mismatched:
+        raise SystemExit("money was created, destroyed or overdrawn")
+
+
+if __name__ == "__main__":
+    main()
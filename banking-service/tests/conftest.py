@@ -3,10 +3,16 @@ import tempfile
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy import event
+from sqlmodel import Session, create_engine
 
 from app.main import create_app
-from app.db.session import get_session
+from app.api.deps import principal_cache
+from app.core.security import token_cache
+from app.db.session import get_session, init_db
+from app.services.idempotency import response_cache
+from app.services.insights import insights_cache
+from app.services.statements import statement_cache
 # Import all models to ensure they are registered with SQLModel
 from app.models.user import User
 from app.models.account import Account
@@ -26,7 +32,10 @@ def session_fixture():
             connect_args={"check_same_thread": False},
             echo=False,
         )
-        SQLModel.metadata.create_all(engine)
+        init_db(engine)
+        # Keyed by account id, which repeats across the per-test databases
+        statement_cache.clear()
+        insights_cache.clear()
 
         with Session(engine) as session:
             yield session
@@ -44,6 +53,11 @@ def client_fixture(session: Session):
         # Match the original dependency shape by yielding a session
         yield session
 
+    # Caches are process-wide; every test gets a fresh database, so start cold
+    token_cache.clear()
+    principal_cache.clear()
+    response_cache.clear()
+
     app = create_app()
     app.dependency_overrides[get_session] = get_session_override
     client = TestClient(app)
@@ -51,3 +65,32 @@ def client_fixture(session: Session):
         yield client
     finally:
         app.dependency_overrides.clear()
+
+
+class QueryCounter:
+    """Records every SQL statement sent to the database."""
+
+    def __init__(self) -> None:
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+
+@pytest.fixture(name="query_counter")
+def query_counter_fixture(session: Session):
+    """Count statements on the test database; call reset() before the request under test."""
+    counter = QueryCounter()
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
@@ -0,0 +1,163 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import get_current_user_async, principal_cache
+from app.core.security import create_access_token
+from app.db import session as db_session
+from app.db.session import begin_immediate, get_session, split_database_url
+from app.main import create_app
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.models.user import User
+from app.services.statements import generate_statement_async, statement_cache
+from app.services.transfers import execute_transfer_async
+
+
+def test_split_database_url_selects_async_mode():
+    sync_url, async_url = split_database_url("sqlite+aiosqlite:///./bank.db")
+    assert str(sync_url) == "sqlite:///./bank.db"
+    assert str(async_url) == "sqlite+aiosqlite:///./bank.db"
+    assert split_database_url("sqlite:///./bank.db")[1] is None
+
+
+def test_async_services_and_current_user(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            user = User(email="async@example.com", hashed_password="x")
+            session.add(user)
+            await session.commit()
+            src = Account(user_id=user.id, balance_cents=10_000)
+            dst = Account(user_id=user.id)
+            session.add_all([src, dst])
+            await session.commit()
+
+            principal_cache.clear()
+            token = create_access_token({"sub": "async@example.com"})
+            current = await get_current_user_async(session=session, token=token)
+            assert current.id == user.id
+
+            # The failed transfer rolls back, which expires the ORM objects
+            user_id, src_id, dst_id = user.id, src.id, dst.id
+            with pytest.raises(ValueError, match="Source account not found"):
+                await execute_transfer_async(session, src_id, dst_id, 2_500, "async", owner_id=user_id + 1)
+            txs = await execute_transfer_async(session, src_id, dst_id, 2_500, "async", owner_id=user_id)
+            assert [tx.type for tx in txs] == ["transfer_out", "transfer_in"]
+
+            statement = await generate_statement_async(session, src_id, datetime.utcnow().strftime("%Y-%m"))
+            # Read from the transfer's running balance, which includes the seeded 10_000
+            assert statement.closing_balance_cents == 7_500
+
+            with pytest.raises(HTTPException):
+                await get_current_user_async(session=session, token="not.a.token")
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_async_statements_do_not_block_the_loop(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'statements.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            session.add(Transaction(account_id=1, type="deposit", amount_cents=900, created_at=datetime(2024, 6, 2)))
+            await session.commit()
+
+        async def generate() -> int:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                return (await generate_statement_async(session, 1, "2024-06")).id
+
+        ids = await asyncio.wait_for(asyncio.gather(*(generate() for _ in range(4))), timeout=10)
+        assert len(set(ids)) == 1
+        await engine.dispose()
+
+    statement_cache.clear()
+    asyncio.run(scenario())
+
+
+def test_begin_immediate_takes_the_write_lock_under_aiosqlite(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'lock.db'}")
+        async with AsyncSession(engine) as session:
+            def in_transaction(sync_session) -> bool:
+                begin_immediate(sync_session)
+                return sync_session.connection().connection.driver_connection.in_transaction
+
+            assert await session.run_sync(in_transaction)
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture(name="async_client")
+def async_client_fixture(session: Session, monkeypatch):
+    """The app as DATABASE_URL=sqlite+aiosqlite:// builds it, on the test database."""
+    database = session.get_bind().url.database
+    # No pooling: every TestClient request may run on a different event loop
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database}", poolclass=NullPool)
+    monkeypatch.setattr(db_session, "async_engine", engine)
+    app = create_app()
+    app.dependency_overrides[get_session] = lambda: session
+    principal_cache.clear()
+    return TestClient(app)
+
+
+def test_reads_and_transfers_are_served_by_async_handlers(async_client: TestClient):
+    endpoints = {(route.path, method): route.endpoint for route in reversed(async_client.app.routes) for method in getattr(route, "methods", ())}
+    assert endpoints["/api/v1/accounts", "GET"].__name__ == "list_accounts_async"
+    assert endpoints["/api/v1/transactions", "GET"].__name__ == "list_transactions_async"
+    assert endpoints["/api/v1/transfers", "POST"].__name__ == "transfer_money_async"
+
+    token = async_client.post("/api/v1/auth/signup", json={"email": "async_routes@example.com", "password": "pw"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    a = async_client.post("/api/v1/accounts", json={"type": "checking"}, headers=headers).json()["id"]
+    b = async_client.post("/api/v1/accounts", json={"type": "savings"}, headers=headers).json()["id"]
+    async_client.post(f"/api/v1/accounts/{a}/deposit", json={"amount_cents": 1_000}, headers=headers)
+
+    body = {"from_account_id": a, "to_account_id": b, "amount_cents": 300}
+    keyed = {**headers, "Idempotency-Key": "async-1"}
+    first = async_client.post("/api/v1/transfers", json=body, headers=keyed)
+    again = async_client.post("/api/v1/transfers", json=body, headers=keyed)
+    assert first.status_code == again.status_code == 200
+    assert again.json() == first.json() and again.headers["Idempotent-Replayed"] == "true"
+    changed = {**body, "amount_cents": 1}
+    assert async_client.post("/api/v1/transfers", json=changed, headers=keyed).status_code == 422
+    assert async_client.post("/api/v1/transfers", json={**body, "amount_cents": 10**6}, headers=headers).status_code == 400
+
+    assert async_client.get(f"/api/v1/accounts/{a}/balance", headers=headers).json()["balance_cents"] == 700
+    listing = async_client.get("/api/v1/accounts", headers=headers)
+    assert [acc["balance_cents"] for acc in listing.json()] == [700, 300]
+    revalidated = async_client.get("/api/v1/accounts", headers={**headers, "If-None-Match": listing.headers["ETag"]})
+    assert revalidated.status_code == 304
+    page = async_client.get("/api/v1/transactions", params={"account_id": b}, headers=headers).json()
+    assert [(tx["type"], tx["amount_cents"]) for tx in page] == [("transfer_in", 300)]
+
+
+def test_async_transfer_checks_source_ownership(async_client: TestClient):
+    def signup(email: str) -> dict:
+        token = async_client.post("/api/v1/auth/signup", json={"email": email, "password": "pw"}).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    alice, mallory = signup("async_alice@example.com"), signup("async_mallory@example.com")
+    victim = async_client.post("/api/v1/accounts", json={"type": "checking"}, headers=alice).json()["id"]
+    own = async_client.post("/api/v1/accounts", json={"type": "checking"}, headers=mallory).json()["id"]
+    async_client.post(f"/api/v1/accounts/{victim}/deposit", json={"amount_cents": 500}, headers=alice)
+
+    resp = async_client.post(
+        "/api/v1/transfers", json={"from_account_id": victim, "to_account_id": own, "amount_cents": 500}, headers=mallory
+    )
+    assert resp.status_code == 404
+    assert async_client.get(f"/api/v1/accounts/{victim}/balance", headers=alice).json()["balance_cents"] == 500
+    assert async_client.get(f"/api/v1/accounts/{victim}/balance", headers=mallory).status_code == 404
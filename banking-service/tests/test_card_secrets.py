@@ -0,0 +1,56 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.card_secrets import CardSecretHasher, card_secret_hasher
+from app.core.security import get_password_hash, verify_password
+from app.models.card import Card
+from app.services.cards import verify_card_cvv
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_issued_card_stores_versioned_hmac(client: TestClient, session: Session):
+    token = signup(client, "cvv_hmac@example.com", "pw")
+    acc_id = client.post("/api/v1/accounts", json={"type": "checking"}, headers=auth_headers(token)).json()["id"]
+    payload = {"account_id": acc_id, "holder_name": "H", "exp_month": 1, "exp_year": 2031, "cvv": "321"}
+    card_id = client.post("/api/v1/cards", json=payload, headers=auth_headers(token)).json()["id"]
+
+    card = session.get(Card, card_id)
+    assert card.cvv_hash.startswith("hmac-sha256$1$")
+    assert "321" not in card.cvv_hash
+    assert verify_card_cvv(session, card, "321")
+    assert not verify_card_cvv(session, card, "322")
+
+
+def test_legacy_bcrypt_hash_verifies_and_is_upgraded(session: Session):
+    card = Card(
+        account_id=1, holder_name="Legacy", last4="1234", card_token="tok",
+        exp_month=1, exp_year=2030, cvv_hash=get_password_hash("987"),
+    )
+    session.add(card)
+    session.commit()
+
+    assert not verify_card_cvv(session, card, "000")
+    assert card.cvv_hash.startswith("$2b$")
+
+    assert verify_card_cvv(session, card, "987")
+    session.refresh(card)
+    assert card.cvv_hash == card_secret_hasher.hash("987")
+
+
+def test_pepper_rotation_keeps_old_hashes_verifiable():
+    old = CardSecretHasher({1: "old"}, current_version=1, legacy_verify=verify_password)
+    new = CardSecretHasher({1: "old", 2: "new"}, current_version=2, legacy_verify=verify_password)
+
+    stored = old.hash("123")
+    assert new.verify("123", stored)
+    assert new.needs_update(stored)
+    ok, upgraded = new.verify_and_update("123", stored)
+    assert ok and upgraded.startswith("hmac-sha256$2$")
+    assert not new.needs_update(upgraded)
@@ -0,0 +1,167 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.api.conditional import etag_matches
+from app.core.config import settings
+from app.db.session import get_session
+from app.main import create_app
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_account(client: TestClient, token: str) -> int:
+    return client.post("/api/v1/accounts", json={"type": "checking"}, headers=auth_headers(token)).json()["id"]
+
+
+def deposit(client: TestClient, token: str, account_id: int, amount_cents: int = 100) -> None:
+    resp = client.post(f"/api/v1/accounts/{account_id}/deposit", json={"amount_cents": amount_cents}, headers=auth_headers(token))
+    assert resp.status_code == 200
+
+
+def revalidate(client: TestClient, token: str, url: str, etag: str, **params):
+    headers = {**auth_headers(token), "If-None-Match": etag}
+    return client.get(url, params=params, headers=headers)
+
+
+def test_unchanged_transactions_page_is_304_without_the_list_query(client: TestClient, query_counter):
+    token = signup(client, "etag@example.com", "pw")
+    acc = create_account(client, token)
+    deposit(client, token, acc)
+
+    first = client.get("/api/v1/transactions", params={"account_id": acc}, headers=auth_headers(token))
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')  # gzip is on by default
+
+    query_counter.reset()
+    resp = revalidate(client, token, "/api/v1/transactions", etag, account_id=acc)
+    assert (resp.status_code, resp.content, resp.headers["ETag"]) == (304, b"", etag)
+    assert resp.headers["Vary"] == "Accept-Encoding"
+    # Only the ownership check, which also reads the account version
+    assert query_counter.count == 1
+
+    # Each page and filter combination has a tag of its own
+    assert revalidate(client, token, "/api/v1/transactions", etag, account_id=acc, limit=5).status_code == 200
+    assert revalidate(client, token, "/api/v1/transactions", etag, account_id=acc, type="deposit").status_code == 200
+
+    deposit(client, token, acc)
+    resp = revalidate(client, token, "/api/v1/transactions", etag, account_id=acc)
+    assert resp.status_code == 200
+    assert len(resp.json()) == 2
+    assert resp.headers["ETag"] != etag
+
+
+def test_every_write_path_moves_the_tags(client: TestClient):
+    token = signup(client, "etag_writes@example.com", "pw")
+    a, b = create_account(client, token), create_account(client, token)
+    deposit(client, token, a, 1_000)
+
+    def tags() -> tuple:
+        return tuple(
+            client.get(url, params=params, headers=auth_headers(token)).headers["ETag"]
+            for url, params in (
+                ("/api/v1/accounts", {}),
+                ("/api/v1/transactions", {"account_id": b}),
+                ("/api/v1/cards", {"account_id": b}),
+            )
+        )
+
+    seen = [tags()]
+    assert tags() == seen[0]
+    client.post("/api/v1/transfers", json={"from_account_id": a, "to_account_id": b, "amount_cents": 100}, headers=auth_headers(token))
+    seen.append(tags())
+    legs = [{"account_id": b, "amount_cents": -50}, {"account_id": a, "amount_cents": 50}]
+    client.post("/api/v1/journal", json={"legs": legs}, headers=auth_headers(token))
+    seen.append(tags())
+    card = {"account_id": b, "holder_name": "Tag", "exp_month": 1, "exp_year": 2030, "cvv": "123"}
+    client.post("/api/v1/cards", json=card, headers=auth_headers(token))
+    seen.append(tags())
+    create_account(client, token)
+    seen.append(tags())
+
+    accounts, transactions, cards = zip(*seen)
+    assert len(set(accounts)) == 5
+    assert len(set(transactions)) == len(set(cards)) == 4  # a new account does not touch account b
+
+
+def test_tags_are_per_user_and_if_none_match_lists_work(client: TestClient):
+    token = signup(client, "etag_a@example.com", "pw")
+    other = signup(client, "etag_b@example.com", "pw")
+    create_account(client, token)
+    create_account(client, other)
+
+    etag = client.get("/api/v1/accounts", headers=auth_headers(token)).headers["ETag"]
+    assert revalidate(client, other, "/api/v1/accounts", etag).status_code == 200
+    assert revalidate(client, token, "/api/v1/accounts", f'"stale", {etag}').status_code == 304
+    assert revalidate(client, token, "/api/v1/accounts", etag[2:]).status_code == 304
+    assert revalidate(client, token, "/api/v1/accounts", "*").status_code == 304
+
+    assert etag_matches(f'"a", {etag}', etag)
+    assert not etag_matches('"a"', etag)
+    assert not etag_matches(None, etag)
+
+
+@pytest.fixture(name="app_with_gzip")
+def app_with_gzip_fixture(session: Session, monkeypatch):
+    def build(minimum_size: int) -> TestClient:
+        monkeypatch.setattr(settings, "gzip_minimum_size", minimum_size)
+        app = create_app()
+        app.dependency_overrides[get_session] = lambda: session
+        return TestClient(app)
+    return build
+
+
+def test_larger_bodies_are_gzipped_above_the_threshold(client: TestClient, app_with_gzip):
+    token = signup(client, "gzip@example.com", "pw")
+    acc = create_account(client, token)
+    for amount in range(1, 31):
+        deposit(client, token, acc, amount)
+    params = {"account_id": acc}
+
+    gzip_client = app_with_gzip(500)
+    big = gzip_client.get("/api/v1/transactions", params=params, headers=auth_headers(token))
+    assert big.headers["content-encoding"] == "gzip"
+    assert big.num_bytes_downloaded < len(big.content)
+    assert len(big.json()) == 30
+    small = gzip_client.get("/api/v1/transactions", params={**params, "limit": 1}, headers=auth_headers(token))
+    assert "content-encoding" not in small.headers
+
+    plain = app_with_gzip(0).get("/api/v1/transactions", params=params, headers=auth_headers(token))
+    assert "content-encoding" not in plain.headers
+    assert plain.content == big.content
+
+
+def test_gzip_and_identity_share_only_a_weak_tag(client: TestClient, app_with_gzip):
+    token = signup(client, "gzip_tags@example.com", "pw")
+    acc = create_account(client, token)
+    for amount in range(1, 31):
+        deposit(client, token, acc, amount)
+    params = {"account_id": acc}
+
+    gzip_client = app_with_gzip(500)
+    tags = {}
+    for encoding in ("gzip", "identity"):
+        headers = {**auth_headers(token), "Accept-Encoding": encoding}
+        resp = gzip_client.get("/api/v1/transactions", params=params, headers=headers)
+        assert resp.headers.get("content-encoding", "identity") == encoding
+        tags[encoding] = resp.headers["ETag"]
+    assert tags["gzip"] == tags["identity"]
+    assert tags["gzip"].startswith('W/"')
+
+    for encoding, etag in tags.items():
+        headers = {**auth_headers(token), "Accept-Encoding": encoding, "If-None-Match": etag}
+        resp = gzip_client.get("/api/v1/transactions", params=params, headers=headers)
+        assert (resp.status_code, resp.headers["Vary"]) == (304, "Accept-Encoding")
+
+    # Without compression every representation is the identity one, so the tag stays strong
+    plain = app_with_gzip(0)
+    resp = plain.get("/api/v1/transactions", params=params, headers=auth_headers(token))
+    assert resp.headers["ETag"] == tags["gzip"][2:]
+    resp = revalidate(plain, token, "/api/v1/transactions", resp.headers["ETag"], **params)
+    assert resp.status_code == 304 and "Vary" not in resp.headers
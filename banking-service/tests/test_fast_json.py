@@ -0,0 +1,75 @@
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.models.account import Account
+from app.models.card import Card
+from app.models.transaction import Transaction
+from app.schemas.account import AccountOut
+from app.schemas.card import CardOut
+from app.schemas.transaction import TransactionOut
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_account(client: TestClient, token: str) -> int:
+    return client.post("/api/v1/accounts", json={"type": "checking"}, headers=auth_headers(token)).json()["id"]
+
+
+def pydantic_body(schema, rows: List) -> bytes:
+    """What the endpoints sent when they returned one *Out model per row through response_model."""
+    models = [schema(**row.model_dump(include=set(schema.model_fields))) for row in rows]
+    return JSONResponse(jsonable_encoder(models)).body
+
+
+def test_list_endpoints_keep_the_pydantic_wire_format(client: TestClient, session: Session):
+    token = signup(client, "wire@example.com", "pw")
+    acc = create_account(client, token)
+    create_account(client, token)
+    session.add_all([
+        Transaction(account_id=acc, type="deposit", amount_cents=2**53 + 1, created_at=datetime(2024, 1, 1)),
+        Transaction(account_id=acc, type="withdraw", amount_cents=1, created_at=datetime(2024, 1, 2, 3, 4, 5, 60),
+                    description='Café "quoted" \\ ☃ \U0001F600 \n tab\t'),
+        Transaction(account_id=acc, type="card_charge", amount_cents=0, created_at=datetime(2024, 1, 2, 3, 4, 5, 123456),
+                    description=""),
+    ])
+    session.commit()
+    card = {"account_id": acc, "holder_name": "Zoë O'Brien", "exp_month": 1, "exp_year": 2030, "cvv": "123"}
+    client.post("/api/v1/cards", json=card, headers=auth_headers(token))
+
+    resp = client.get("/api/v1/transactions", params={"account_id": acc}, headers=auth_headers(token))
+    transactions = session.exec(
+        select(Transaction).where(Transaction.account_id == acc).order_by(Transaction.created_at.desc(), Transaction.id.desc())
+    ).all()
+    assert resp.content == pydantic_body(TransactionOut, transactions)
+    assert resp.headers["content-type"] == "application/json"
+
+    resp = client.get("/api/v1/accounts", headers=auth_headers(token))
+    assert resp.content == pydantic_body(AccountOut, session.exec(select(Account)).all())
+
+    resp = client.get("/api/v1/cards", params={"account_id": acc}, headers=auth_headers(token))
+    assert resp.content == pydantic_body(CardOut, session.exec(select(Card)).all())
+
+
+def test_cursor_header_survives_the_fast_path(client: TestClient):
+    token = signup(client, "wire_pages@example.com", "pw")
+    acc = create_account(client, token)
+    for amount in (1, 2, 3):
+        client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": amount}, headers=auth_headers(token))
+
+    resp = client.get("/api/v1/transactions", params={"account_id": acc, "limit": 2}, headers=auth_headers(token))
+    assert [tx["amount_cents"] for tx in resp.json()] == [3, 2]
+    cursor = resp.headers["X-Next-Cursor"]
+    resp = client.get("/api/v1/transactions", params={"account_id": acc, "limit": 2, "cursor": cursor}, headers=auth_headers(token))
+    assert [tx["amount_cents"] for tx in resp.json()] == [1]
+    assert "X-Next-Cursor" not in resp.headers
@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, func, select
+
+from app.db import group_commit
+from app.db.group_commit import GroupCommitWriter
+from app.db.session import get_session
+from app.main import create_app
+from app.models.account import Account
+from app.models.idempotency import IdempotencyRecord
+from app.models.transaction import Transaction
+from app.services.ledger import post_deposit, post_withdrawal
+from app.services.transfers import execute_transfer
+
+
+@pytest.fixture(name="writer")
+def writer_fixture(session: Session):
+    writer = GroupCommitWriter(session.get_bind(), window_ms=20, max_batch=16)
+    try:
+        yield writer
+    finally:
+        writer.shutdown()
+
+
+def test_concurrent_ops_share_commits_and_keep_their_own_results(session: Session, writer: GroupCommitWriter):
+    session.add_all([Account(user_id=1, balance_cents=100), Account(user_id=1)])
+    session.commit()
+
+    futures = [writer.submit(post_deposit, 2, 10) for _ in range(20)]
+    futures.append(writer.submit(post_withdrawal, 1, 500))  # insufficient funds
+    futures.append(writer.submit(execute_transfer, 1, 2, 40))
+    for future in futures[:20]:
+        assert future.result().type == "deposit"
+    with pytest.raises(ValueError, match="Insufficient funds"):
+        futures[20].result()
+    assert [tx.type for tx in futures[21].result()] == ["transfer_out", "transfer_in"]
+
+    session.expire_all()
+    assert (session.get(Account, 1).balance_cents, session.get(Account, 2).balance_cents) == (60, 240)
+    assert session.exec(select(func.count()).select_from(Transaction)).one() == 22
+    assert len({f.result().id for f in futures[:20]}) == 20
+    assert writer.ops == 22 and writer.batches < writer.ops
+
+
+def test_failed_op_rolls_back_only_its_own_writes(session: Session, writer: GroupCommitWriter):
+    session.add(Account(user_id=1, balance_cents=0))
+    session.commit()
+
+    def deposit_then_fail(op_session: Session, account_id: int, commit: bool) -> None:
+        post_deposit(op_session, account_id, 999, commit=commit)
+        raise RuntimeError("boom")
+
+    failing = writer.submit(deposit_then_fail, 1)
+    ok = writer.submit(post_deposit, 1, 5)
+    with pytest.raises(RuntimeError):
+        failing.result()
+    assert ok.result().amount_cents == 5
+    session.expire_all()
+    assert session.get(Account, 1).balance_cents == 5
+
+
+def test_endpoints_route_through_the_writer(session: Session, writer: GroupCommitWriter, monkeypatch):
+    engine = session.get_bind()
+
+    def own_session():
+        with Session(engine) as request_session:
+            yield request_session
+
+    monkeypatch.setattr(group_commit, "group_writer", writer)
+    app = create_app()
+    app.dependency_overrides[get_session] = own_session
+    client = TestClient(app)
+    token = client.post("/api/v1/auth/signup", json={"email": "gc@example.com", "password": "pw"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    acc = client.post("/api/v1/accounts", json={"type": "checking"}, headers=headers).json()["id"]
+
+    results = []
+
+    def deposit() -> None:
+        results.append(client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 100}, headers=headers).status_code)
+
+    threads = [threading.Thread(target=deposit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [200] * 8
+
+    keyed = {**headers, "Idempotency-Key": "gc-1"}
+    first = client.post(f"/api/v1/accounts/{acc}/withdraw", json={"amount_cents": 300}, headers=keyed)
+    again = client.post(f"/api/v1/accounts/{acc}/withdraw", json={"amount_cents": 300}, headers=keyed)
+    assert first.status_code == again.status_code == 200
+    assert again.json() == first.json()
+    assert session.exec(select(func.count()).select_from(IdempotencyRecord)).one() == 1
+
+    balance = client.get("/api/v1/accounts", headers=headers).json()[0]["balance_cents"]
+    assert balance == 500
+    # The keyed withdrawal commits inline, together with its stored response
+    assert writer.ops == 8
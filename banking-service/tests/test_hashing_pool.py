@@ -0,0 +1,74 @@
+import asyncio
+import os
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.hashing import HashingPool, HashingPoolBusy, hashing_pool
+
+
+def test_pool_hashes_and_verifies_off_thread():
+    pool = HashingPool(workers=1, max_pending=4)
+    try:
+        hashed = pool.hash("s3cret")
+        assert pool.verify("s3cret", hashed)
+        assert not asyncio.run(pool.averify("wrong", hashed))
+        assert pool.stats()["completed"] == 3
+        assert pool.stats()["pending"] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_pool_recovers_after_a_worker_dies():
+    pool = HashingPool(workers=1, max_pending=4)
+    try:
+        hashed = pool.hash("s3cret")
+        in_flight = pool.submit(time.sleep, 30)
+        for pid in list(pool._executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        with pytest.raises(BrokenProcessPool):
+            in_flight.result(timeout=30)
+
+        assert [pool.verify("s3cret", hashed) for _ in range(3)] == [True] * 3
+        assert pool.stats()["completed"] == 4
+        assert pool.stats()["pending"] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_inline_pool_runs_in_caller():
+    pool = HashingPool(workers=0, max_pending=0)
+    hashed = asyncio.run(pool.ahash("pw"))
+    assert pool.verify("pw", hashed)
+
+
+def test_full_queue_rejects_instead_of_waiting():
+    pool = HashingPool(workers=1, max_pending=0)
+    try:
+        with pytest.raises(HashingPoolBusy):
+            pool.hash("pw")
+        assert pool.stats()["rejected"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_saturated_pool_returns_503(client: TestClient, monkeypatch):
+    monkeypatch.setattr(hashing_pool, "max_pending", 0)
+    resp = client.post("/api/v1/auth/signup", json={"email": "busy@example.com", "password": "pw"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+
+def test_auth_handlers_await_the_pool(client: TestClient, monkeypatch):
+    def blocking(*args):
+        raise AssertionError("auth handlers must not block a thread on the pool")
+
+    monkeypatch.setattr(hashing_pool, "hash", blocking)
+    monkeypatch.setattr(hashing_pool, "verify", blocking)
+    body = {"email": "awaited@example.com", "password": "pw"}
+    assert client.post("/api/v1/auth/signup", json=body).status_code == 200
+    assert client.post("/api/v1/auth/login", json=body).status_code == 200
+    assert client.post("/api/v1/auth/login", json={**body, "password": "nope"}).status_code == 401
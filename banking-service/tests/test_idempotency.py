@@ -0,0 +1,175 @@
+import threading
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+
+import pytest
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, func, select
+
+from app.api import idempotency
+from app.core.config import settings
+from app.db.session import get_session
+from app.main import create_app
+from app.models.idempotency import IdempotencyRecord
+from app.models.transaction import Transaction
+from app.services.idempotency import find_response, purge_expired, response_cache
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str, key: str = None) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    if key is not None:
+        headers["Idempotency-Key"] = key
+    return headers
+
+
+def create_account(client: TestClient, token: str) -> int:
+    return client.post("/api/v1/accounts", json={"type": "checking"}, headers=auth_headers(token)).json()["id"]
+
+
+def balance(client: TestClient, token: str, account_id: int) -> int:
+    accounts = client.get("/api/v1/accounts", headers=auth_headers(token)).json()
+    return next(a["balance_cents"] for a in accounts if a["id"] == account_id)
+
+
+def test_replayed_deposit_is_not_posted_twice(client: TestClient, session: Session):
+    token = signup(client, "idem_dep@example.com", "pw")
+    acc = create_account(client, token)
+
+    first = client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 500}, headers=auth_headers(token, "dep-1"))
+    response_cache.clear()  # the replay must also work from the table alone
+    second = client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 500}, headers=auth_headers(token, "dep-1"))
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert balance(client, token, acc) == 500
+
+    # A different key is a different deposit
+    client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 500}, headers=auth_headers(token, "dep-2"))
+    assert balance(client, token, acc) == 1_000
+
+
+def test_key_reused_for_a_different_request_is_rejected(client: TestClient):
+    token = signup(client, "idem_mismatch@example.com", "pw")
+    a1, a2 = create_account(client, token), create_account(client, token)
+    client.post(f"/api/v1/accounts/{a1}/deposit", json={"amount_cents": 1_000}, headers=auth_headers(token))
+
+    body = {"from_account_id": a1, "to_account_id": a2, "amount_cents": 100}
+    assert client.post("/api/v1/transfers", json=body, headers=auth_headers(token, "tf")).status_code == 200
+    changed = {**body, "amount_cents": 200}
+    assert client.post("/api/v1/transfers", json=changed, headers=auth_headers(token, "tf")).status_code == 422
+    assert balance(client, token, a2) == 100
+
+
+def test_failed_request_does_not_consume_the_key(client: TestClient):
+    token = signup(client, "idem_fail@example.com", "pw")
+    acc = create_account(client, token)
+
+    resp = client.post(f"/api/v1/accounts/{acc}/withdraw", json={"amount_cents": 300}, headers=auth_headers(token, "wd"))
+    assert resp.status_code == 400
+    client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 1_000}, headers=auth_headers(token))
+    resp = client.post(f"/api/v1/accounts/{acc}/withdraw", json={"amount_cents": 300}, headers=auth_headers(token, "wd"))
+    assert resp.status_code == 200
+    assert balance(client, token, acc) == 700
+
+
+def test_keys_are_scoped_per_user(client: TestClient):
+    alice = signup(client, "idem_alice@example.com", "pw")
+    bob = signup(client, "idem_bob@example.com", "pw")
+    a, b = create_account(client, alice), create_account(client, bob)
+    assert client.post(f"/api/v1/accounts/{a}/deposit", json={"amount_cents": 5}, headers=auth_headers(alice, "same")).status_code == 200
+    assert client.post(f"/api/v1/accounts/{b}/deposit", json={"amount_cents": 5}, headers=auth_headers(bob, "same")).status_code == 200
+    assert balance(client, bob, b) == 5
+
+
+@pytest.mark.parametrize("processes", ["one", "many"])
+def test_concurrent_duplicates_execute_once(session: Session, monkeypatch, processes: str):
+    engine = session.get_bind()
+    response_cache.clear()  # the same user id and key as the other parametrization
+    if processes == "many":
+        # Without the in-process key lock every duplicate races to the database
+        class NoLock:
+            def hold(self, key):
+                return nullcontext()
+
+        monkeypatch.setattr(idempotency, "_key_locks", NoLock())
+
+    def own_session():
+        with Session(engine) as request_session:
+            yield request_session
+
+    app = create_app()
+    app.dependency_overrides[get_session] = own_session
+    client = TestClient(app)
+    token = signup(client, "idem_race@example.com", "pw")
+    acc = create_account(client, token)
+
+    responses = []
+
+    def deposit() -> None:
+        responses.append(client.post(
+            f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 250}, headers=auth_headers(token, "race")
+        ))
+
+    threads = [threading.Thread(target=deposit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [r.status_code for r in responses] == [200] * 8
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert balance(client, token, acc) == 250
+    assert session.exec(select(func.count()).select_from(Transaction)).one() == 1
+
+
+def test_crash_before_the_response_is_stored_leaves_nothing_behind(client: TestClient, monkeypatch):
+    token = signup(client, "idem_crash@example.com", "pw")
+    acc = create_account(client, token)
+
+    def crash(result):
+        raise RuntimeError("worker died")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(idempotency, "jsonable_encoder", crash)
+        with pytest.raises(RuntimeError):
+            client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 400}, headers=auth_headers(token, "crash"))
+    assert balance(client, token, acc) == 0
+
+    # The deposit was rolled back with the key, so a retry runs it once
+    resp = client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 400}, headers=auth_headers(token, "crash"))
+    assert resp.status_code == 200
+    assert balance(client, token, acc) == 400
+
+
+def test_purge_removes_only_expired_records(session: Session):
+    now = datetime.utcnow()
+    for key, created_at in (("old", now - timedelta(days=2)), ("new", now)):
+        session.add(IdempotencyRecord(
+            user_id=1, key=key, fingerprint="f", created_at=created_at, status_code=200, response_body="{}"
+        ))
+    session.commit()
+
+    assert purge_expired(session) == 1
+    assert session.exec(select(IdempotencyRecord.key)).all() == ["new"]
+
+
+def test_record_is_cached_only_for_its_remaining_lifetime(session: Session, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(response_cache, "_clock", lambda: clock[0])
+    response_cache.clear()
+    session.add(IdempotencyRecord(
+        user_id=1, key="aging", fingerprint="f", status_code=200, response_body="{}",
+        created_at=datetime.utcnow() - timedelta(hours=settings.idempotency_ttl_hours - 1)
+    ))
+    session.commit()
+
+    assert find_response(session, 1, "aging", "f").status_code == 200
+    clock[0] = 3_599
+    assert response_cache.get((1, "aging")) is not None
+    clock[0] = 3_601
+    assert response_cache.get((1, "aging")) is None
@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.models.account import Account
+from app.models.transaction import SIGN_BY_TYPE, Transaction
+from app.services.insights import compute_insights
+from app.services.rollups import record_postings
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_account(client: TestClient, token: str) -> int:
+    return client.post("/api/v1/accounts", json={"type": "checking"}, headers=auth_headers(token)).json()["id"]
+
+
+def post(session: Session, rows: list) -> None:
+    """Insert backdated postings and their rollups, as the write paths would."""
+    transactions = [
+        Transaction(account_id=account_id, type=type_, amount_cents=amount, created_at=when, counterparty_account_id=counterparty)
+        for account_id, type_, amount, when, counterparty in rows
+    ]
+    session.add_all(transactions)
+    session.flush()
+    record_postings(session, transactions)
+    session.commit()
+
+
+def seed(session: Session, a: int, b: int) -> None:
+    post(session, [
+        (a, "card_charge", 12_000, datetime(2024, 2, 3), None),
+        (a, "deposit", 300_000, datetime(2024, 2, 20), None),
+        (a, "transfer_out", 15_000, datetime(2024, 3, 4, 9), b),  # a Monday
+        (b, "transfer_in", 15_000, datetime(2024, 3, 4, 9), a),
+        (a, "card_charge", 5_000, datetime(2024, 3, 10, 23), None),  # the Sunday after
+        (a, "transfer_in", 4_000, datetime(2024, 3, 11), b),
+        (b, "transfer_out", 4_000, datetime(2024, 3, 11), a),
+        (a, "withdraw", 2_000, datetime(2024, 4, 5), None),
+        (b, "deposit", 50_000, datetime(2024, 2, 1), None),
+    ])
+
+
+def insights(client: TestClient, token: str, **params) -> dict:
+    resp = client.get("/api/v1/insights", params=params, headers=auth_headers(token))
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+def periods(body: dict) -> list:
+    return [(p["period"], p["inflow_cents"], p["outflow_cents"], p["net_cents"], p["count"]) for p in body["by_period"]]
+
+
+def test_totals_by_type_period_and_counterparty(client: TestClient, session: Session):
+    token = signup(client, "insights@example.com", "pw")
+    a, b = create_account(client, token), create_account(client, token)
+    seed(session, a, b)
+
+    body = insights(client, token, account_id=a)
+    assert body["account_ids"] == [a]
+    assert [(t["type"], t["total_cents"], t["count"]) for t in body["by_type"]] == [
+        ("card_charge", 17_000, 2),
+        ("deposit", 300_000, 1),
+        ("transfer_in", 4_000, 1),
+        ("transfer_out", 15_000, 1),
+        ("withdraw", 2_000, 1),
+    ]
+    assert periods(body) == [
+        ("2024-02", 300_000, 12_000, 288_000, 2),
+        ("2024-03", 4_000, 20_000, -16_000, 3),
+        ("2024-04", 0, 2_000, -2_000, 1),
+    ]
+    assert body["by_counterparty"] == [
+        {"counterparty_account_id": b, "sent_cents": 15_000, "received_cents": 4_000, "count": 2}
+    ]
+
+    body = insights(client, token, account_id=a, interval="week", start="2024-03-01", end="2024-04-01")
+    assert periods(body) == [("2024-03-04", 0, 20_000, -20_000, 2), ("2024-03-11", 4_000, 0, 4_000, 1)]
+    body = insights(client, token, account_id=a, interval="day", start="2024-03-10", end="2024-03-12")
+    assert periods(body) == [("2024-03-10", 0, 5_000, -5_000, 1), ("2024-03-11", 4_000, 0, 4_000, 1)]
+
+
+def test_month_buckets_match_the_raw_ledger(session: Session):
+    session.add_all([Account(user_id=1), Account(user_id=1)])
+    session.commit()
+    moment, rows = datetime(2023, 11, 1), []
+    for i in range(200):
+        type_ = sorted(SIGN_BY_TYPE)[i % len(SIGN_BY_TYPE)]
+        rows.append((1 + i % 2, type_, 100 + i, moment, None))
+        moment += timedelta(hours=17)
+    post(session, rows)
+
+    ranges = [
+        (None, None),
+        (datetime(2023, 11, 15), datetime(2024, 1, 1)),
+        (datetime(2023, 12, 1), datetime(2024, 1, 1)),
+        (datetime(2023, 12, 31, 22), datetime(2024, 1, 1, 3)),
+        (None, datetime(2023, 12, 10)),
+        (datetime(2023, 12, 10), None),
+    ]
+    for start, end in ranges:
+        expected = {}
+        for account_id, type_, amount, when, _ in rows:
+            if (start is None or when >= start) and (end is None or when < end):
+                month = expected.setdefault(when.strftime("%Y-%m"), [0, 0])
+                month[0] += SIGN_BY_TYPE[type_] * amount
+                month[1] += 1
+        result = compute_insights(session, [1, 2], start, end, "month")
+        assert {p.period: [p.net_cents, p.count] for p in result.by_period} == expected, (start, end)
+        assert sum(t.count for t in result.by_type) == sum(count for _, count in expected.values())
+
+
+def test_all_accounts_and_bad_requests(client: TestClient, session: Session):
+    token = signup(client, "insights_all@example.com", "pw")
+    a, b = create_account(client, token), create_account(client, token)
+    seed(session, a, b)
+
+    body = insights(client, token)
+    assert body["account_ids"] == [a, b]
+    assert [(c["counterparty_account_id"], c["sent_cents"], c["received_cents"]) for c in body["by_counterparty"]] == [
+        (a, 4_000, 15_000),
+        (b, 15_000, 4_000),
+    ]
+    assert sum(p["net_cents"] for p in body["by_period"]) == 270_000 + 61_000
+
+    other = signup(client, "insights_other@example.com", "pw")
+    assert insights(client, other)["by_type"] == []
+    resp = client.get("/api/v1/insights", params={"account_id": a}, headers=auth_headers(other))
+    assert resp.status_code == 404
+    resp = client.get("/api/v1/insights", params={"interval": "year"}, headers=auth_headers(token))
+    assert resp.status_code == 422
+    resp = client.get("/api/v1/insights", params={"start": "2024-03-01", "end": "2024-02-01"}, headers=auth_headers(token))
+    assert resp.status_code == 400
+
+
+def test_repeated_questions_are_served_from_the_cache(client: TestClient, session: Session, query_counter):
+    token = signup(client, "insights_cache@example.com", "pw")
+    a, b = create_account(client, token), create_account(client, token)
+    seed(session, a, b)
+
+    first = insights(client, token, account_id=a, interval="week")
+    query_counter.reset()
+    assert insights(client, token, account_id=a, interval="week") == first
+    # Only the ownership lookup reaches the database
+    assert query_counter.count == 1
+    assert client.get("/api/v1/metrics", headers=auth_headers(token)).json()["insights_cache"]["hits"] == 1
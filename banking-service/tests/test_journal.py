@@ -0,0 +1,76 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, func, select
+
+from app.models.transaction import Transaction
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_account(client: TestClient, token: str) -> int:
+    return client.post("/api/v1/accounts", json={"type": "checking"}, headers=auth_headers(token)).json()["id"]
+
+
+def balances(client: TestClient, token: str) -> dict:
+    return {a["id"]: a["balance_cents"] for a in client.get("/api/v1/accounts", headers=auth_headers(token)).json()}
+
+
+def test_payout_posts_one_debit_and_many_credits(client: TestClient, session: Session):
+    token = signup(client, "payroll@example.com", "pw")
+    payer = create_account(client, token)
+    client.post(f"/api/v1/accounts/{payer}/deposit", json={"amount_cents": 100_000}, headers=auth_headers(token))
+    recipients = [create_account(client, token) for _ in range(50)]
+
+    legs = [{"account_id": payer, "amount_cents": -50 * 1_000}]
+    legs += [{"account_id": r, "amount_cents": 1_000} for r in recipients]
+    resp = client.post("/api/v1/journal", json={"legs": legs, "description": "payroll"}, headers=auth_headers(token))
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["total_cents"] == 50_000
+    assert [t["type"] for t in data["transactions"]] == ["transfer_out"] + ["transfer_in"] * 50
+    assert len({t["id"] for t in data["transactions"]}) == 51
+
+    after = balances(client, token)
+    assert after[payer] == 50_000
+    assert all(after[r] == 1_000 for r in recipients)
+    credit = session.get(Transaction, data["transactions"][1]["id"])
+    assert (credit.account_id, credit.counterparty_account_id, credit.description) == (recipients[0], payer, "payroll")
+
+
+def test_invalid_entries_are_rejected_without_side_effects(client: TestClient, session: Session):
+    token = signup(client, "journal_bad@example.com", "pw")
+    a, b, c = (create_account(client, token) for _ in range(3))
+    client.post(f"/api/v1/accounts/{a}/deposit", json={"amount_cents": 1_000}, headers=auth_headers(token))
+    before = balances(client, token)
+    rows_before = session.exec(select(func.count()).select_from(Transaction)).one()
+
+    cases = [
+        ([(a, -500), (b, 400)], 400),  # unbalanced
+        ([(a, -500)], 400),  # single leg
+        ([(a, -500), (a, 500)], 400),  # same account twice
+        ([(a, -2_000), (b, 1_000), (c, 1_000)], 400),  # insufficient funds
+        ([(a, -500), (999, 500)], 404),  # unknown credit account
+    ]
+    for legs, expected in cases:
+        body = {"legs": [{"account_id": acc, "amount_cents": amt} for acc, amt in legs]}
+        assert client.post("/api/v1/journal", json=body, headers=auth_headers(token)).status_code == expected
+
+    assert balances(client, token) == before
+    assert session.exec(select(func.count()).select_from(Transaction)).one() == rows_before
+
+
+def test_cannot_debit_another_users_account(client: TestClient):
+    owner = signup(client, "journal_owner@example.com", "pw")
+    victim_acc = create_account(client, owner)
+    client.post(f"/api/v1/accounts/{victim_acc}/deposit", json={"amount_cents": 1_000}, headers=auth_headers(owner))
+    thief = signup(client, "journal_thief@example.com", "pw")
+    thief_acc = create_account(client, thief)
+
+    body = {"legs": [{"account_id": victim_acc, "amount_cents": -1_000}, {"account_id": thief_acc, "amount_cents": 1_000}]}
+    assert client.post("/api/v1/journal", json=body, headers=auth_headers(thief)).status_code == 404
+    assert balances(client, owner)[victim_acc] == 1_000
@@ -0,0 +1,179 @@
+from datetime import datetime
+from operator import itemgetter
+
+from sqlalchemy import create_engine, inspect, text
+from sqlmodel import Session, select
+
+from app.db.migrations import LATEST_VERSION, current_version, run_migrations
+from app.db.session import init_db
+from app.models.rollup import AccountMonthRollup
+from app.services.insights import compute_insights
+from app.services.rollups import accounts_pending_rollups, compute_rollup_rows, monthly_summary, run_rollup_rebuild
+
+# Schema as created by the original create_all, before any index existed
+LEGACY_SCHEMA = [
+    'CREATE TABLE user (id INTEGER PRIMARY KEY, email VARCHAR NOT NULL, full_name VARCHAR, hashed_password VARCHAR NOT NULL)',
+    'CREATE UNIQUE INDEX ix_user_email ON user (email)',
+    'CREATE TABLE account (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, type VARCHAR NOT NULL, balance_cents INTEGER NOT NULL)',
+    'CREATE TABLE "transaction" (id INTEGER PRIMARY KEY, account_id INTEGER NOT NULL, type VARCHAR NOT NULL, amount_cents INTEGER NOT NULL, created_at DATETIME NOT NULL, description VARCHAR, counterparty_account_id INTEGER)',
+    'CREATE TABLE card (id INTEGER PRIMARY KEY, account_id INTEGER NOT NULL, brand VARCHAR NOT NULL, holder_name VARCHAR NOT NULL, last4 VARCHAR NOT NULL, card_token VARCHAR NOT NULL, exp_month INTEGER NOT NULL, exp_year INTEGER NOT NULL, cvv_hash VARCHAR NOT NULL)',
+    'CREATE TABLE statement (id INTEGER PRIMARY KEY, account_id INTEGER NOT NULL, period_start DATETIME NOT NULL, period_end DATETIME NOT NULL, generated_at DATETIME NOT NULL, opening_balance_cents INTEGER NOT NULL, closing_balance_cents INTEGER NOT NULL)',
+]
+
+
+def index_names(engine, table: str) -> set:
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_legacy_database_is_upgraded_in_place(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        for ddl in LEGACY_SCHEMA:
+            conn.execute(text(ddl))
+        conn.execute(text("INSERT INTO account (user_id, type, balance_cents) VALUES (1, 'checking', 500)"))
+        conn.execute(text(
+            "INSERT INTO \"transaction\" (account_id, type, amount_cents, created_at, description) "
+            "VALUES (1, 'deposit', 500, '2024-01-01 00:00:00', 'opening deposit')"
+        ))
+
+    init_db(engine)
+
+    assert "ix_transaction_account_created" in index_names(engine, "transaction")
+    assert "ix_account_user_id" in index_names(engine, "account")
+    assert "ix_card_account_id" in index_names(engine, "card")
+    assert "uq_statement_account_period" in index_names(engine, "statement")
+    assert "ix_transaction_account_id" in index_names(engine, "transaction")
+    assert "last_transaction_id" in {c["name"] for c in inspect(engine).get_columns("statement")}
+    assert "balance_after_cents" in {c["name"] for c in inspect(engine).get_columns("transaction")}
+    assert "ix_transaction_missing_balance" in index_names(engine, "transaction")
+    assert "ix_transaction_account_type_created" in index_names(engine, "transaction")
+    assert "version" in {c["name"] for c in inspect(engine).get_columns("account")}
+    with engine.connect() as conn:
+        assert current_version(conn) == LATEST_VERSION
+        assert conn.execute(text("SELECT balance_cents FROM account")).scalar() == 500
+        assert conn.execute(text("SELECT rowid FROM transaction_fts WHERE transaction_fts MATCH 'opening'")).all() == [(1,)]
+    engine.dispose()
+
+
+def test_duplicate_statements_collapse_to_the_newest(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'dupes.db'}")
+    with engine.begin() as conn:
+        for ddl in LEGACY_SCHEMA:
+            conn.execute(text(ddl))
+        for closing in (100, 200, 300):
+            conn.execute(text(
+                "INSERT INTO statement (account_id, period_start, period_end, generated_at, "
+                "opening_balance_cents, closing_balance_cents) VALUES "
+                "(1, '2024-02-01 00:00:00', '2024-03-01 00:00:00', '2024-03-02 00:00:00', 0, :closing)"
+            ), {"closing": closing})
+
+    init_db(engine)
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT closing_balance_cents FROM statement")).all()
+    assert rows == [(300,)]
+    engine.dispose()
+
+
+def test_fresh_database_is_stamped_and_rerun_is_a_no_op(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    init_db(engine)
+    with engine.connect() as conn:
+        assert current_version(conn) == LATEST_VERSION
+    assert run_migrations(engine) == []
+    engine.dispose()
+
+
+def test_missing_balance_index_is_rebuilt_on_databases_past_migration_4(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'v6.db'}")
+    init_db(engine)
+    with engine.begin() as conn:
+        # As migration 4 shipped it
+        conn.execute(text("DROP INDEX ix_transaction_missing_balance"))
+        conn.execute(text(
+            'CREATE INDEX ix_transaction_missing_balance ON "transaction" (account_id) '
+            "WHERE balance_after_cents IS NULL"
+        ))
+        conn.execute(text("PRAGMA user_version = 6"))
+
+    assert run_migrations(engine)[0] == 7
+    columns = next(
+        index["column_names"] for index in inspect(engine).get_indexes("transaction")
+        if index["name"] == "ix_transaction_missing_balance"
+    )
+    assert columns == ["account_id", "balance_after_cents"]
+    engine.dispose()
+
+
+def test_history_from_before_rollups_is_served_until_rebuilt(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rollups.db'}")
+    with engine.begin() as conn:
+        for ddl in LEGACY_SCHEMA:
+            conn.execute(text(ddl))
+        conn.execute(text("INSERT INTO account (user_id, type, balance_cents) VALUES (1, 'checking', 0), (1, 'savings', 0)"))
+        for account_id, type_, cents, when in (
+            (1, "deposit", 1_000, "2023-12-31 23:59:59"),
+            (1, "card_charge", 250, "2024-01-02 10:00:00"),
+            (1, "card_refund", 50, "2024-01-03 10:00:00"),
+            (1, "transfer_out", 300, "2024-01-04 10:00:00"),
+            (2, "transfer_in", 300, "2024-01-04 10:00:00"),
+        ):
+            conn.execute(text(
+                'INSERT INTO "transaction" (account_id, type, amount_cents, created_at) VALUES (:a, :t, :c, :w)'
+            ), {"a": account_id, "t": type_, "c": cents, "w": when})
+
+    init_db(engine)
+
+    with Session(engine) as session:
+        # The upgrade itself only flags the accounts; reads fall back to raw history
+        assert accounts_pending_rollups(session, [1, 2]) == [1, 2]
+        assert session.exec(select(AccountMonthRollup)).all() == []
+        expected, _ = compute_rollup_rows(session, [1, 2])
+        summary = [(rollup.month, rollup.net_cents) for rollup in monthly_summary(session, 1)]
+        assert summary == [("2023-12", 1_000), ("2024-01", -500)]
+        by_period = compute_insights(session, [1, 2], datetime(2023, 12, 1), datetime(2024, 2, 1)).by_period
+        assert [(period.period, period.net_cents) for period in by_period] == [("2023-12", 1_000), ("2024-01", -200)]
+
+    run_rollup_rebuild(engine, workers=0)
+
+    with Session(engine) as session:
+        assert accounts_pending_rollups(session, [1, 2]) == []
+        stored = [row.model_dump(exclude={"id"}) for row in session.exec(select(AccountMonthRollup))]
+        assert [(rollup.month, rollup.net_cents) for rollup in monthly_summary(session, 1)] == summary
+    key = itemgetter("account_id", "month")
+    assert sorted(stored, key=key) == sorted(expected, key=key)
+    engine.dispose()
+
+
+def test_rollup_flag_is_added_unset_after_an_in_place_rebuild(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'v8.db'}")
+    init_db(engine)
+    with engine.begin() as conn:
+        # As the earlier migration 8, which rebuilt the rollups itself, left it
+        conn.execute(text("ALTER TABLE account DROP COLUMN rollups_pending"))
+        conn.execute(text("INSERT INTO account (user_id, type, balance_cents, version) VALUES (1, 'checking', 0, 0)"))
+        conn.execute(text("PRAGMA user_version = 8"))
+
+    assert run_migrations(engine) == [9, 10]
+    with Session(engine) as session:
+        assert accounts_pending_rollups(session, [1]) == []
+    engine.dispose()
+
+
+def test_idempotency_reservations_without_a_response_are_dropped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'v8.db'}")
+    with engine.begin() as conn:
+        # The table as it was while keys were reserved ahead of the response
+        conn.execute(text(
+            "CREATE TABLE idempotencyrecord (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, key VARCHAR NOT NULL, "
+            "fingerprint VARCHAR NOT NULL, created_at DATETIME NOT NULL, status_code INTEGER, response_body VARCHAR)"
+        ))
+        conn.execute(text(
+            "INSERT INTO idempotencyrecord (user_id, key, fingerprint, created_at, status_code, response_body) "
+            "VALUES (1, 'stuck', 'f', '2024-01-01', NULL, NULL), (1, 'done', 'f', '2024-01-01', 200, '{}')"
+        ))
+    init_db(engine)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT key FROM idempotencyrecord")).scalars().all() == ["done"]
+    engine.dispose()
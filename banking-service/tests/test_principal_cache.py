@@ -0,0 +1,58 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.api.deps import principal_cache
+from app.core.cache import TTLCache
+from app.models.user import User
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_repeated_requests_hit_principal_cache(client: TestClient):
+    token = signup(client, "cache_hit@example.com", "pw")
+
+    first = client.get("/api/v1/users/me", headers=auth_headers(token))
+    second = client.get("/api/v1/users/me", headers=auth_headers(token))
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+
+    assert client.get("/api/v1/metrics").status_code == 401
+    stats = client.get("/api/v1/metrics", headers=auth_headers(token)).json()["principal_cache"]
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2  # the metrics request authenticates from the cache too
+    assert stats["size"] == 1
+
+
+def test_user_update_invalidates_cached_principal(client: TestClient, session: Session):
+    token = signup(client, "cache_update@example.com", "pw")
+    assert client.get("/api/v1/users/me", headers=auth_headers(token)).json()["full_name"] is None
+
+    user = session.exec(select(User).where(User.email == "cache_update@example.com")).one()
+    user.full_name = "Renamed"
+    session.add(user)
+    session.commit()
+    assert len(principal_cache) == 0
+
+    me = client.get("/api/v1/users/me", headers=auth_headers(token)).json()
+    assert me["full_name"] == "Renamed"
+
+
+def test_ttl_cache_expiry_and_lru_eviction():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.stats() == {"size": 1, "maxsize": 2, "hits": 1, "misses": 2, "evictions": 2}
@@ -0,0 +1,128 @@
+"""EXPLAIN QUERY PLAN checks: every hot query must be an index search, not a table scan."""
+from datetime import datetime
+
+from sqlalchemy import text, tuple_
+from sqlmodel import Session, select
+
+from app.models.account import Account
+from app.models.card import Card
+from app.models.rollup import AccountMonthRollup
+from app.models.statement import Statement
+from app.models.transaction import Transaction
+from app.services.balances import missing_balances_query
+from app.services.insights import counterparty_totals_query
+from app.services.search import TransactionFilters, filter_transactions
+from app.services.statements import stale_transactions_query
+
+
+def explain_plan(session: Session, statement) -> str:
+    sql = statement.compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+    rows = session.exec(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def assert_index_search(plan: str, table: str, index: str) -> None:
+    assert f"SEARCH {table} USING" in plan and index in plan, plan
+    assert f"SCAN {table}" not in plan, plan
+
+
+def test_transaction_listing_uses_account_created_index(session: Session):
+    plan = explain_plan(
+        session,
+        select(Transaction).where(Transaction.account_id == 1).order_by(Transaction.created_at.desc()),
+    )
+    assert_index_search(plan, "transaction", "ix_transaction_account_created")
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_statement_range_uses_account_created_index(session: Session):
+    plan = explain_plan(
+        session,
+        select(Transaction).where(Transaction.account_id == 1, Transaction.created_at < datetime(2024, 2, 1)),
+    )
+    assert_index_search(plan, "transaction", "ix_transaction_account_created")
+
+
+def test_account_listing_uses_user_index(session: Session):
+    plan = explain_plan(session, select(Account).where(Account.user_id == 1))
+    assert_index_search(plan, "account", "ix_account_user_id")
+
+
+def test_card_listing_uses_account_index(session: Session):
+    plan = explain_plan(session, select(Card).where(Card.account_id == 1))
+    assert_index_search(plan, "card", "ix_card_account_id")
+
+
+def test_statement_lookup_uses_account_period_index(session: Session):
+    plan = explain_plan(
+        session,
+        select(Statement).where(Statement.account_id == 1, Statement.period_start == datetime(2024, 1, 1)),
+    )
+    assert_index_search(plan, "statement", "uq_statement_account_period")
+
+
+def test_keyset_page_is_an_index_range_scan(session: Session):
+    after = (datetime(2024, 1, 1), 42)
+    plan = explain_plan(
+        session,
+        select(Transaction)
+        .where(Transaction.account_id == 1, tuple_(Transaction.created_at, Transaction.id) < tuple_(*after))
+        .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(101),
+    )
+    assert_index_search(plan, "transaction", "ix_transaction_account_created")
+    assert "created_at" in plan and "TEMP B-TREE" not in plan, plan
+
+
+def test_statement_staleness_check_seeks_by_id(session: Session):
+    statement = Statement(
+        account_id=1, period_start=datetime(2024, 1, 1), period_end=datetime(2024, 2, 1),
+        opening_balance_cents=0, closing_balance_cents=0, last_transaction_id=42,
+    )
+    plan = explain_plan(session, stale_transactions_query(statement))
+    assert "ix_transaction_account_id (account_id=? AND rowid>?)" in plan, plan
+
+
+def test_point_in_time_balance_is_one_index_seek(session: Session):
+    plan = explain_plan(
+        session,
+        select(Transaction.balance_after_cents)
+        .where(Transaction.account_id == 1, Transaction.created_at <= datetime(2024, 2, 1))
+        .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+        .limit(1),
+    )
+    assert_index_search(plan, "transaction", "ix_transaction_account_created")
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_missing_balance_check_uses_partial_index(session: Session):
+    plan = explain_plan(session, missing_balances_query(1))
+    assert_index_search(plan, "transaction", "ix_transaction_missing_balance")
+
+
+def test_monthly_summary_is_one_index_range_read(session: Session):
+    plan = explain_plan(
+        session,
+        select(AccountMonthRollup)
+        .where(AccountMonthRollup.account_id == 1, AccountMonthRollup.month >= "2024-01", AccountMonthRollup.month <= "2024-06")
+        .order_by(AccountMonthRollup.month),
+    )
+    assert_index_search(plan, "account_month_rollup", "uq_rollup_account_month")
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_type_filtered_listing_uses_account_type_index(session: Session):
+    plan = explain_plan(
+        session,
+        filter_transactions(
+            select(Transaction).where(Transaction.account_id == 1).order_by(Transaction.created_at.desc(), Transaction.id.desc()),
+            TransactionFilters(types=["card_charge"], min_amount_cents=10_000),
+        ),
+    )
+    assert_index_search(plan, "transaction", "ix_transaction_account_type_created")
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_counterparty_insights_read_only_transfer_rows(session: Session):
+    plan = explain_plan(session, counterparty_totals_query([1, 2], datetime(2024, 1, 1), datetime(2024, 4, 1)))
+    assert_index_search(plan, "transaction", "ix_transaction_account_type_created")
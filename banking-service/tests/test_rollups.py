@@ -0,0 +1,119 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.models.account import Account
+from app.models.rollup import AccountMonthRollup
+from app.models.transaction import Transaction
+from app.services.rollups import run_rollup_rebuild
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_account(client: TestClient, token: str) -> int:
+    return client.post("/api/v1/accounts", json={"type": "checking"}, headers=auth_headers(token)).json()["id"]
+
+
+def rollups(session: Session) -> dict:
+    session.expire_all()
+    rows = session.exec(select(AccountMonthRollup)).all()
+    return {(r.account_id, r.month): r.model_dump(exclude={"id"}) for r in rows}
+
+
+def test_postings_update_the_monthly_summary(client: TestClient):
+    token = signup(client, "rollup@example.com", "pw")
+    a, b = create_account(client, token), create_account(client, token)
+    client.post(f"/api/v1/accounts/{a}/deposit", json={"amount_cents": 10_000}, headers=auth_headers(token))
+    client.post(f"/api/v1/accounts/{a}/deposit", json={"amount_cents": 500}, headers=auth_headers(token))
+    client.post(f"/api/v1/accounts/{a}/withdraw", json={"amount_cents": 1_500}, headers=auth_headers(token))
+    client.post(f"/api/v1/accounts/{a}/withdraw", json={"amount_cents": 99_999}, headers=auth_headers(token))  # rejected
+    client.post(
+        "/api/v1/transfers",
+        json={"from_account_id": a, "to_account_id": b, "amount_cents": 2_000},
+        headers=auth_headers(token),
+    )
+    legs = [{"account_id": b, "amount_cents": -700}, {"account_id": a, "amount_cents": 700}]
+    client.post("/api/v1/journal", json={"legs": legs}, headers=auth_headers(token))
+
+    resp = client.get(f"/api/v1/accounts/{a}/summary", headers=auth_headers(token))
+    assert resp.status_code == 200
+    [month] = resp.json()["months"]
+    assert month["month"] == datetime.utcnow().strftime("%Y-%m")
+    assert (month["deposits_cents"], month["deposits_count"]) == (10_500, 2)
+    assert (month["withdrawals_cents"], month["withdrawals_count"]) == (1_500, 1)
+    assert (month["transfers_out_cents"], month["transfers_in_cents"]) == (2_000, 700)
+    assert month["net_cents"] == 7_700
+    assert month["net_cents"] == client.get("/api/v1/accounts", headers=auth_headers(token)).json()[0]["balance_cents"]
+
+    [month] = client.get(f"/api/v1/accounts/{b}/summary", headers=auth_headers(token)).json()["months"]
+    assert (month["transfers_in_count"], month["transfers_out_count"], month["net_cents"]) == (1, 1, 1_300)
+
+
+def test_summary_filters_months_and_checks_ownership(client: TestClient, session: Session):
+    token = signup(client, "rollup_range@example.com", "pw")
+    account_id = create_account(client, token)
+    session.add_all([
+        AccountMonthRollup(account_id=account_id, month=month, deposits_cents=100, deposits_count=1, net_cents=100)
+        for month in ("2023-12", "2024-01", "2024-02", "2024-03")
+    ])
+    session.commit()
+
+    resp = client.get(
+        f"/api/v1/accounts/{account_id}/summary", params={"from": "2024-01", "to": "2024-2"}, headers=auth_headers(token)
+    )
+    assert [m["month"] for m in resp.json()["months"]] == ["2024-01", "2024-02"]
+
+    resp = client.get(f"/api/v1/accounts/{account_id}/summary", params={"from": "2024/01"}, headers=auth_headers(token))
+    assert resp.status_code == 400
+    other = signup(client, "rollup_other@example.com", "pw")
+    resp = client.get(f"/api/v1/accounts/{account_id}/summary", headers=auth_headers(other))
+    assert resp.status_code == 404
+
+
+def test_rebuild_recomputes_from_raw_history(client: TestClient, session: Session):
+    token = signup(client, "rollup_rebuild@example.com", "pw")
+    a, b = create_account(client, token), create_account(client, token)
+    client.post(f"/api/v1/accounts/{a}/deposit", json={"amount_cents": 3_000}, headers=auth_headers(token))
+    client.post(
+        "/api/v1/transfers",
+        json={"from_account_id": a, "to_account_id": b, "amount_cents": 1_000},
+        headers=auth_headers(token),
+    )
+    incremental = rollups(session)
+
+    # History imported without going through the ledger, plus a corrupted rollup
+    session.add(Transaction(account_id=a, type="card_charge", amount_cents=40, created_at=datetime(2024, 1, 31, 23, 59)))
+    session.add(Transaction(account_id=a, type="card_refund", amount_cents=15, created_at=datetime(2024, 2, 1)))
+    session.add(AccountMonthRollup(account_id=b, month="1999-01", net_cents=5))
+    session.commit()
+
+    progress = []
+    result = run_rollup_rebuild(
+        session.get_bind(), workers=0, partition_size=1, progress=lambda done, total, elapsed: progress.append(done)
+    )
+    assert (result.accounts, result.rows, progress) == (2, 4, [1, 2])
+
+    rebuilt = rollups(session)
+    assert {key: rebuilt[key] for key in incremental} == incremental
+    assert (rebuilt[(a, "2024-01")]["card_charges_cents"], rebuilt[(a, "2024-01")]["net_cents"]) == (40, -40)
+    assert (rebuilt[(a, "2024-02")]["card_refunds_count"], rebuilt[(a, "2024-02")]["net_cents"]) == (1, 15)
+    assert (b, "1999-01") not in rebuilt
+
+
+def test_rebuild_runs_on_worker_processes(session: Session):
+    session.add_all([Account(user_id=1) for _ in range(3)])
+    session.commit()
+    for account_id in (1, 2, 3):
+        session.add(Transaction(account_id=account_id, type="deposit", amount_cents=100 * account_id, created_at=datetime(2024, 5, 2)))
+    session.commit()
+
+    result = run_rollup_rebuild(session.get_bind(), account_ids=[1, 3], workers=2, partition_size=1)
+    assert (result.accounts, result.rows) == (2, 2)
+    assert {key: row["net_cents"] for key, row in rollups(session).items()} == {(1, "2024-05"): 100, (3, "2024-05"): 300}
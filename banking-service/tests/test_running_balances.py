@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.services.balances import accounts_missing_balances, balance_at, run_balance_backfill
+from app.services.statements import generate_statement
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_account(client: TestClient, token: str) -> int:
+    return client.post("/api/v1/accounts", json={"type": "checking"}, headers=auth_headers(token)).json()["id"]
+
+
+def running_balances(session: Session, account_id: int) -> list:
+    stmt = (
+        select(Transaction.balance_after_cents)
+        .where(Transaction.account_id == account_id)
+        .order_by(Transaction.created_at, Transaction.id)
+    )
+    return session.exec(stmt).all()
+
+
+def test_every_write_records_the_running_balance(client: TestClient, session: Session):
+    token = signup(client, "running@example.com", "pw")
+    a, b, c = (create_account(client, token) for _ in range(3))
+    client.post(f"/api/v1/accounts/{a}/deposit", json={"amount_cents": 10_000}, headers=auth_headers(token))
+    client.post(f"/api/v1/accounts/{a}/withdraw", json={"amount_cents": 1_500}, headers=auth_headers(token))
+    client.post(
+        "/api/v1/transfers",
+        json={"from_account_id": a, "to_account_id": b, "amount_cents": 2_500},
+        headers=auth_headers(token),
+    )
+    legs = [{"account_id": a, "amount_cents": -1_000}, {"account_id": c, "amount_cents": 1_000}]
+    client.post("/api/v1/journal", json={"legs": legs}, headers=auth_headers(token))
+
+    assert running_balances(session, a) == [10_000, 8_500, 6_000, 5_000]
+    assert running_balances(session, b) == [2_500]
+    assert running_balances(session, c) == [1_000]
+    assert accounts_missing_balances(session) == []
+
+
+def test_balance_endpoint_answers_point_in_time(client: TestClient):
+    token = signup(client, "asof@example.com", "pw")
+    account_id = create_account(client, token)
+    first = client.post(
+        f"/api/v1/accounts/{account_id}/deposit", json={"amount_cents": 4_000}, headers=auth_headers(token)
+    ).json()
+    client.post(f"/api/v1/accounts/{account_id}/withdraw", json={"amount_cents": 1_000}, headers=auth_headers(token))
+
+    def balance(at=None) -> int:
+        params = {} if at is None else {"at": at}
+        resp = client.get(f"/api/v1/accounts/{account_id}/balance", params=params, headers=auth_headers(token))
+        assert resp.status_code == 200
+        return resp.json()["balance_cents"]
+
+    deposited_at = datetime.fromisoformat(first["created_at"])
+    assert balance() == 3_000
+    assert balance((deposited_at - timedelta(seconds=1)).isoformat()) == 0
+    assert balance(deposited_at.isoformat()) == 4_000
+    assert balance((deposited_at - timedelta(seconds=1)).isoformat() + "+00:00") == 0
+    assert balance("2999-01-01T00:00:00") == 3_000
+
+    other = signup(client, "asof_other@example.com", "pw")
+    resp = client.get(f"/api/v1/accounts/{account_id}/balance", headers=auth_headers(other))
+    assert resp.status_code == 404
+
+
+def test_backfill_fills_in_legacy_and_backdated_rows(session: Session):
+    session.add_all([Account(user_id=1), Account(user_id=1)])
+    session.commit()
+    # Written before running balances existed, the middle one backdated
+    session.add(Transaction(account_id=1, type="deposit", amount_cents=1_000, created_at=datetime(2024, 1, 5)))
+    session.add(Transaction(account_id=1, type="withdraw", amount_cents=300, created_at=datetime(2024, 3, 1)))
+    session.add(Transaction(account_id=1, type="deposit", amount_cents=50, created_at=datetime(2024, 2, 9)))
+    session.add(Transaction(account_id=2, type="deposit", amount_cents=70, created_at=datetime(2024, 1, 1)))
+    session.commit()
+
+    # Falls back to summing until the backfill has run
+    assert balance_at(session, 1, datetime(2024, 2, 10)) == 1_050
+    assert accounts_missing_balances(session) == [1, 2]
+
+    progress = []
+    accounts, rows = run_balance_backfill(session.get_bind(), 1, progress=lambda done, total: progress.append(done))
+    assert (accounts, rows, progress) == (2, 4, [1, 2])
+    session.expire_all()
+    assert running_balances(session, 1) == [1_000, 1_050, 750]
+    assert running_balances(session, 2) == [70]
+    assert accounts_missing_balances(session) == []
+    assert run_balance_backfill(session.get_bind(), 1) == (0, 0)
+
+    assert balance_at(session, 1, datetime(2024, 2, 10)) == 1_050
+    assert balance_at(session, 1, datetime(2024, 3, 1)) == 750
+    assert balance_at(session, 1, datetime(2024, 3, 1), inclusive=False) == 1_050
+
+
+def test_statement_balances_come_from_point_lookups(session: Session, query_counter):
+    session.add(Account(user_id=1))
+    session.commit()
+    for when, amount in ((datetime(2024, 1, 5), 1_000), (datetime(2024, 2, 9), 250), (datetime(2024, 3, 2), 75)):
+        session.add(Transaction(account_id=1, type="deposit", amount_cents=amount, created_at=when))
+    session.commit()
+    run_balance_backfill(session.get_bind(), 100)
+
+    query_counter.reset()
+    statement = generate_statement(session, 1, "2024-02")
+    assert (statement.opening_balance_cents, statement.closing_balance_cents) == (1_000, 1_250)
+    assert statement.last_transaction_id == 3
+    assert not any("sum(" in sql.lower() for sql in query_counter.statements)
@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db.session import build_engine, retry_on_lock, sqlite_pragmas
+
+
+def test_production_profile_applies_pragmas(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'prod.db'}", profile="production")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+    engine.dispose()
+
+
+def test_legacy_profile_keeps_sqlite_defaults(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'legacy.db'}", profile="legacy")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 2  # FULL
+    engine.dispose()
+
+
+def test_overrides_and_unknown_profile():
+    assert sqlite_pragmas("production", {"busy_timeout": 100})["busy_timeout"] == 100
+    with pytest.raises(ValueError):
+        sqlite_pragmas("turbo")
+
+
+def _lock_error() -> OperationalError:
+    return OperationalError("UPDATE account", {}, sqlite3.OperationalError("database is locked"))
+
+
+def test_retry_on_lock_reruns_the_unit_of_work(monkeypatch, session: Session):
+    monkeypatch.setattr(settings, "sqlite_lock_backoff_ms", 0)
+    calls = []
+
+    @retry_on_lock
+    def handler(session: Session) -> str:
+        calls.append(1)
+        if len(calls) < 3:
+            raise _lock_error()
+        return "ok"
+
+    assert handler(session=session) == "ok"
+    assert len(calls) == 3
+
+
+def test_retry_on_lock_gives_up_and_ignores_other_errors(monkeypatch, session: Session):
+    monkeypatch.setattr(settings, "sqlite_lock_backoff_ms", 0)
+    monkeypatch.setattr(settings, "sqlite_lock_retries", 2)
+    calls = []
+
+    @retry_on_lock
+    def always_locked(session: Session) -> None:
+        calls.append(1)
+        raise _lock_error()
+
+    with pytest.raises(OperationalError):
+        always_locked(session=session)
+    assert len(calls) == 3
+
+    @retry_on_lock
+    def broken(session: Session) -> None:
+        calls.append(1)
+        raise OperationalError("SELECT", {}, sqlite3.OperationalError("no such table: nope"))
+
+    with pytest.raises(OperationalError):
+        broken(session=session)
+    assert len(calls) == 4
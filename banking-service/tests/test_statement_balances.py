@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session
+
+from app.models.transaction import Transaction
+from app.services.ledger import SIGN_BY_TYPE
+from app.services.statements import generate_statement
+
+
+def add_tx(session: Session, type_: str, amount: int, when: datetime, account_id: int = 1) -> None:
+    session.add(Transaction(account_id=account_id, type=type_, amount_cents=amount, created_at=when))
+
+
+def test_balances_span_prior_history_and_all_types(session: Session):
+    add_tx(session, "deposit", 10_000, datetime(2024, 1, 5))
+    add_tx(session, "card_charge", 1_500, datetime(2024, 1, 20))
+    add_tx(session, "transfer_in", 2_000, datetime(2024, 2, 1))
+    add_tx(session, "card_refund", 500, datetime(2024, 2, 10))
+    add_tx(session, "transfer_out", 3_000, datetime(2024, 2, 28, 23, 59))
+    add_tx(session, "withdraw", 1_000, datetime(2024, 3, 1))  # next period
+    add_tx(session, "deposit", 99_999, datetime(2024, 2, 15), account_id=2)  # other account
+    session.commit()
+
+    statement = generate_statement(session, 1, "2024-02")
+    assert statement.opening_balance_cents == 8_500
+    assert statement.closing_balance_cents == 8_000
+
+
+def test_empty_history_gives_zero_balances(session: Session):
+    statement = generate_statement(session, 1, "2024-12")
+    assert (statement.opening_balance_cents, statement.closing_balance_cents) == (0, 0)
+    assert statement.period_end == datetime(2025, 1, 1)
+
+
+def test_every_documented_type_has_a_sign():
+    assert set(SIGN_BY_TYPE) == {"deposit", "withdraw", "transfer_in", "transfer_out", "card_charge", "card_refund"}
+
+
+@pytest.mark.parametrize("month", ["2024/02", "2024-13", "feb"])
+def test_invalid_month_is_rejected(session: Session, month: str):
+    with pytest.raises(ValueError):
+        generate_statement(session, 1, month)
+
+
+def test_next_month_carries_forward_from_prior_statement(session: Session):
+    add_tx(session, "deposit", 10_000, datetime(2024, 1, 5))
+    session.commit()
+    january = generate_statement(session, 1, "2024-01")
+    assert january.closing_balance_cents == 10_000
+
+    # Prove February starts from January's stored closing balance
+    january.closing_balance_cents = 7_777
+    session.add(january)
+    add_tx(session, "deposit", 500, datetime(2024, 2, 3))
+    session.commit()
+
+    february = generate_statement(session, 1, "2024-02")
+    assert february.opening_balance_cents == 7_777
+    assert february.closing_balance_cents == 8_277
+
+
+def test_backdated_transaction_repairs_the_anchor(session: Session):
+    add_tx(session, "deposit", 10_000, datetime(2024, 1, 5))
+    session.commit()
+    january = generate_statement(session, 1, "2024-01")
+
+    # Posted after January was generated, but dated inside January
+    add_tx(session, "withdraw", 4_000, datetime(2024, 1, 31))
+    add_tx(session, "deposit", 1_000, datetime(2024, 2, 2))
+    session.commit()
+
+    february = generate_statement(session, 1, "2024-02")
+    assert february.opening_balance_cents == 6_000
+    assert february.closing_balance_cents == 7_000
+
+    session.refresh(january)
+    assert january.closing_balance_cents == 6_000
+    assert february.last_transaction_id == 3
+
+
+def test_statement_generated_mid_month_is_repaired_when_used(session: Session):
+    add_tx(session, "deposit", 100, datetime(2024, 3, 10))
+    session.commit()
+    generate_statement(session, 1, "2024-03")  # March still open
+    add_tx(session, "deposit", 200, datetime(2024, 3, 20))
+    session.commit()
+
+    april = generate_statement(session, 1, "2024-04")
+    assert april.opening_balance_cents == 300
@@ -0,0 +1,58 @@
+from datetime import datetime
+
+from sqlmodel import Session, select
+
+from app.models.account import Account
+from app.models.statement import Statement
+from app.models.transaction import Transaction
+from app.services.statement_batch import run_statement_batch
+from app.services.statements import generate_statement
+
+
+def seed(session: Session, accounts: int = 5) -> None:
+    session.add_all([Account(user_id=1) for _ in range(accounts)])
+    session.commit()
+    for account_id in range(1, accounts + 1):
+        session.add(Transaction(account_id=account_id, type="deposit", amount_cents=1_000 * account_id, created_at=datetime(2024, 1, 10)))
+        session.add(Transaction(account_id=account_id, type="withdraw", amount_cents=100, created_at=datetime(2024, 2, 5)))
+        session.add(Transaction(account_id=account_id, type="deposit", amount_cents=7, created_at=datetime(2024, 3, 1)))
+    session.commit()
+
+
+def balances(session: Session, month_start: datetime) -> dict:
+    rows = session.exec(select(Statement).where(Statement.period_start == month_start)).all()
+    return {s.account_id: (s.opening_balance_cents, s.closing_balance_cents, s.last_transaction_id) for s in rows}
+
+
+def test_batch_matches_per_account_generation(session: Session):
+    seed(session)
+    generate_statement(session, 2, "2024-01")  # anchor for one account only
+    result = run_statement_batch(session.get_bind(), "2024-02", workers=0, partition_size=2)
+    assert (result.pending, result.generated) == (5, 5)
+    batch = balances(session, datetime(2024, 2, 1))
+
+    session.exec(Statement.__table__.delete())
+    session.commit()
+    for account_id in range(1, 6):
+        generate_statement(session, account_id, "2024-02")
+    assert balances(session, datetime(2024, 2, 1)) == batch
+
+
+def test_rerun_only_fills_in_missing_accounts(session: Session):
+    seed(session)
+    generate_statement(session, 3, "2024-02")
+    seen = []
+    result = run_statement_batch(
+        session.get_bind(), "2024-02", workers=0, partition_size=3,
+        progress=lambda done, total, elapsed: seen.append((done, total)),
+    )
+    assert result.generated == 4
+    assert seen == [(3, 4), (4, 4)]
+    assert run_statement_batch(session.get_bind(), "2024-02", workers=0).generated == 0
+
+
+def test_worker_processes_and_account_filter(session: Session):
+    seed(session)
+    result = run_statement_batch(session.get_bind(), "2024-01", account_ids=[1, 4], workers=2, partition_size=1)
+    assert result.generated == 2
+    assert balances(session, datetime(2024, 1, 1)) == {1: (0, 1_000, 1), 4: (0, 4_000, 10)}
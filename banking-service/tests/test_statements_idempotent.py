@@ -0,0 +1,113 @@
+import threading
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, func, select
+
+from app.models.statement import Statement
+from app.models.transaction import Transaction
+from app.services.statements import generate_statement, statement_cache
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_account(client: TestClient, token: str) -> int:
+    return client.post("/api/v1/accounts", json={"type": "checking"}, headers=auth_headers(token)).json()["id"]
+
+
+def statement_count(session: Session) -> int:
+    return session.exec(select(func.count()).select_from(Statement)).one()
+
+
+def test_repeat_request_returns_the_stored_statement(client: TestClient, session: Session):
+    token = signup(client, "stmt_idem@example.com", "pw")
+    acc = create_account(client, token)
+    client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 4_000}, headers=auth_headers(token))
+    month = datetime.now().strftime("%Y-%m")
+
+    first = client.post(f"/api/v1/statements/{acc}", json={"month": month}, headers=auth_headers(token)).json()
+    second = client.post(f"/api/v1/statements/{acc}", json={"month": month}, headers=auth_headers(token)).json()
+    assert first == second
+    assert statement_count(session) == 1
+
+    # A new posting in the period refreshes the same row
+    client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 1_000}, headers=auth_headers(token))
+    third = client.post(f"/api/v1/statements/{acc}", json={"month": month}, headers=auth_headers(token)).json()
+    assert third["id"] == first["id"]
+    assert third["closing_balance_cents"] == 5_000
+    assert statement_count(session) == 1
+
+
+def test_get_and_list_statements(client: TestClient, session: Session):
+    token = signup(client, "stmt_get@example.com", "pw")
+    acc = create_account(client, token)
+    for month in ("2024-03", "2024-01", "2024-02"):
+        client.post(f"/api/v1/statements/{acc}", json={"month": month}, headers=auth_headers(token))
+
+    resp = client.get(f"/api/v1/statements/{acc}/2024-02", headers=auth_headers(token))
+    assert resp.status_code == 200
+    assert resp.json()["period_start"].startswith("2024-02-01")
+    assert client.get(f"/api/v1/statements/{acc}/2023-12", headers=auth_headers(token)).status_code == 404
+    assert client.get(f"/api/v1/statements/{acc}/2024-13", headers=auth_headers(token)).status_code == 400
+
+    listed = client.get(f"/api/v1/statements/{acc}", headers=auth_headers(token)).json()
+    assert [s["period_start"][:7] for s in listed] == ["2024-01", "2024-02", "2024-03"]
+    ranged = client.get(f"/api/v1/statements/{acc}", params={"from": "2024-02", "to": "2024-03"}, headers=auth_headers(token))
+    assert [s["period_start"][:7] for s in ranged.json()] == ["2024-02", "2024-03"]
+
+    other = signup(client, "stmt_get_other@example.com", "pw")
+    assert client.get(f"/api/v1/statements/{acc}", headers=auth_headers(other)).status_code == 404
+
+
+def test_cached_statement_is_not_served_after_a_backdated_posting(session: Session):
+    session.add(Transaction(account_id=1, type="deposit", amount_cents=1_000, created_at=datetime(2024, 2, 3)))
+    session.commit()
+    assert generate_statement(session, 1, "2024-02").closing_balance_cents == 1_000
+    assert len(statement_cache) == 1
+
+    session.add(Transaction(account_id=1, type="deposit", amount_cents=500, created_at=datetime(2024, 2, 20)))
+    session.commit()
+    assert generate_statement(session, 1, "2024-02").closing_balance_cents == 1_500
+
+
+def test_concurrent_requests_store_one_statement(session: Session):
+    session.add(Transaction(account_id=1, type="deposit", amount_cents=700, created_at=datetime(2024, 5, 9)))
+    session.commit()
+    engine = session.get_bind()
+    results, errors = [], []
+
+    def request() -> None:
+        try:
+            with Session(engine) as own:
+                results.append(generate_statement(own, 1, "2024-05").id)
+        except Exception as exc:  # pragma: no cover - surfaced by the assert below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(set(results)) == 1
+    assert statement_count(session) == 1
+
+
+def test_list_refreshes_a_statement_after_a_posting_in_its_period(client: TestClient):
+    token = signup(client, "stmt_list_stale@example.com", "pw")
+    acc = create_account(client, token)
+    month = datetime.now().strftime("%Y-%m")
+    for period in ("2024-01", month):
+        client.post(f"/api/v1/statements/{acc}", json={"month": period}, headers=auth_headers(token))
+    client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 2_500}, headers=auth_headers(token))
+
+    resp = client.get(f"/api/v1/statements/{acc}", headers=auth_headers(token))
+    assert resp.status_code == 200
+    assert [s["closing_balance_cents"] for s in resp.json()] == [0, 2_500]
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from app.core.cache import TTLCache
+from app.core import security
+from app.core.security import create_access_token, decode_access_token
+
+
+def test_repeated_decode_is_served_from_cache(monkeypatch):
+    monkeypatch.setattr(security, "token_cache", TTLCache(maxsize=10, ttl=1800))
+    token = create_access_token({"sub": "tok@example.com"})
+
+    first = decode_access_token(token)
+    second = decode_access_token(token)
+    assert first == second and first["sub"] == "tok@example.com"
+    assert security.token_cache.stats()["hits"] == 1
+    assert security.token_cache.stats()["misses"] == 1
+
+    # Callers get their own copy of the claims
+    second["sub"] = "tampered"
+    assert decode_access_token(token)["sub"] == "tok@example.com"
+
+
+def test_cached_entry_expires_with_token(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(security, "token_cache", TTLCache(maxsize=10, ttl=1800, clock=lambda: now[0]))
+    token = create_access_token({"sub": "exp@example.com"}, expires_delta=timedelta(seconds=60))
+
+    decode_access_token(token)
+    now[0] = 61
+    decode_access_token(token)
+    assert security.token_cache.stats()["misses"] == 2
+    assert security.token_cache.stats()["evictions"] == 1
+
+
+def test_invalid_tokens_are_not_cached(monkeypatch):
+    monkeypatch.setattr(security, "token_cache", TTLCache(maxsize=10, ttl=1800))
+    assert decode_access_token("this.is.not.valid") is None
+    assert len(security.token_cache) == 0
+
+
+def test_disabled_cache_always_verifies(monkeypatch):
+    monkeypatch.setattr(security, "token_cache", TTLCache(maxsize=0, ttl=1800))
+    token = create_access_token({"sub": "off@example.com"})
+    assert decode_access_token(token)["sub"] == "off@example.com"
+    assert decode_access_token(token)["sub"] == "off@example.com"
+    assert security.token_cache.stats()["hits"] == 0
@@ -0,0 +1,82 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_account(client: TestClient, token: str) -> int:
+    return client.post("/api/v1/accounts", json={"type": "checking"}, headers=auth_headers(token)).json()["id"]
+
+
+def seed(client: TestClient, token: str, acc: int) -> None:
+    client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 1000, "description": "pay, day"}, headers=auth_headers(token))
+    client.post(f"/api/v1/accounts/{acc}/withdraw", json={"amount_cents": 250}, headers=auth_headers(token))
+
+
+def test_ndjson_export_streams_full_history_oldest_first(client: TestClient):
+    token = signup(client, "export_nd@example.com", "pw")
+    acc = create_account(client, token)
+    seed(client, token, acc)
+
+    resp = client.get("/api/v1/transactions/export", params={"account_id": acc}, headers=auth_headers(token))
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in resp.text.splitlines()]
+    assert [r["type"] for r in records] == ["deposit", "withdraw"]
+    assert records[0]["description"] == "pay, day"
+    assert records[0]["account_id"] == acc
+
+
+def test_csv_export_with_date_bounds(client: TestClient):
+    token = signup(client, "export_csv@example.com", "pw")
+    acc = create_account(client, token)
+    seed(client, token, acc)
+
+    resp = client.get("/api/v1/transactions/export", params={"account_id": acc, "format": "csv"}, headers=auth_headers(token))
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    assert [r["amount_cents"] for r in rows] == ["1000", "250"]
+    assert rows[0]["description"] == "pay, day"
+
+    future = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    resp = client.get(
+        "/api/v1/transactions/export",
+        params={"account_id": acc, "format": "csv", "start": future},
+        headers=auth_headers(token),
+    )
+    assert resp.text.strip().splitlines() == ["id,account_id,type,amount_cents,created_at,description,counterparty_account_id"]
+
+
+def test_export_bounds_with_an_offset_are_read_as_utc(client: TestClient):
+    token = signup(client, "export_tz@example.com", "pw")
+    acc = create_account(client, token)
+    seed(client, token, acc)
+
+    # An hour ago, written as +05:00 wall-clock time
+    start = (datetime.now(timezone.utc) - timedelta(hours=1)).astimezone(timezone(timedelta(hours=5)))
+    resp = client.get(
+        "/api/v1/transactions/export",
+        params={"account_id": acc, "format": "csv", "start": start.isoformat()},
+        headers=auth_headers(token),
+    )
+    assert [r["amount_cents"] for r in csv.DictReader(io.StringIO(resp.text))] == ["1000", "250"]
+
+
+def test_export_enforces_ownership_and_format(client: TestClient):
+    token_a = signup(client, "export_a@example.com", "pw")
+    token_b = signup(client, "export_b@example.com", "pw")
+    acc = create_account(client, token_a)
+
+    resp = client.get("/api/v1/transactions/export", params={"account_id": acc}, headers=auth_headers(token_b))
+    assert resp.status_code == 404
+    resp = client.get("/api/v1/transactions/export", params={"account_id": acc, "format": "xml"}, headers=auth_headers(token_a))
+    assert resp.status_code == 422
@@ -0,0 +1,47 @@
+from fastapi.testclient import TestClient
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_account(client: TestClient, token: str) -> int:
+    return client.post("/api/v1/accounts", json={"type": "checking"}, headers=auth_headers(token)).json()["id"]
+
+
+def test_keyset_pages_cover_history_once_newest_first(client: TestClient):
+    token = signup(client, "page@example.com", "pw")
+    acc = create_account(client, token)
+    for amount in range(1, 6):
+        client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": amount}, headers=auth_headers(token))
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"account_id": acc, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/api/v1/transactions", params=params, headers=auth_headers(token))
+        assert resp.status_code == 200
+        seen.extend(tx["amount_cents"] for tx in resp.json())
+        pages += 1
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert seen == [5, 4, 3, 2, 1]
+
+
+def test_bad_cursor_and_oversized_limit_are_rejected(client: TestClient):
+    token = signup(client, "page_bad@example.com", "pw")
+    acc = create_account(client, token)
+
+    resp = client.get("/api/v1/transactions", params={"account_id": acc, "cursor": "not-a-cursor"}, headers=auth_headers(token))
+    assert resp.status_code == 400
+
+    resp = client.get("/api/v1/transactions", params={"account_id": acc, "limit": 10**6}, headers=auth_headers(token))
+    assert resp.status_code == 422
@@ -0,0 +1,128 @@
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlmodel import Session
+
+from app.models.transaction import Transaction
+from app.services.search import fts_query
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_account(client: TestClient, token: str) -> int:
+    return client.post("/api/v1/accounts", json={"type": "checking"}, headers=auth_headers(token)).json()["id"]
+
+
+def seed(session: Session, account_id: int, other_id: int) -> None:
+    rows = [
+        ("card_charge", 12_000, datetime(2024, 2, 3), "Coffee roasters downtown", None),
+        ("card_charge", 5_000, datetime(2024, 2, 20), "coffee shop", None),
+        ("card_charge", 25_000, datetime(2024, 5, 1), "Electronics store", None),
+        ("deposit", 300_000, datetime(2024, 3, 1), "Payroll ACME", None),
+        ("transfer_out", 15_000, datetime(2024, 3, 15), "rent", other_id),
+        ("withdraw", 2_000, datetime(2024, 3, 16), None, None),
+    ]
+    session.add_all([
+        Transaction(account_id=account_id, type=type_, amount_cents=amount, created_at=when,
+                    description=description, counterparty_account_id=counterparty)
+        for type_, amount, when, description, counterparty in rows
+    ])
+    session.add(Transaction(account_id=other_id, type="deposit", amount_cents=1, created_at=datetime(2024, 2, 1), description="coffee"))
+    session.commit()
+
+
+def search(client: TestClient, token: str, account_id: int, **params) -> list:
+    resp = client.get("/api/v1/transactions", params={"account_id": account_id, **params}, headers=auth_headers(token))
+    assert resp.status_code == 200, resp.text
+    return [tx["description"] for tx in resp.json()]
+
+
+def test_filters_combine(client: TestClient, session: Session):
+    token = signup(client, "search@example.com", "pw")
+    acc, other = create_account(client, token), create_account(client, token)
+    seed(session, acc, other)
+
+    assert search(client, token, acc, type="card_charge", min_amount_cents=10_000, start="2024-01-01", end="2024-04-01") == [
+        "Coffee roasters downtown"
+    ]
+    assert search(client, token, acc, type=["card_charge", "withdraw"], max_amount_cents=5_000) == [None, "coffee shop"]
+    assert search(client, token, acc, start="2024-03-01T00:00:00", end="2024-03-16T00:00:00") == ["rent", "Payroll ACME"]
+    assert search(client, token, acc, counterparty_account_id=other) == ["rent"]
+    assert search(client, token, acc, type="card_refund") == []
+
+
+def test_full_text_search_over_descriptions(client: TestClient, session: Session):
+    token = signup(client, "search_fts@example.com", "pw")
+    acc, other = create_account(client, token), create_account(client, token)
+    seed(session, acc, other)
+
+    assert search(client, token, acc, q="COFFEE") == ["coffee shop", "Coffee roasters downtown"]
+    assert search(client, token, acc, q="coffee downtown") == ["Coffee roasters downtown"]
+    assert search(client, token, acc, q="roast*") == ["Coffee roasters downtown"]
+    assert search(client, token, acc, q="coffee", min_amount_cents=10_000) == ["Coffee roasters downtown"]
+    # FTS5 syntax is searched for literally rather than failing
+    assert search(client, token, acc, q='coffee OR "rent') == []
+    assert search(client, token, acc, q="***") == []
+
+    # The index follows later inserts, edits and deletes
+    client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 10, "description": "coffee refund"}, headers=auth_headers(token))
+    session.exec(update(Transaction).where(Transaction.description == "coffee shop").values(description="tea house"))
+    session.exec(Transaction.__table__.delete().where(Transaction.description == "Coffee roasters downtown"))
+    session.commit()
+    assert search(client, token, acc, q="coffee") == ["coffee refund"]
+    assert search(client, token, acc, q="tea") == ["tea house"]
+
+
+def test_filtered_pages_follow_the_cursor(client: TestClient):
+    token = signup(client, "search_pages@example.com", "pw")
+    acc = create_account(client, token)
+    for amount in range(1, 8):
+        description = "lunch" if amount % 2 else "other"
+        client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": amount, "description": description}, headers=auth_headers(token))
+
+    seen, cursor = [], None
+    while True:
+        params = {"account_id": acc, "limit": 2, "q": "lunch"}
+        if cursor:
+            params["cursor"] = cursor
+        resp = client.get("/api/v1/transactions", params=params, headers=auth_headers(token))
+        seen.extend(tx["amount_cents"] for tx in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == [7, 5, 3, 1]
+
+
+def test_bad_filters_are_rejected(client: TestClient):
+    token = signup(client, "search_bad@example.com", "pw")
+    acc = create_account(client, token)
+    resp = client.get("/api/v1/transactions", params={"account_id": acc, "type": "bogus"}, headers=auth_headers(token))
+    assert resp.status_code == 400
+    resp = client.get("/api/v1/transactions", params={"account_id": acc, "min_amount_cents": -1}, headers=auth_headers(token))
+    assert resp.status_code == 422
+    other = signup(client, "search_other@example.com", "pw")
+    resp = client.get("/api/v1/transactions", params={"account_id": acc, "q": "!!"}, headers=auth_headers(other))
+    assert resp.status_code == 404
+
+
+def test_fts_query_quotes_words():
+    assert fts_query("say hi*") == '"say" "hi"*'
+    assert fts_query('say "hi" OR NEAR(x)') == '"say" "hi" "OR" "NEAR" "x"'
+    assert fts_query("-- ***") is None
+
+
+def test_offset_dates_are_compared_in_utc(client: TestClient, session: Session):
+    token = signup(client, "search_tz@example.com", "pw")
+    acc, other = create_account(client, token), create_account(client, token)
+    seed(session, acc, other)
+
+    # 2024-03-01T05:00+05:00 is midnight UTC, when the payroll deposit was posted
+    assert search(client, token, acc, start="2024-03-01T05:00:00+05:00", end="2024-03-01T06:00:00+05:00") == ["Payroll ACME"]
+    assert search(client, token, acc, start="2024-02-29T19:00:00-05:00", end="2024-03-01T00:00:01Z") == ["Payroll ACME"]
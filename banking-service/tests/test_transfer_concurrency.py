@@ -0,0 +1,71 @@
+import random
+import threading
+
+import pytest
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.db.session import build_engine, init_db
+from app.models.account import Account
+from app.models.transaction import Transaction
+from app.services.ledger import signed_amount
+from app.services.transfers import execute_transfer
+
+ACCOUNTS = 6
+BALANCE = 1_000
+
+
+def test_ring_of_concurrent_transfers_conserves_money(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'ring.db'}", profile="production")
+    init_db(engine)
+    with Session(engine) as session:
+        session.add_all([Account(user_id=1, balance_cents=BALANCE) for _ in range(ACCOUNTS)])
+        session.add_all([Transaction(account_id=i, type="deposit", amount_cents=BALANCE) for i in range(1, ACCOUNTS + 1)])
+        session.commit()
+
+    # list.append is atomic; a shared counter's += is not
+    outcomes = []
+    errors = []
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        with Session(engine) as session:
+            for _ in range(60):
+                from_id = rng.randint(1, ACCOUNTS)
+                # Alternate directions so transfers also run against each other
+                to_id = from_id % ACCOUNTS + 1 if seed % 2 else (from_id - 2) % ACCOUNTS + 1
+                try:
+                    execute_transfer(session, from_id, to_id, rng.randint(1, BALANCE // 2))
+                    outcomes.append("done")
+                except ValueError as exc:
+                    assert str(exc) == "Insufficient funds"
+                    outcomes.append("refused")
+                except Exception as exc:  # pragma: no cover - surfaced by the assert below
+                    errors.append(exc)
+                    return
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    done = outcomes.count("done")
+    assert done > 0 and "refused" in outcomes
+    with Session(engine) as session:
+        assert session.exec(select(func.sum(Account.balance_cents))).one() == ACCOUNTS * BALANCE
+        assert session.exec(select(func.min(Account.balance_cents))).one() >= 0
+        ledger = dict(session.exec(select(Transaction.account_id, func.sum(signed_amount())).group_by(Transaction.account_id)).all())
+        assert {a.id: a.balance_cents for a in session.exec(select(Account))} == ledger
+        transfers = session.exec(select(func.count()).where(Transaction.type == "transfer_out")).one()
+        assert transfers == done
+    engine.dispose()
+
+
+def test_unknown_destination_is_not_found(session: Session):
+    session.add(Account(user_id=1, balance_cents=500))
+    session.commit()
+    with pytest.raises(ValueError, match="Destination account not found"):
+        execute_transfer(session, 1, 99, 100)
+    assert session.get(Account, 1).balance_cents == 500
@@ -0,0 +1,81 @@
+from fastapi.testclient import TestClient
+
+from tests.conftest import QueryCounter
+
+
+def signup(client: TestClient, email: str, password: str) -> str:
+    return client.post("/api/v1/auth/signup", json={"email": email, "password": password}).json()["access_token"]
+
+
+def auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_account(client: TestClient, token: str) -> int:
+    return client.post("/api/v1/accounts", json={"type": "checking"}, headers=auth_headers(token)).json()["id"]
+
+
+def statements_for(query_counter: QueryCounter, send) -> list:
+    query_counter.reset()
+    resp = send()
+    assert resp.status_code == 200, resp.text
+    return [sql.split()[0] for sql in query_counter.statements]
+
+
+def test_write_endpoints_statement_counts(client: TestClient, query_counter: QueryCounter):
+    assert statements_for(query_counter, lambda: client.post(
+        "/api/v1/auth/signup", json={"email": "rt@example.com", "password": "pw"}
+    )) == ["SELECT", "INSERT"]
+
+    token = client.post("/api/v1/auth/login", json={"email": "rt@example.com", "password": "pw"}).json()["access_token"]
+    headers = auth_headers(token)
+    client.get("/api/v1/users/me", headers=headers)  # warm the principal cache
+
+    assert statements_for(query_counter, lambda: client.post(
+        "/api/v1/accounts", json={"type": "checking"}, headers=headers
+    )) == ["INSERT"]
+    a1, a2 = create_account(client, token), create_account(client, token)
+
+    # BEGIN IMMEDIATE, balance UPDATE ... RETURNING, INSERT ... RETURNING, monthly rollup upsert
+    assert statements_for(query_counter, lambda: client.post(
+        f"/api/v1/accounts/{a1}/deposit", json={"amount_cents": 1_000}, headers=headers
+    )) == ["BEGIN", "UPDATE", "INSERT", "INSERT"]
+    assert statements_for(query_counter, lambda: client.post(
+        f"/api/v1/accounts/{a1}/withdraw", json={"amount_cents": 100}, headers=headers
+    )) == ["BEGIN", "UPDATE", "INSERT", "INSERT"]
+    assert statements_for(query_counter, lambda: client.post(
+        "/api/v1/transfers", json={"from_account_id": a1, "to_account_id": a2, "amount_cents": 100}, headers=headers
+    )) == ["BEGIN", "UPDATE", "UPDATE", "INSERT", "INSERT"]
+
+    # The ownership check is the account version bump
+    card = {"account_id": a1, "holder_name": "RT", "exp_month": 12, "exp_year": 2030, "cvv": "123"}
+    assert statements_for(query_counter, lambda: client.post("/api/v1/cards", json=card, headers=headers)) == ["UPDATE", "INSERT"]
+
+
+def test_write_responses_are_complete_without_refresh(client: TestClient):
+    token = signup(client, "rt_body@example.com", "pw")
+    a1, a2 = create_account(client, token), create_account(client, token)
+    deposit = client.post(f"/api/v1/accounts/{a1}/deposit", json={"amount_cents": 500, "description": "pay"}, headers=auth_headers(token)).json()
+    assert deposit["id"] > 0 and deposit["description"] == "pay" and deposit["created_at"]
+
+    transfer = client.post(
+        "/api/v1/transfers", json={"from_account_id": a1, "to_account_id": a2, "amount_cents": 200}, headers=auth_headers(token)
+    ).json()
+    assert [t["id"] for t in transfer] == [deposit["id"] + 1, deposit["id"] + 2]
+    balances = {a["id"]: a["balance_cents"] for a in client.get("/api/v1/accounts", headers=auth_headers(token)).json()}
+    assert balances == {a1: 300, a2: 200}
+
+
+def test_transfer_from_foreign_account_is_404_and_writes_nothing(client: TestClient):
+    owner = signup(client, "rt_owner@example.com", "pw")
+    acc = create_account(client, owner)
+    client.post(f"/api/v1/accounts/{acc}/deposit", json={"amount_cents": 500}, headers=auth_headers(owner))
+    other = signup(client, "rt_other@example.com", "pw")
+    mine = create_account(client, other)
+
+    resp = client.post("/api/v1/transfers", json={"from_account_id": acc, "to_account_id": mine, "amount_cents": 100}, headers=auth_headers(other))
+    assert resp.status_code == 404
+    assert resp.json()["detail"] == "Source account not found"
+    resp = client.post("/api/v1/accounts/{}/deposit".format(acc), json={"amount_cents": 100}, headers=auth_headers(other))
+    assert resp.status_code == 404
+    assert client.get("/api/v1/accounts", headers=auth_headers(owner)).json()[0]["balance_cents"] == 500